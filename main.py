@@ -4,8 +4,316 @@ import sys
 
 sys.path.append(os.getcwd())
 
-from src.core import settings
+from src.core import settings, logger
+from src.core.config import SettingsWatcher
+from src.core.metrics import Metrics, create_exporter
+from src.detectors import KeypointTracker, SevenSegmentDecoder
 from src.services.clock_reader import ClockReader
+from src.services.instance_tracker import InstanceTracker
+from src.services.latency_controller import LatencyController
+from src.services.multi_stream import MultiStreamScheduler, StreamSource
+from src.services.pipeline import PipelineRunner
+from src.services.shm_workers import SharedMemoryWorkerPool
+from src.services.sinks import create_sinks
+from src.services.time_model import TimeModel
+from src.utils.buffer_pool import BufferPool
+from src.utils.change_detector import DisplayChangeDetector
+from src.utils.geometry import CachedWarper, INTERPOLATIONS
+
+def build_clock_service(pose_model_path=None, digit_model_path=None, lazy_load=None):
+    tracker = None
+    if settings.tracking_enabled:
+        tracker = KeypointTracker(
+            redetect_interval=settings.redetect_interval,
+            max_error=settings.tracking_max_error
+        )
+
+    warper = None
+    if settings.warp_cache:
+        warper = CachedWarper(
+            target_size=settings.warp_size,
+            interpolation=INTERPOLATIONS[settings.warp_interpolation],
+            quantum=settings.warp_cache_quantum
+        )
+
+    change_detector = None
+    if settings.skip_unchanged:
+        change_detector = DisplayChangeDetector(threshold=settings.change_threshold)
+
+    segment_decoder = None
+    if settings.segment_decoder_enabled:
+        segment_decoder = SevenSegmentDecoder(
+            digit_cells=settings.segment_layout,
+            min_confidence=settings.segment_min_confidence
+        )
+
+    time_model = None
+    if settings.time_model_enabled:
+        time_model = TimeModel(**settings.time_model_params)
+
+    latency_controller = None
+    if settings.latency_control_enabled:
+        latency_controller = LatencyController(**settings.latency_params)
+
+    instance_tracker = InstanceTracker(
+        max_distance=settings.instance_max_distance,
+        max_age=settings.instance_max_age
+    )
+
+    buffer_pool = None
+    if settings.buffer_pool:
+        # Sized up front, so steady-state frames allocate nothing
+        buffer_pool = BufferPool()
+        warp_w, warp_h = settings.warp_size
+        buffer_pool.reserve((settings.camera_height, settings.camera_width, 3), count=2)
+        buffer_pool.reserve((settings.camera_height, settings.camera_width), count=2)
+        buffer_pool.reserve((warp_h, warp_w, 3), count=1)
+
+    metrics = Metrics() if settings.metrics_enabled else None
+
+    return ClockReader(
+        pose_model_path=pose_model_path or settings.pose_model_path,
+        digit_model_path=digit_model_path or settings.digit_model_path,
+        pose_conf=settings.pose_conf,
+        digit_conf=settings.digit_conf,
+        warp_size=settings.warp_size,
+        tracker=tracker,
+        warper=warper,
+        interpolation=INTERPOLATIONS[settings.warp_interpolation],
+        change_detector=change_detector,
+        time_model=time_model,
+        backend=settings.backend,
+        num_threads=settings.num_threads,
+        roi_imgsz=settings.roi_imgsz,
+        roi_margin=settings.roi_margin,
+        metrics=metrics,
+        draw=not settings.headless,
+        segment_decoder=segment_decoder,
+        lazy_load=settings.lazy_load if lazy_load is None else lazy_load,
+        latency_controller=latency_controller,
+        instance_tracker=instance_tracker,
+        max_clocks=settings.max_clocks,
+        buffer_pool=buffer_pool
+    )
+
+def apply_settings(clock_service, config):
+    """
+    Push the values that can change without a restart (thresholds, latency budget)
+    into a running ClockReader. Models, camera and runtime mode need a restart.
+    Runs on the inference thread, queued by the settings watcher through ClockReader.defer.
+    """
+    clock_service.pose_detector.conf = config.pose_conf
+    clock_service.digit_detector.conf = config.digit_conf
+    clock_service.pose_detector.roi_margin = config.roi_margin
+
+    if clock_service.change_detector is not None:
+        clock_service.change_detector.threshold = config.change_threshold
+    if clock_service.segment_decoder is not None:
+        clock_service.segment_decoder.min_confidence = config.segment_min_confidence
+    if clock_service.tracker is not None:
+        clock_service.tracker.redetect_interval = config.redetect_interval
+        clock_service.tracker.max_error = config.tracking_max_error
+
+    if not config.latency_control_enabled:
+        clock_service.latency_controller = None
+        clock_service.pose_detector.imgsz = None
+    elif clock_service.latency_controller is None:
+        clock_service.latency_controller = LatencyController(**config.latency_params)
+    else:
+        clock_service.latency_controller.configure(**config.latency_params)
+
+    logger.info("Settings reloaded from configs/settings.yaml")
+
+def worker_reader_kwargs(clock_service):
+    """
+    ClockReader arguments for the inference processes. Per-sequence state
+    (tracker, change detector, time model) stays out: workers see interleaved frames.
+    """
+    return {
+        "pose_model_path": clock_service.pose_detector.model_path,
+        "digit_model_path": clock_service.digit_detector.model_path,
+        "pose_conf": settings.pose_conf,
+        "digit_conf": settings.digit_conf,
+        "warp_size": settings.warp_size,
+        "warper": clock_service.warper,
+        "interpolation": clock_service.interpolation,
+        "segment_decoder": clock_service.segment_decoder,
+        "backend": settings.backend,
+        "num_threads": settings.worker_threads,
+        "roi_imgsz": settings.roi_imgsz,
+        "roi_margin": settings.roi_margin,
+    }
+
+def log_stats(clock_service):
+    if clock_service.warper is not None:
+        logger.info(f"Warp cache: {clock_service.warper.stats()}")
+    if clock_service.change_detector is not None:
+        logger.info(f"Digit recognition skipped: {clock_service.change_detector.stats()}")
+    if clock_service.buffer_pool is not None:
+        logger.info(f"Buffer pool: {clock_service.buffer_pool.stats()}")
+    if clock_service.latency_controller is not None:
+        logger.info(f"Latency controller: {clock_service.latency_controller.stats()}")
+
+def publish(sinks, result):
+    for sink in sinks:
+        sink.emit(result)
+
+    if not sinks and result.warped_img is not None and result.time_text != "...":
+        prefix = f"[{result.stream_id}] " if result.stream_id is not None else ""
+        print(f"{prefix}Detected Time: {result.time_text}")
+
+def run_sequential(clock_service, cap, sinks):
+    metrics = clock_service.metrics
+    pool = clock_service.buffer_pool
+
+    # Every frame is decoded into the same buffer (OpenCV reallocates if the camera size differs)
+    buffer = pool.acquire((settings.camera_height, settings.camera_width, 3)) if pool is not None else None
+    frame = buffer
+    try:
+        while True:
+            with metrics.timer("capture"):
+                ret, frame = cap.read(image=frame)
+            if  not ret:
+                break
+
+            result = clock_service.read(frame)
+            publish(sinks, result)
+
+            if not settings.headless:
+                with metrics.timer("display"):
+                    cv2.imshow("Main View", result.debug_frame)
+
+                    if  result.warped_img is not None:
+                        cv2.imshow("Warped  Output", result.warped_img)
+
+            # Sinks serialize on emit and imshow copies, the buffers can be reused
+            clock_service.release(result)
+
+            if not settings.headless and cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    finally:
+        if pool is not None:
+            pool.release(buffer)
+
+def run_multi_clock(clock_service, cap, sinks):
+    metrics = clock_service.metrics
+    frame_id = 0
+
+    while True:
+        with metrics.timer("capture"):
+            ret, frame = cap.read()
+        if  not ret:
+            break
+
+        results = clock_service.read_all(frame, frame_id=frame_id)
+        frame_id += 1
+        for result in results:
+            publish(sinks, result)
+
+        if settings.headless:
+            continue
+
+        with metrics.timer("display"):
+            # All results of a frame share one debug frame
+            cv2.imshow("Main View", results[0].debug_frame if results else frame)
+
+            if results:
+                cv2.imshow("Warped  Output", cv2.vconcat([r.warped_img for r in results]))
+
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+
+def run_processes(clock_service, cap, sinks):
+    ret, frame = cap.read()
+    if not ret:
+        return
+
+    warp_w, warp_h = settings.warp_size
+    pool = SharedMemoryWorkerPool(
+        worker_reader_kwargs(clock_service),
+        frame_shape=frame.shape,
+        crop_shape=(warp_h, warp_w, 3),
+        workers=settings.workers,
+        slots=settings.worker_slots,
+        metrics=clock_service.metrics,
+        latency_controller=clock_service.latency_controller
+    ).start()
+    logger.info(f"Started {settings.workers} inference workers")
+
+    def show(results):
+        for result in results:
+            publish(sinks, result)
+
+            if settings.headless:
+                continue
+
+            if result.detected:
+                clock_service.draw_debug(result.debug_frame, result.keypoints, result.time_text)
+            cv2.imshow("Main View", result.debug_frame)
+            if  result.warped_img is not None:
+                cv2.imshow("Warped  Output", result.warped_img)
+
+    try:
+        while ret:
+            # Hot-reloaded settings may replace or drop the controller
+            clock_service.apply_deferred()
+            pool.latency_controller = clock_service.latency_controller
+            pool.submit(frame)
+            show(pool.collect(timeout=0, with_frame=not settings.headless))
+
+            if not settings.headless and cv2.waitKey(1) & 0xFF == ord('q'):
+                return
+
+            with clock_service.metrics.timer("capture"):
+                ret, frame = cap.read()
+
+        # End of input: wait for the frames still in the workers
+        while pool.in_flight:
+            show(pool.collect(timeout=0.5, with_frame=not settings.headless))
+    finally:
+        logger.info(f"Workers: {pool.stats()}")
+        pool.stop()
+
+def run_pipelined(clock_service, cap, sinks):
+    def show_result(packet):
+        publish(sinks, packet.to_result())
+
+        if settings.headless:
+            return
+
+        debug_frame = packet.frame.copy()
+
+        if packet.warped_img is not None:
+            clock_service.draw_debug(debug_frame, packet.keypoints, packet.time_text)
+            cv2.imshow("Warped  Output", packet.warped_img)
+
+        cv2.imshow("Main View", debug_frame)
+
+    # Keep the driver from queueing stale frames behind a slow stage
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    runner = PipelineRunner(
+        clock_service, cap,
+        queue_size=settings.queue_size,
+        report_interval=settings.report_interval
+    )
+    runner.run(show_result, show=not settings.headless)
+
+def run_multi_stream(clock_service, sinks):
+    sources = [
+        StreamSource(stream.get('id', str(i)), stream['source'], stream.get('max_fps', 0.0))
+        for i, stream in enumerate(settings.streams)
+    ]
+    if not sources:
+        print("Error: no streams configured")
+        return
+
+    scheduler = MultiStreamScheduler(
+        clock_service, sources,
+        max_batch=settings.max_batch,
+        report_interval=settings.report_interval
+    )
+    scheduler.run(lambda result: publish(sinks, result))
 
 def main():
     if settings is None: return
@@ -16,42 +324,66 @@ def main():
     
     print(f"{settings.pose_model_path}...")
     try: 
-        clock_service = ClockReader(
-        pose_model_path=settings.pose_model_path,
-        digit_model_path=settings.digit_model_path, 
-        pose_conf=settings.pose_conf,
-        digit_conf=settings.digit_conf
-    )
+        # In processes mode the models live in the workers only
+        clock_service = build_clock_service(lazy_load=True if settings.runtime_mode == "processes" else None)
+        sinks = create_sinks(settings.sinks)
+        if settings.warmup and settings.runtime_mode != "processes":
+            batch_size = settings.max_batch if settings.runtime_mode == "multi_stream" else 1
+            elapsed = clock_service.warmup((settings.camera_height, settings.camera_width), batch_size)
+            logger.info(f"Warm-up done in {elapsed:.2f}s")
     except Exception as e:
         print(f"Error: {e}")
         return
     
-    cap = cv2.VideoCapture(settings.camera_id)
-    if  not cap.isOpened():
-        print(f"Error: {settings.camera_id}")
-        return
-    
-    while True:
-        ret, frame = cap.read()
-        if  not ret:
-            break
-
-        debug_frame, warped_img, time_text = clock_service.process_frame(frame)
+    exporter = create_exporter(
+        clock_service.metrics,
+        mode=settings.metrics_export,
+        port=settings.metrics_port,
+        interval=settings.metrics_interval
+    )
 
-        cv2.imshow("Main View", debug_frame)
+    watcher = None
+    if settings.hot_reload:
+        watcher = SettingsWatcher(settings, lambda config: clock_service.defer(lambda: apply_settings(clock_service, config)), settings.reload_interval).start()
 
-        if  warped_img is not None:
-            cv2.imshow("Warped  Output", warped_img)
+    try:
+        run(clock_service, sinks)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        log_stats(clock_service)
+        for sink in sinks:
+            sink.close()
+        if exporter is not None:
+            exporter.stop()
 
-            if time_text !=  "...":
-                print(f"Detected Time: {time_text}")
+def run(clock_service, sinks):
+    if settings.runtime_mode == "multi_stream":
+        run_multi_stream(clock_service, sinks)
+        return
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+    cap = cv2.VideoCapture(settings.camera_id)
+    if  not cap.isOpened():
+        print(f"Error: {settings.camera_id}")
+        return
     
-    cap.release()
-    cv2.destroyAllWindows()
+    try:
+        if settings.multi_clock:
+            if settings.runtime_mode != "sequential":
+                logger.warning(f"multi_clock runs sequentially, runtime.mode '{settings.runtime_mode}' ignored")
+            run_multi_clock(clock_service, cap, sinks)
+        elif settings.runtime_mode == "pipelined":
+            run_pipelined(clock_service, cap, sinks)
+        elif settings.runtime_mode == "processes":
+            run_processes(clock_service, cap, sinks)
+        else:
+            run_sequential(clock_service, cap, sinks)
+    finally:
+        cap.release()
+        if not settings.headless:
+            cv2.destroyAllWindows()
 
 if __name__ =="__main__":
     main()
-
@@ -0,0 +1,245 @@
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import argparse
+import resource
+import tempfile
+import tracemalloc
+import numpy as np
+import yaml
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.core import settings, logger
+from src.utils.geometry import four_point_transform
+from src.utils.synthetic import generate_clock_scene, render_display, random_time_text
+from src.detectors.backends import Prediction
+
+RESOLUTIONS = {"480p": (640, 480), "720p": (1280, 720), "1080p": (1920, 1080)}
+
+def build_tiny_models(out_dir):
+    """
+    Randomly initialized YOLOv8n pose (4 keypoints) and detect (digits + ':') models,
+    so the benchmark needs no trained weights or downloads.
+    """
+    from ultralytics import YOLO
+    from ultralytics.nn.tasks import yaml_model_load
+
+    paths = {}
+    specs = {
+        "pose": ("yolov8n-pose.yaml", {"nc": 1, "kpt_shape": [4, 3]}, {0: "clock"}),
+        "detect": ("yolov8n.yaml", {"nc": 11}, {i: str(i) for i in range(10)} | {10: ":"}),
+    }
+    for task, (base_cfg, overrides, names) in specs.items():
+        cfg = yaml_model_load(base_cfg)
+        cfg.update(overrides)
+        cfg.pop("yaml_file", None)
+
+        # File name keeps the 'yolov8n' prefix so ultralytics picks the nano scale
+        cfg_path = os.path.join(out_dir, f"yolov8n-bench-{task}.yaml")
+        with open(cfg_path, 'w') as f:
+            yaml.safe_dump(cfg, f)
+
+        model = YOLO(cfg_path, task=task)
+        model.model.names = names
+        paths[task] = os.path.join(out_dir, f"bench_{task}.pt")
+        model.save(paths[task])
+
+    return paths["pose"], paths["detect"]
+
+class ScriptedBackend:
+    """
+    Runs the wrapped (random) model for its cost, then answers with the scene's
+    ground truth. Random heads score around 1e-3, so without this nothing passes
+    the confidence threshold and the reader stops before the warp and digit stages.
+    """
+    def __init__(self, backend, answer):
+        self.backend = backend
+        self.names = backend.names
+        self.answer = answer
+
+    def predict(self, images, conf, imgsz=None):
+        images = list(images)
+        self.backend.predict(images, conf, imgsz=imgsz)
+        return [self.answer(image) for image in images]
+
+def script_pose(detector, known_quads):
+    # known_quads: id(frame) -> keypoints of the display in that frame
+    def answer(image):
+        quad = known_quads.get(id(image))
+        if quad is None:
+            return Prediction(np.zeros((0, 6), dtype=np.float32), np.zeros((0, 4, 3), dtype=np.float32))
+        x0, y0 = quad.min(axis=0)
+        x1, y1 = quad.max(axis=0)
+        keypoints = np.concatenate([quad, np.ones((4, 1), dtype=np.float32)], axis=1)[None]
+        return Prediction(np.array([[x0, y0, x1, y1, 0.9, 0]], dtype=np.float32), keypoints.astype(np.float32))
+
+    detector._backend = ScriptedBackend(detector.backend, answer)
+
+def script_digits(detector, num_digits=4):
+    # Evenly spaced digit boxes, enough for the parser to build a reading
+    def answer(image):
+        h, w = image.shape[:2]
+        cell = w / num_digits
+        boxes = [[i * cell, 0.1 * h, (i + 0.9) * cell, 0.9 * h, 0.9, (i + 1) % 10] for i in range(num_digits)]
+        return Prediction(np.array(boxes, dtype=np.float32))
+
+    detector._backend = ScriptedBackend(detector.backend, answer)
+
+def time_calls(fn, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+def peak_memory(fn):
+    # Python/numpy allocations during one call (torch's allocator is not traced)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+def run_case(name, resolution, batch, fn, args):
+    latencies = time_calls(fn, args.iterations, args.warmup)
+    result = {
+        "name": name,
+        "resolution": resolution,
+        "batch": batch,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "mean_ms": float(latencies.mean()),
+        "throughput_per_s": float(batch * 1000.0 / latencies.mean()),
+        "peak_alloc_mb": float(peak_memory(fn)),
+        # ru_maxrss is KiB on Linux
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    logger.info(f"{name:<28} {resolution:>6} b={batch:<3} p50 {result['p50_ms']:8.2f} ms  "
+                f"p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+                f"{result['throughput_per_s']:8.1f}/s  peak {result['peak_alloc_mb']:.1f} MB")
+    return result
+
+def run_benchmarks(args):
+    rng = np.random.default_rng(args.seed)
+    results = []
+
+    models = None
+    if args.stages != "geometry":
+        from src.detectors import ClockDetector, DigitDetector
+        from src.services.clock_reader import ClockReader
+
+        model_dir = tempfile.mkdtemp(prefix="clock_bench_")
+        logger.info(f"Building tiny random models in {model_dir}...")
+        pose_path, digit_path = build_tiny_models(model_dir)
+
+        clock_det = ClockDetector(pose_path, args.conf)
+        digit_det = DigitDetector(digit_path, args.conf)
+        reader = ClockReader(pose_path, digit_path, args.conf, args.conf, warp_size=settings.warp_size)
+        models = (clock_det, digit_det, reader)
+
+        # Every stage runs on every frame: the models answer with the scene's ground truth
+        known_quads = {}
+        for detector in (clock_det, reader.pose_detector):
+            script_pose(detector, known_quads)
+        for detector in (digit_det, reader.digit_detector):
+            script_digits(detector)
+
+    for resolution in args.resolutions:
+        frame_size = RESOLUTIONS[resolution]
+        scenes = [generate_clock_scene(frame_size, random_time_text(rng), rng) for _ in range(max(args.batches))]
+        frames = [frame for frame, _ in scenes]
+        frame, quad = scenes[0]
+        if models is not None:
+            known_quads.update({id(f): q for f, q in scenes})
+
+        results.append(run_case("four_point_transform", resolution, 1,
+                                lambda: four_point_transform(frame, quad, settings.warp_size), args))
+
+        if models is None:
+            continue
+        clock_det, digit_det, reader = models
+
+        results.append(run_case("ClockDetector.detect", resolution, 1, lambda: clock_det.detect(frame), args))
+        results.append(run_case("ClockReader.process_frame", resolution, 1, lambda: reader.process_frame(frame), args))
+
+        for batch in args.batches:
+            if batch == 1:
+                continue
+            batch_frames = frames[:batch]
+            results.append(run_case("ClockDetector.detect_batch", resolution, batch,
+                                    lambda: clock_det.detect_batch(batch_frames), args))
+            results.append(run_case("ClockReader.process_frames", resolution, batch,
+                                    lambda: reader.process_frames(batch_frames), args))
+
+    # The digit model always sees warp_size crops, independent of camera resolution
+    if models is not None:
+        digit_det = models[1]
+        crops = [render_display(random_time_text(rng), settings.warp_size) for _ in range(max(args.batches))]
+        for batch in args.batches:
+            batch_crops = crops[:batch]
+            if batch == 1:
+                results.append(run_case("DigitDetector.detect", "warp", 1, lambda: digit_det.detect(batch_crops[0]), args))
+            else:
+                results.append(run_case("DigitDetector.detect_batch", "warp", batch,
+                                        lambda: digit_det.detect_batch(batch_crops), args))
+
+    return results
+
+def compare(results, baseline_path):
+    with open(baseline_path, 'r') as f:
+        baseline = {(r["name"], r["resolution"], r["batch"]): r for r in json.load(f)["results"]}
+
+    logger.info(f"Comparison against {baseline_path} (p50, negative = faster):")
+    for r in results:
+        old = baseline.get((r["name"], r["resolution"], r["batch"]))
+        if old is None:
+            continue
+        delta = 100.0 * (r["p50_ms"] - old["p50_ms"]) / old["p50_ms"]
+        logger.info(f"{r['name']:<28} {r['resolution']:>6} b={r['batch']:<3} {old['p50_ms']:8.2f} -> {r['p50_ms']:8.2f} ms ({delta:+.1f}%)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline CPU benchmark on synthetic seven-segment clock scenes")
+    parser.add_argument('--resolutions', nargs='+', default=list(RESOLUTIONS), choices=list(RESOLUTIONS), help='Camera resolutions to benchmark')
+    parser.add_argument('--batches', nargs='+', type=int, default=[1, 4, 8], help='Batch sizes for the batched APIs')
+    parser.add_argument('--stages', type=str, default='all', choices=['all', 'geometry'], help="'geometry' skips the models (no ultralytics needed)")
+    parser.add_argument('--iterations', type=int, default=50, help='Timed calls per case')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed calls per case')
+    parser.add_argument('--conf', type=float, default=0.25, help='Confidence threshold passed to the models (predictions come from the scene, see ScriptedBackend)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic scenes')
+    parser.add_argument('--output', type=str, default='runs/benchmark/results.json', help='Machine-readable results file')
+    parser.add_argument('--compare', type=str, default=None, help='Earlier results file to compare against')
+
+    args = parser.parse_args()
+    if 1 not in args.batches:
+        args.batches = [1] + args.batches
+
+    results = run_benchmarks(args)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "iterations": args.iterations,
+            "warp_size": list(settings.warp_size),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Results saved to: {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,278 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.core import settings
+from src.detectors.segment_decoder import SevenSegmentDecoder
+from src.utils.geometry import INTERPOLATIONS, four_point_transform, perspective_matrices, valid_quads
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+# Same classes as the digit model: 0-9 and the colon
+CLASS_NAMES = {i: str(i) for i in range(10)} | {10: ":"}
+MANIFEST = "manifest.json"
+
+def find_images(pose_data):
+    """
+    YOLO layout: <pose_data>/images/<split>/**/*.jpg with labels/<split>/**/*.txt.
+    A flat images/ folder is treated as the 'train' split.
+    Output:
+        - list of (split, image path relative to images/<split>)
+    """
+    images_dir = os.path.join(pose_data, "images")
+    splits = [d for d in sorted(os.listdir(images_dir)) if os.path.isdir(os.path.join(images_dir, d))]
+    roots = [(split, os.path.join(images_dir, split)) for split in splits] or [("train", images_dir)]
+
+    found = []
+    for split, root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for name in sorted(filenames):
+                if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                    found.append((split, os.path.relpath(os.path.join(dirpath, name), root)))
+    return found, bool(splits)
+
+def label_path(root, split, rel_image, has_splits):
+    base = os.path.join(root, "labels", split) if has_splits else os.path.join(root, "labels")
+    return os.path.join(base, os.path.splitext(rel_image)[0] + ".txt")
+
+def read_text(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return f.read()
+
+def parse_pose_labels(text, width, height):
+    """
+    YOLO pose rows: cls cx cy w h x1 y1 v1 ... x4 y4 v4 (normalized).
+    Output:
+        - list of (4, 2) corner arrays in pixels, tl, tr, br, bl
+    """
+    quads = []
+    for line in (text or "").splitlines():
+        values = line.split()
+        if len(values) < 5 + 8:
+            continue
+        kpts = np.array(values[5:], dtype=np.float32)
+        # Keypoints come as (x, y, visibility) triplets or plain (x, y) pairs
+        kpts = kpts.reshape(4, -1)[:, :2] if len(kpts) in (8, 12) else None
+        if kpts is not None:
+            quads.append(kpts * np.array([width, height], dtype=np.float32))
+    return quads
+
+def project_digit_labels(text, M, width, height, crop_w, crop_h):
+    """
+    Digit boxes labeled on the source image (YOLO detect, normalized), moved into
+    the warped crop. Boxes that end up mostly outside the crop are dropped.
+    """
+    rows = []
+    for line in (text or "").splitlines():
+        values = line.split()
+        if len(values) != 5:
+            continue
+        cls = int(values[0])
+        cx, cy, w, h = (float(v) for v in values[1:])
+        x0, y0, x1, y1 = (cx - w / 2) * width, (cy - h / 2) * height, (cx + w / 2) * width, (cy + h / 2) * height
+
+        corners = np.array([[[x0, y0], [x1, y0], [x1, y1], [x0, y1]]], dtype=np.float64)
+        projected = cv2.perspectiveTransform(corners, M)[0]
+        px0, py0 = projected.min(axis=0)
+        px1, py1 = projected.max(axis=0)
+        area = (px1 - px0) * (py1 - py0)
+
+        px0, px1 = np.clip([px0, px1], 0, crop_w)
+        py0, py1 = np.clip([py0, py1], 0, crop_h)
+        if area <= 0 or (px1 - px0) * (py1 - py0) < 0.5 * area:
+            continue
+        rows.append((cls, (px0 / crop_w, py0 / crop_h, px1 / crop_w, py1 / crop_h)))
+    return rows
+
+def format_rows(rows):
+    lines = []
+    for cls, (x0, y0, x1, y1) in rows:
+        lines.append(f"{cls} {(x0 + x1) / 2:.6f} {(y0 + y1) / 2:.6f} {x1 - x0:.6f} {y1 - y0:.6f}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+def init_worker(params):
+    global _params, _decoder
+    # One OpenCV thread per process, the pool provides the parallelism
+    cv2.setNumThreads(1)
+    _params = params
+    _decoder = None
+    if params["autolabel"]:
+        # Same digit cells as the runtime decoder (main.py), or the boxes won't match the display
+        _decoder = SevenSegmentDecoder(digit_cells=params["segment_layout"], min_confidence=params["min_confidence"])
+
+def build_item(task):
+    """
+    Warp every labeled clock of one source image and write crops and labels.
+    Output:
+        - (key, list of output paths relative to the dataset root, crops needing a manual label)
+    """
+    key, image_path, pose_text, digit_text, split, stem = task
+    params = _params
+    crop_w, crop_h = params["warp_size"]
+
+    image = cv2.imread(image_path)
+    if image is None:
+        return key, [], 0
+
+    height, width = image.shape[:2]
+    outputs, unlabeled = [], 0
+    for i, quad in enumerate(parse_pose_labels(pose_text, width, height)):
+        if not valid_quads(quad[None])[0]:
+            continue
+        crop = four_point_transform(image, quad, (crop_w, crop_h), INTERPOLATIONS[params["interpolation"]])
+        name = f"{stem}_{i}"
+
+        rows = []
+        if digit_text is not None:
+            M = perspective_matrices(quad[None], crop_w, crop_h)[0]
+            rows = project_digit_labels(digit_text, M, width, height, crop_w, crop_h)
+        elif _decoder is not None:
+            boxes, confidence = _decoder.digit_boxes(crop)
+            if confidence >= _decoder.min_confidence:
+                rows = [(int(digit), box) for digit, box in boxes]
+
+        if rows:
+            image_rel = os.path.join("images", split, name + ".jpg")
+            label_rel = os.path.join("labels", split, name + ".txt")
+            with open(os.path.join(params["output"], label_rel), 'w') as f:
+                f.write(format_rows(rows))
+            outputs.append(label_rel)
+        else:
+            # Kept out of images/: an unlabeled crop would train as pure background
+            image_rel = os.path.join("unlabeled", split, name + ".jpg")
+            unlabeled += 1
+
+        cv2.imwrite(os.path.join(params["output"], image_rel), crop, [cv2.IMWRITE_JPEG_QUALITY, params["quality"]])
+        outputs.append(image_rel)
+
+    return key, outputs, unlabeled
+
+def fingerprint(image_path, pose_text, digit_text):
+    # Source image by size + mtime (cheap for large sets), labels by content
+    stat = os.stat(image_path)
+    labels = hashlib.sha1(((pose_text or "") + "\0" + (digit_text or "")).encode()).hexdigest()
+    return [stat.st_size, stat.st_mtime_ns, labels]
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {"params": None, "entries": {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def remove_outputs(output, paths):
+    for rel in paths:
+        try:
+            os.remove(os.path.join(output, rel))
+        except FileNotFoundError:
+            pass
+
+def write_data_yaml(output, splits):
+    import yaml
+
+    train = "train" if "train" in splits else splits[0]
+    val = "val" if "val" in splits else train
+    data = {
+        "path": os.path.abspath(output),
+        "train": f"images/{train}",
+        "val": f"images/{val}",
+        "names": CLASS_NAMES,
+    }
+    if "test" in splits:
+        data["test"] = "images/test"
+    with open(os.path.join(output, "data.yaml"), 'w') as f:
+        yaml.safe_dump(data, f, sort_keys=False)
+
+def build_dataset(args):
+    if not os.path.isdir(os.path.join(args.pose_data, "images")):
+        print(f"Error: No images/ folder in: {args.pose_data}")
+        return
+
+    params = {
+        "warp_size": list(settings.warp_size),
+        "interpolation": settings.warp_interpolation,
+        "autolabel": args.digit_labels is None,
+        "min_confidence": args.min_confidence,
+        "segment_layout": settings.segment_layout if args.digit_labels is None else None,
+        "digit_labels": os.path.abspath(args.digit_labels) if args.digit_labels else None,
+        "quality": args.quality,
+    }
+    manifest_path = os.path.join(args.output, MANIFEST)
+    manifest = load_manifest(manifest_path)
+    entries = manifest["entries"]
+    if args.force or manifest["params"] != params:
+        # Different warp size/labeling: every crop is stale
+        for entry in entries.values():
+            remove_outputs(args.output, entry["outputs"])
+        entries = {}
+
+    images, has_splits = find_images(args.pose_data)
+    splits = sorted({split for split, _ in images})
+    for folder in ("images", "labels", "unlabeled"):
+        for split in splits:
+            os.makedirs(os.path.join(args.output, folder, split), exist_ok=True)
+
+    tasks, fresh = [], {}
+    for split, rel_image in images:
+        image_path = os.path.join(args.pose_data, "images", split if has_splits else "", rel_image)
+        pose_text = read_text(label_path(args.pose_data, split, rel_image, has_splits))
+        digit_text = read_text(label_path(args.digit_labels, split, rel_image, has_splits)) if args.digit_labels else None
+
+        key = f"{split}/{rel_image}"
+        stamp = fingerprint(image_path, pose_text, digit_text)
+        entry = entries.get(key)
+        if entry is not None and entry["source"] == stamp and all(os.path.exists(os.path.join(args.output, p)) for p in entry["outputs"]):
+            fresh[key] = entry
+            continue
+
+        if entry is not None:
+            remove_outputs(args.output, entry["outputs"])
+        stem = os.path.splitext(rel_image)[0].replace(os.sep, "__")
+        fresh[key] = {"source": stamp, "outputs": [], "unlabeled": 0}
+        tasks.append((key, image_path, pose_text, digit_text, split, stem))
+
+    # Sources that disappeared since the last build
+    for key in set(entries) - set(fresh):
+        remove_outputs(args.output, entries[key]["outputs"])
+
+    print(f"⏳ {len(images)} images: {len(images) - len(tasks)} unchanged, {len(tasks)} to build with {args.workers} workers...")
+    params["output"] = args.output
+    start_time = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(params,)) as executor:
+        for key, outputs, unlabeled in executor.map(build_item, tasks, chunksize=16):
+            fresh[key]["outputs"] = outputs
+            fresh[key]["unlabeled"] = unlabeled
+
+    params.pop("output")
+    with open(manifest_path + ".tmp", 'w') as f:
+        json.dump({"params": params, "entries": fresh}, f)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    write_data_yaml(args.output, splits)
+
+    elapsed = time.perf_counter() - start_time
+    crops = sum(len([p for p in e["outputs"] if p.endswith(".jpg")]) for e in fresh.values())
+    unlabeled = sum(e["unlabeled"] for e in fresh.values())
+    print(f"✅ Built {len(tasks)} images in {elapsed:.1f}s; dataset has {crops} crops ({unlabeled} in unlabeled/ need labels)")
+    print(f"✅ Train with: python scripts/train.py recognition --data {os.path.join(args.output, 'data.yaml')}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the digit-recognition dataset from pose-labeled images (no pose model needed)")
+    parser.add_argument('--pose_data', type=str, required=True, help='Pose dataset root with images/ and labels/ (YOLO pose, 4 keypoints).')
+    parser.add_argument('--output', type=str, default='datasets/digits', help='Recognition dataset root (images/, labels/, data.yaml).')
+    parser.add_argument('--digit_labels', type=str, default=None, help='Optional root with labels/ of digit boxes on the source images; projected into the crops.')
+    parser.add_argument('--min_confidence', type=float, default=0.5, help='Without --digit_labels: seven-segment auto-label confidence needed to label a crop.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of processes.')
+    parser.add_argument('--quality', type=int, default=95, help='JPEG quality of the crops.')
+    parser.add_argument('--force', action='store_true', help='Rebuild everything, ignoring the manifest.')
+
+    args = parser.parse_args()
+    build_dataset(args)
@@ -1,79 +1,295 @@
 import os
 import cv2
 import sys
+import time
 import argparse
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.detectors import ClockDetector
+from src.services.latency_controller import LatencyController
+from src.utils.crop_store import CropShardWriter, remove_records
+from src.utils.dedup import DedupIndex
+from src.utils.buffer_pool import BufferPool
 from src.utils.geometry import four_point_transform
 from src.core import settings
 
-def get_blur_score(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+# Detector owned by each pool worker, created once in init_worker
+_worker_detector = None
+
+# Warp outputs and gray images are reused across frames (per process)
+_buffers = BufferPool()
+
+def get_blur_score(image, gray=None):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=gray)
     laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
     return laplacian_var
 
+def create_writer(args, prefix="shard"):
+    if args.sink != "shards":
+        return None
+    return CropShardWriter(args.output_dir, prefix=prefix, shard_size_mb=args.shard_size_mb)
+
+def create_dedup(args):
+    if args.dedup_index is None:
+        return None
+    return DedupIndex(args.dedup_index, max_distance=args.dedup_distance)
+
+def save_crop(frame, keypoints, timestamp, args, writer=None, dedup=None, verbose=True):
+    """
+    Output:
+        - the writer's sequence number of the crop (shard sink), or the image path; None if skipped
+    """
+    warp_w, warp_h = settings.warp_size
+    warped_img = _buffers.acquire((warp_h, warp_w) + frame.shape[2:])
+    gray = _buffers.acquire((warp_h, warp_w))
+    try:
+        four_point_transform(frame, keypoints, settings.warp_size, dst=warped_img)
+
+        blur_score = get_blur_score(warped_img, gray)
+        
+        if blur_score > args.blur_threshold:
+            if dedup is not None and not dedup.check_and_add(warped_img):
+                if verbose:
+                    print(f"❌ Skipped Duplicate Display ({timestamp}ms)")
+                return None
+
+            if writer is not None:
+                # Encoded and appended on the writer's background thread, which now owns the crop
+                output_path = f"{args.output_dir} (shard, {timestamp}ms)"
+                output = writer.write(warped_img, timestamp, blur_score, keypoints)
+                _buffers.detach(warped_img)
+            else:
+                output_path = os.path.join(args.output_dir, f"clock_{timestamp}ms.jpg")
+                cv2.imwrite(output_path, warped_img)
+                output = output_path
+
+            if verbose:
+                print(f"✅ Saved (Score: {blur_score:.1f}): {output_path}")
+            return output
+
+        elif verbose:
+            print(f"❌ Skipped Blurry Image (Score: {blur_score:.1f} < {args.blur_threshold})")
+    except Exception as e:
+        print(f"Error during warping: {e}")
+    finally:
+        _buffers.release(warped_img)
+        _buffers.release(gray)
+    return None
+
+def init_worker(model_path, conf):
+    global _worker_detector
+    # One inference thread per process, the pool provides the parallelism
+    cv2.setNumThreads(1)
+    _worker_detector = ClockDetector(model_path=model_path, conf_threshold=conf, num_threads=1)
+
+def process_shard(args, start, end, detector=None):
+    """
+    Process frames [start, end) of the video headlessly, with `detector` or,
+    in a pool worker, the one from init_worker.
+    Skipped frames are only grabbed, never decoded into a BGR image.
+    Output:
+        - (frames read, crops saved, (hash, location) of every saved crop added to the dedup index)
+          location is the (shard name, record number) in the shard sink, the image path otherwise
+    """
+    detector = detector or _worker_detector
+    # Starts from the persisted index; hashes found here are merged by the caller
+    dedup = create_dedup(args)
+    # Each shard job writes its own shard files, named after its first frame
+    writer = create_writer(args, prefix=f"part{start:09d}")
+    cap = cv2.VideoCapture(args.video)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    frames, saved = 0, 0
+    indexed = []
+    frame = None
+    for frame_idx in range(start, end):
+        if not cap.grab():
+            break
+        frames += 1
+
+        # Same selection as the interactive loop: every `stride`-th frame
+        if (frame_idx + 1) % args.stride != 0:
+            continue
+
+        # Decoded into the previous frame's buffer
+        ret, frame = cap.retrieve(image=frame)
+        if not ret:
+            continue
+
+        keypoints = detector.detect(frame)
+        if keypoints is not None:
+            # Timestamp from the frame index, so names don't depend on the shard layout
+            timestamp = int(round(frame_idx * 1000.0 / fps))
+            known = len(dedup.new_hashes) if dedup is not None else 0
+            output = save_crop(frame, keypoints, timestamp, args, writer, dedup, verbose=False)
+            if output is None:
+                continue
+            saved += 1
+            if dedup is not None and len(dedup.new_hashes) > known:
+                indexed.append((dedup.new_hashes[-1], output))
+
+    cap.release()
+    if writer is not None:
+        writer.close()
+        # Sequence numbers -> where the writer actually put each crop
+        indexed = [(h, writer.locations[seq]) for h, seq in indexed if writer.locations[seq] is not None]
+    return frames, saved, indexed
+
+def merge_shard_hashes(args, dedup, shard_results):
+    """
+    Shards run concurrently, so each one only dedups against the persisted index
+    and itself. Replaying their hashes in frame order against one index finds the
+    crops a sequential run would have skipped; those are removed from the output.
+    Only records and images written by these shards are touched, never those of
+    earlier runs in the same directory.
+    Output:
+        - number of crops removed
+    """
+    duplicates = []
+    for indexed in shard_results:
+        for h, location in indexed:
+            if dedup.tree.find(h, dedup.max_distance) is not None:
+                duplicates.append(location)
+                dedup.rejected += 1
+            else:
+                dedup.add_hash(h)
+
+    if args.sink == "shards":
+        remove_records(args.output_dir, duplicates)
+    else:
+        for path in duplicates:
+            if os.path.exists(path):
+                os.remove(path)
+    return len(duplicates)
+
+def crop_clock_parallel(args):
+    cap = cv2.VideoCapture(args.video)
+    if not cap.isOpened():
+        print("Error: Cannot open video.")
+        return
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    if total_frames <= 0:
+        print("Error: Unknown frame count, cannot shard this video. Run with --workers 1.")
+        return
+
+    # Several shards per worker keeps the pool busy when shards finish unevenly
+    num_shards = max(1, args.workers * 4)
+    bounds = np.linspace(0, total_frames, num_shards + 1).astype(int)
+    shards = [(s, e) for s, e in zip(bounds[:-1], bounds[1:]) if e > s]
+
+    print(f"🎬 Processing {total_frames} frames in {len(shards)} shards with {args.workers} workers...")
+    start_time = time.perf_counter()
+    total_read, total_saved = 0, 0
+
+    shard_results = {}
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(args.model, args.conf)) as pool:
+        futures = {pool.submit(process_shard, args, s, e): (s, e) for s, e in shards}
+        for future in as_completed(futures):
+            s, e = futures[future]
+            frames, saved, indexed = future.result()
+            total_read += frames
+            total_saved += saved
+            shard_results[s] = indexed
+            print(f"✅ Shard {s}-{e}: {frames} frames, {saved} crops")
+
+    dedup = create_dedup(args)
+    if dedup is not None:
+        removed = merge_shard_hashes(args, dedup, [shard_results[s] for s in sorted(shard_results)])
+        total_saved -= removed
+        print(f"✅ Removed {removed} duplicates across shards")
+        dedup.save()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Done: {total_read} frames, {total_saved} crops in {elapsed:.1f}s ({total_read / max(elapsed, 1e-6):.1f} frames/sec)")
+
 def crop_clock(args):
     if not os.path.exists(args.video):
         print(f"Error: Video not found at: {args.video}")
         return
-    
-    print(f"⏳ Loading Model from {args.model}...")
-    detector = ClockDetector(model_path=args.model, conf_threshold=args.conf)
 
     if not os.path.exists(args.output_dir):
         os.makedirs(args.output_dir)
 
+    if args.headless:
+        if args.workers > 1:
+            crop_clock_parallel(args)
+        else:
+            print(f"⏳ Loading Model from {args.model}...")
+            # Single process: default threading, only pool workers are pinned to one thread
+            detector = ClockDetector(model_path=args.model, conf_threshold=args.conf)
+            start_time = time.perf_counter()
+            # Open-ended range, the shard stops when grab() fails at the end of the video
+            frames, saved, indexed = process_shard(args, 0, sys.maxsize, detector)
+            dedup = create_dedup(args)
+            if dedup is not None:
+                for h, _ in indexed:
+                    dedup.add_hash(h)
+                dedup.save()
+            elapsed = time.perf_counter() - start_time
+            print(f"Done: {frames} frames, {saved} crops in {elapsed:.1f}s ({frames / max(elapsed, 1e-6):.1f} frames/sec)")
+        return
+    
+    print(f"⏳ Loading Model from {args.model}...")
+    detector = ClockDetector(model_path=args.model, conf_threshold=args.conf)
+
     # Open video
     cap = cv2.VideoCapture(args.video)
     if not cap.isOpened():
         print("Error: Cannot open video.")
         return
     
+    writer = create_writer(args)
+    dedup = create_dedup(args)
+
+    # With --target_fps the stride adapts to the measured frame time, starting from --stride
+    controller = None
+    if args.target_fps:
+        controller = LatencyController(1000.0 / args.target_fps, max_pose_stride=args.max_stride, max_digit_interval=1)
+        controller.pose_stride = min(args.stride, args.max_stride)
+
     print("🎬 Processing... Press 'q' to quit.")
     frame_count = 0
-    saved_count = 0
+    frame = None
 
     while True:
-        ret, frame = cap.read()
+        frame_start = time.perf_counter()
+        ret, frame = cap.read(image=frame)
         if not ret:
             print("End of video or cannot read the frame.")
             break
 
         frame_count += 1
 
-        # Only process and save every 3rd frame
-        if frame_count % 3 == 0:
+        # Only process and save every `stride`-th frame
+        due = controller.pose_due() if controller is not None else frame_count % args.stride == 0
+        if due:
             # Detect keypoints
             keypoints = detector.detect(frame)
 
             # If detected, warp and save the cropped clock image
             if keypoints is not None:
-                try:
-                    warped_img = four_point_transform(frame, keypoints, settings.warp_size)
-
-                    blur_score = get_blur_score(warped_img)
-                    
-                    if blur_score > args.blur_threshold:
-                        timestamp = int(cap.get(cv2.CAP_PROP_POS_MSEC))
-                        output_path = os.path.join(args.output_dir, f"clock_{timestamp}ms.jpg")
-                        saved_count += 1
-
-                        cv2.imwrite(output_path, warped_img)
-                        print(f"✅ Saved (Score: {blur_score:.1f}): {output_path}")
-
-                    else:
-                        print(f"❌ Skipped Blurry Image (Score: {blur_score:.1f} < {args.blur_threshold})")
-                except Exception as e:
-                    print(f"Error during warping: {e}")
+                timestamp = int(cap.get(cv2.CAP_PROP_POS_MSEC))
+                save_crop(frame, keypoints, timestamp, args, writer, dedup)
 
         cv2.imshow("Video Cropping", frame)
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
+        if controller is not None and controller.update((time.perf_counter() - frame_start) * 1000):
+            print(f"⚙️  Stride -> {controller.pose_stride} ({controller.latency_ms:.1f} ms/frame)")
+
     cap.release()
     cv2.destroyAllWindows()
+    if writer is not None:
+        writer.close()
+    if dedup is not None:
+        dedup.save()
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Crop Clock from Video using ClockDetector")
     parser.add_argument('--model', type=str, default='best.pt', help='Path to the YOLO model file.')
@@ -81,6 +297,15 @@ if __name__ == "__main__":
     parser.add_argument('--output_dir', type=str, default='cropped_clocks', help='Directory to save cropped clock images.')
     parser.add_argument('--conf', type=float, default=0.4, help='Confidence threshold for detection.')
     parser.add_argument('--blur_threshold', type=float, default=70.0, help='Blur score threshold to filter images.')
+    parser.add_argument('--stride', type=int, default=3, help='Run the detector on every N-th frame.')
+    parser.add_argument('--target_fps', type=float, default=None, help='Interactive only: adapt the stride to keep this frame rate.')
+    parser.add_argument('--max_stride', type=int, default=10, help='Upper bound for the adaptive stride.')
+    parser.add_argument('--headless', action='store_true', help='No preview window; skipped frames are only grabbed.')
+    parser.add_argument('--sink', type=str, default='images', choices=['images', 'shards'], help="Write one JPEG per crop, or append to indexed shard files.")
+    parser.add_argument('--shard_size_mb', type=int, default=256, help='Shard sink: maximum size of one shard file.')
+    parser.add_argument('--dedup_index', type=str, default=None, help='Perceptual-hash index file (.npy); skips crops already captured, persists across runs.')
+    parser.add_argument('--dedup_distance', type=int, default=3, help='Max Hamming distance (of 512 bits) for a crop to count as a duplicate; two different readings are at least 5 apart.')
+    parser.add_argument('--workers', type=int, default=1, help='Headless only: number of processes, each with its own detector.')
 
     args = parser.parse_args()
     crop_clock(args)
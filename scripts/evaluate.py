@@ -0,0 +1,364 @@
+import os
+import sys
+import csv
+import json
+import time
+import hashlib
+import argparse
+import platform
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.core import settings
+from src.utils.geometry import INTERPOLATIONS
+
+STAGES = ["decode", "pose", "warp", "digits"]
+
+def normalize(text):
+    # Readings are compared as digit strings: "12:34" == "1234"
+    return "".join(ch for ch in (text or "") if ch.isdigit())
+
+def file_hash(path):
+    """
+    sha1 of a file, or of every file in a folder (OpenVINO model directories).
+    """
+    digest = hashlib.sha1()
+    paths = [path] if os.path.isfile(path) else sorted(
+        os.path.join(dirpath, name) for dirpath, _, names in os.walk(path) for name in names)
+    for p in paths:
+        with open(p, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+def params_hash(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:16]
+
+def load_labels(path):
+    """
+    CSV with columns source, frame, time. `frame` is empty for images and the
+    frame index for videos; `time` is the expected reading.
+    Output:
+        - {source: [(frame index or None, expected), ...]}
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    samples = defaultdict(list)
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            source = row["source"] if os.path.isabs(row["source"]) else os.path.join(base, row["source"])
+            frame = row.get("frame", "").strip()
+            samples[source].append((int(frame) if frame else None, row["time"].strip()))
+    return samples
+
+
+class StageCache:
+    """
+    Keypoints and warped crops on disk, one .npz per frame and stage.
+    Keys combine the source content hash, the frame index, the hash of the
+    model that produced the data and the parameters of every stage up to it,
+    so changing only the digit settings still hits both stages.
+    """
+    def __init__(self, root):
+        self.root = root
+        if root is not None:
+            for stage in ("pose", "warp"):
+                os.makedirs(os.path.join(root, stage), exist_ok=True)
+
+    def _path(self, stage, key):
+        return os.path.join(self.root, stage, key[:2], key + ".npz")
+
+    def get(self, stage, key):
+        if self.root is None:
+            return None
+        path = self._path(stage, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return {name: data[name] for name in data.files}
+        except Exception:
+            # Truncated file from an interrupted run
+            return None
+
+    def content_hash(self, path):
+        """
+        file_hash, remembered per (path, size, mtime) so big videos are read once.
+        """
+        if self.root is None:
+            return file_hash(path)
+
+        stat = os.stat(path)
+        memo = os.path.join(self.root, "hashes", params_hash(os.path.abspath(path), stat.st_size, stat.st_mtime_ns) + ".txt")
+        if os.path.exists(memo):
+            with open(memo, 'r') as f:
+                return f.read().strip()
+
+        digest = file_hash(path)
+        os.makedirs(os.path.dirname(memo), exist_ok=True)
+        with open(memo + f".{os.getpid()}.tmp", 'w') as f:
+            f.write(digest)
+        os.replace(memo + f".{os.getpid()}.tmp", memo)
+        return digest
+
+    def put(self, stage, key, **arrays):
+        if self.root is None:
+            return
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+
+def init_worker(config):
+    global _config, _reader, _cache
+    # One OpenCV thread per process, the pool provides the parallelism
+    cv2.setNumThreads(1)
+    from src.detectors import SevenSegmentDecoder
+    from src.services.clock_reader import ClockReader
+
+    _config = config
+    _cache = StageCache(config["cache_dir"])
+
+    segment_decoder = None
+    if settings.segment_decoder_enabled:
+        segment_decoder = SevenSegmentDecoder(digit_cells=settings.segment_layout, min_confidence=settings.segment_min_confidence)
+
+    # lazy_load: a fully cached pose stage never loads the pose model
+    _reader = ClockReader(
+        pose_model_path=config["pose_model"],
+        digit_model_path=config["digit_model"],
+        pose_conf=settings.pose_conf,
+        digit_conf=settings.digit_conf,
+        warp_size=settings.warp_size,
+        interpolation=INTERPOLATIONS[settings.warp_interpolation],
+        segment_decoder=segment_decoder,
+        backend=settings.backend,
+        num_threads=config["threads"],
+        lazy_load=True,
+        draw=False
+    )
+
+def iter_frames(source, frames):
+    """
+    Yields (frame index or None, image) for the requested frames of one source.
+    Video frames that are not requested are only grabbed, never decoded.
+    """
+    if not frames:
+        return
+    if frames == [None]:
+        yield None, cv2.imread(source)
+        return
+
+    cap = cv2.VideoCapture(source)
+    position = 0
+    for index in sorted(frames):
+        while position < index and cap.grab():
+            position += 1
+        ret, image = cap.read()
+        position += 1
+        yield index, image if ret else None
+    cap.release()
+
+def evaluate_source(source, samples):
+    """
+    Full pipeline over the labeled frames of one image or video.
+    Frames whose keypoints and crop are both cached are not even decoded.
+    Output:
+        - (list of per-sample records, {stage: [seconds, ...]}, cache hit counts)
+    """
+    config, reader, cache = _config, _reader, _cache
+    content = cache.content_hash(source)
+    expected = defaultdict(list)
+    for frame, text in samples:
+        expected[frame].append(text)
+
+    records, timings, hits = [], defaultdict(list), defaultdict(int)
+
+    plans = {}
+    for index in expected:
+        pose_key = params_hash(content, index, config["pose_hash"], config["pose_params"])
+        warp_key = params_hash(pose_key, config["warp_params"])
+        pose = cache.get("pose", pose_key)
+        warp = cache.get("warp", warp_key) if pose is not None and pose["found"] else None
+        plans[index] = (pose_key, warp_key, pose, warp)
+
+    def complete(plan):
+        _, _, pose, warp = plan
+        return pose is not None and (not pose["found"] or warp is not None)
+
+    def run(index, image):
+        pose_key, warp_key, pose, warp = plans[index]
+
+        keypoints, score, crop = None, 0.0, None
+        if pose is not None:
+            hits["pose"] += 1
+            keypoints = pose["keypoints"] if pose["found"] else None
+            score = float(pose["score"])
+        elif image is not None:
+            # Model loading is not pose latency
+            reader.pose_detector.load()
+            start = time.perf_counter()
+            keypoints, score = reader.pose_detector.detect(image, return_score=True)
+            timings["pose"].append(time.perf_counter() - start)
+            cache.put("pose", pose_key, found=keypoints is not None,
+                      keypoints=keypoints if keypoints is not None else np.zeros((4, 2), np.float32), score=score)
+
+        if keypoints is not None:
+            if warp is not None:
+                hits["warp"] += 1
+                crop = warp["crop"]
+            elif image is not None:
+                start = time.perf_counter()
+                crop = reader.warp(image, keypoints, reuse_output=False)
+                timings["warp"].append(time.perf_counter() - start)
+                cache.put("warp", warp_key, crop=crop)
+
+        predicted = None
+        if crop is not None:
+            reader.digit_detector.load()
+            start = time.perf_counter()
+            predicted = "".join(reader.read_digits(crop))
+            timings["digits"].append(time.perf_counter() - start)
+
+        for text in expected[index]:
+            records.append({
+                "source": source,
+                "frame": index,
+                "expected": text,
+                "predicted": predicted,
+                "detected": keypoints is not None,
+                "pose_conf": score,
+                "correct": predicted is not None and normalize(predicted) == normalize(text),
+            })
+
+    for index in expected:
+        if complete(plans[index]):
+            run(index, None)
+
+    frames = iter_frames(source, [i for i in expected if not complete(plans[i])])
+    while True:
+        start = time.perf_counter()
+        try:
+            index, image = next(frames)
+        except StopIteration:
+            break
+        timings["decode"].append(time.perf_counter() - start)
+        run(index, image)
+
+    return records, timings, hits
+
+def summarize(records, timings, hits, elapsed):
+    total = len(records)
+    correct = sum(r["correct"] for r in records)
+    detected = sum(r["detected"] for r in records)
+
+    latency = {}
+    for stage in STAGES:
+        values = np.array(timings.get(stage, [])) * 1000
+        latency[stage] = {
+            "count": int(values.size),
+            "p50_ms": float(np.percentile(values, 50)) if values.size else None,
+            "p95_ms": float(np.percentile(values, 95)) if values.size else None,
+            "mean_ms": float(values.mean()) if values.size else None,
+        }
+
+    return {
+        "samples": total,
+        "exact_match": correct / total if total else 0.0,
+        "detection_rate": detected / total if total else 0.0,
+        # Of the detected clocks, how many were read correctly
+        "read_accuracy": correct / detected if detected else 0.0,
+        "latency": latency,
+        "cache_hits": dict(hits),
+        "elapsed_s": elapsed,
+    }
+
+def evaluate(args):
+    samples = load_labels(args.labels)
+    missing = [source for source in samples if not os.path.exists(source)]
+    for source in missing:
+        print(f"❌ Missing source, skipped: {source}")
+        del samples[source]
+
+    pose_model = args.pose or settings.pose_model_path
+    digit_model = args.digit or settings.digit_model_path
+    print(f"⏳ Hashing models...")
+    config = {
+        "pose_model": pose_model,
+        "digit_model": digit_model,
+        "pose_hash": file_hash(pose_model),
+        "pose_params": [settings.pose_conf, settings.backend],
+        "warp_params": [list(settings.warp_size), settings.warp_interpolation],
+        "cache_dir": None if args.no_cache else args.cache_dir,
+        "threads": args.threads,
+    }
+
+    records, timings, hits = [], defaultdict(list), defaultdict(int)
+    start_time = time.perf_counter()
+    print(f"🚀 Evaluating {sum(len(s) for s in samples.values())} samples from {len(samples)} sources with {args.workers} workers...")
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(config,)) as executor:
+        # Largest sources first, so one long video doesn't finish last
+        order = sorted(samples, key=lambda s: len(samples[s]), reverse=True)
+        futures = {executor.submit(evaluate_source, source, samples[source]): source for source in order}
+        for future in as_completed(futures):
+            try:
+                source_records, source_timings, source_hits = future.result()
+            except Exception as e:
+                print(f"❌ {futures[future]}: {e}")
+                continue
+            records.extend(source_records)
+            for stage, values in source_timings.items():
+                timings[stage].extend(values)
+            for stage, count in source_hits.items():
+                hits[stage] += count
+
+    summary = summarize(records, timings, hits, time.perf_counter() - start_time)
+
+    print(f"✅ Exact match: {summary['exact_match']:.2%} ({summary['samples']} samples), "
+          f"detection rate: {summary['detection_rate']:.2%}, read accuracy: {summary['read_accuracy']:.2%}")
+    for stage, stats in summary["latency"].items():
+        if stats["count"]:
+            print(f"   {stage:<8} p50 {stats['p50_ms']:7.2f} ms   p95 {stats['p95_ms']:7.2f} ms   ({stats['count']} runs)")
+    print(f"   cache hits: {summary['cache_hits']}   total {summary['elapsed_s']:.1f}s")
+
+    errors = [r for r in records if not r["correct"]]
+    for r in errors[:args.show_errors]:
+        where = f"{r['source']}" + (f" #{r['frame']}" if r["frame"] is not None else "")
+        print(f"❌ {where}: expected {r['expected']}, got {r['predicted']}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pose_model": pose_model,
+            "digit_model": digit_model,
+            "workers": args.workers,
+        },
+        "summary": summary,
+        "records": sorted(records, key=lambda r: (r["source"], r["frame"] if r["frame"] is not None else -1)),
+    }
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end evaluation of full clock readings on labeled images and videos")
+    parser.add_argument('--labels', type=str, required=True, help='CSV with columns source,frame,time (frame empty for images).')
+    parser.add_argument('--pose', type=str, default=None, help='Pose model (default: settings.yaml)')
+    parser.add_argument('--digit', type=str, default=None, help='Digit model (default: settings.yaml)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of processes, one source at a time each.')
+    parser.add_argument('--threads', type=int, default=1, help='Inference threads per process.')
+    parser.add_argument('--cache_dir', type=str, default='runs/eval_cache', help='Keypoint/crop cache, reused across runs.')
+    parser.add_argument('--no_cache', action='store_true', help='Run every stage, read and write no cache.')
+    parser.add_argument('--show_errors', type=int, default=20, help='Wrong readings to print.')
+    parser.add_argument('--output', type=str, default='runs/eval/report.json', help='Machine-readable report.')
+
+    args = parser.parse_args()
+    evaluate(args)
@@ -0,0 +1,43 @@
+from ultralytics import YOLO
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.core import logger
+
+def export_model(args):
+    if not os.path.exists(args.weights):
+        logger.error(f"Critical Error: Weights file not found at {args.weights}")
+        return None
+
+    try:
+        model = YOLO(args.weights)
+
+        # Exported graphs keep the names/kpt_shape metadata the CPU backends rely on
+        exported_path = model.export(
+            format=args.format,
+            imgsz=args.imgsz,
+            dynamic=args.dynamic,
+            simplify=True,
+            opset=args.opset
+        )
+
+        logger.info(f"Exported {args.weights} -> {exported_path}")
+        logger.info("Point model.pose_path / model.digit_path in configs/settings.yaml to it to use this backend.")
+        return exported_path
+
+    except Exception as e:
+        logger.error(f"Export Failed: {e}")
+        raise e
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export Digital Clock Models for ONNX Runtime / OpenVINO")
+    parser.add_argument('--weights', type=str, required=True, help='Path to trained .pt file')
+    parser.add_argument('--format', type=str, default='onnx', choices=['onnx', 'openvino'], help='Export format')
+    parser.add_argument('--imgsz', type=int, default=640, help='Input image size (640 for pose, 320 for digits)')
+    parser.add_argument('--dynamic', action='store_true', help='Dynamic batch axis, needed for batched inference')
+    parser.add_argument('--opset', type=int, default=None, help='ONNX opset version')
+
+    args = parser.parse_args()
+    export_model(args)
@@ -0,0 +1,25 @@
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.utils.crop_store import CropShardReader
+
+def export_crops(args):
+    if not os.path.isdir(args.shard_dir):
+        print(f"Error: Shard directory not found at: {args.shard_dir}")
+        return
+
+    reader = CropShardReader(args.shard_dir)
+    print(f"⏳ Exporting {len(reader)} crops from {len(reader.shards)} shards...")
+
+    count = reader.export(args.output_dir)
+    print(f"✅ Exported {count} crops to {args.output_dir}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export crop shards (crop_clock.py --sink shards) back to an image folder")
+    parser.add_argument('--shard_dir', type=str, required=True, help='Directory with the .bin/.idx shard files.')
+    parser.add_argument('--output_dir', type=str, default='cropped_clocks', help='Directory to write clock_<timestamp>ms_<n>.jpg files.')
+
+    args = parser.parse_args()
+    export_crops(args)
@@ -0,0 +1,199 @@
+from ultralytics import YOLO
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import argparse
+import numpy as np
+import cv2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.core import logger
+from src.detectors.backends import create_backend, letterbox
+
+IMAGE_EXTS = ('*.jpg', '*.jpeg', '*.png', '*.bmp')
+
+def list_images(image_dir, limit):
+    paths = []
+    for ext in IMAGE_EXTS:
+        paths.extend(glob.glob(os.path.join(image_dir, '**', ext), recursive=True))
+    paths.sort()
+
+    # Spread the calibration set over the whole folder instead of taking the first N
+    if len(paths) > limit:
+        idx = np.linspace(0, len(paths) - 1, limit).astype(int)
+        paths = [paths[i] for i in idx]
+    return paths
+
+def quantize_onnx(fp32_path, calib_paths, imgsz):
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    class LetterboxReader(CalibrationDataReader):
+        def __init__(self, input_name):
+            self.input_name = input_name
+            self.paths = iter(calib_paths)
+
+        def get_next(self):
+            for path in self.paths:
+                image = cv2.imread(path)
+                if image is None:
+                    continue
+                blob, _ = letterbox(image, (imgsz, imgsz))
+                return {self.input_name: blob[None]}
+            return None
+
+    fp32_model = onnx.load(fp32_path)
+    input_name = fp32_model.graph.input[0].name
+    int8_path = fp32_path.replace('.onnx', '_int8.onnx')
+
+    quantize_static(
+        fp32_path, int8_path, LetterboxReader(input_name),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True
+    )
+
+    # Keep names/kpt_shape/imgsz so the runtime backends can decode the outputs
+    int8_model = onnx.load(int8_path)
+    del int8_model.metadata_props[:]
+    int8_model.metadata_props.extend(fp32_model.metadata_props)
+    onnx.save(int8_model, int8_path)
+
+    return int8_path
+
+def quantize_openvino(weights, data, imgsz):
+    # Ultralytics drives NNCF post-training quantization with the dataset from data.yaml
+    fp32_path = YOLO(weights).export(format='openvino', imgsz=imgsz)
+    int8_path = YOLO(weights).export(format='openvino', imgsz=imgsz, int8=True, data=data)
+    return fp32_path, int8_path
+
+def measure_latency(model_path, image_paths, imgsz, task, warmup=5, runs=100):
+    backend = create_backend(model_path, task=task)
+    images = [img for img in (cv2.imread(p) for p in image_paths[:runs]) if img is not None]
+
+    for image in images[:warmup]:
+        backend.predict([image], conf=0.25, imgsz=imgsz)
+
+    latencies = []
+    for image in images:
+        start = time.perf_counter()
+        backend.predict([image], conf=0.25, imgsz=imgsz)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies = np.array(latencies)
+    return {
+        "latency_mean_ms": float(latencies.mean()),
+        "latency_p50_ms": float(np.percentile(latencies, 50)),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+        "throughput_fps": float(1000.0 / latencies.mean()),
+    }
+
+def measure_accuracy(model_path, args, task):
+    # Same metrics scripts/test.py logs
+    metrics = YOLO(model_path, task=task).val(
+        data=args.data,
+        imgsz=args.imgsz,
+        batch=1,
+        device='cpu',
+        conf=args.conf,
+        iou=args.iou,
+        split=args.split,
+        project=f'runs/{args.selection}_quant',
+        name=os.path.basename(str(model_path)),
+        exist_ok=True,
+        plots=False,
+        verbose=False
+    )
+    return {"map50_95": float(metrics.box.map), "map50": float(metrics.box.map50)}
+
+def quantize_model(args, mode='detection'):
+    if not os.path.exists(args.weights):
+        logger.error(f"Critical Error: Weights file not found at {args.weights}")
+        return
+    if not os.path.exists(args.data):
+        logger.error(f"Critical Error: Data file not found at {args.data}")
+        return
+
+    calib_paths = list_images(args.calib_dir, args.num_calib)
+    if not calib_paths:
+        logger.error(f"Critical Error: No calibration images found in {args.calib_dir}")
+        return
+
+    task = 'pose' if mode == 'detection' else 'detect'
+
+    try:
+        # 1. Build FP32 and INT8 variants
+        logger.info(f"Quantizing {args.weights} with {len(calib_paths)} calibration images...")
+        if args.format == 'onnx':
+            fp32_path = YOLO(args.weights).export(format='onnx', imgsz=args.imgsz, simplify=True)
+            int8_path = quantize_onnx(fp32_path, calib_paths, args.imgsz)
+        else:
+            fp32_path, int8_path = quantize_openvino(args.weights, args.data, args.imgsz)
+
+        # 2. Compare latency/throughput and accuracy
+        report = {"mode": mode, "format": args.format, "calibration_images": len(calib_paths), "models": {}}
+        for label, path in (("pytorch_fp32", args.weights), (f"{args.format}_fp32", fp32_path), (f"{args.format}_int8", int8_path)):
+            logger.info(f"Evaluating {label}: {path}")
+            entry = {"path": str(path)}
+            entry.update(measure_latency(str(path), calib_paths, args.imgsz, task))
+            entry.update(measure_accuracy(path, args, task))
+            report["models"][label] = entry
+
+        # 3. Log and save the report
+        logger.info(f"{'model':<16} {'mean ms':>9} {'p95 ms':>9} {'fps':>8} {'mAP50-95':>9} {'mAP50':>8}")
+        for label, entry in report["models"].items():
+            logger.info(f"{label:<16} {entry['latency_mean_ms']:>9.2f} {entry['latency_p95_ms']:>9.2f} "
+                        f"{entry['throughput_fps']:>8.1f} {entry['map50_95']:>9.4f} {entry['map50']:>8.4f}")
+
+        os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        if args.output:
+            if os.path.isdir(int8_path):
+                shutil.copytree(int8_path, args.output, dirs_exist_ok=True)
+            else:
+                shutil.copy(int8_path, args.output)
+            int8_path = args.output
+
+        logger.info(f"Report saved to: {args.report}")
+        logger.info(f"INT8 model: {int8_path} (set it as model.{'pose' if mode == 'detection' else 'digit'}_path in configs/settings.yaml)")
+
+    except Exception as e:
+        logger.error(f"Quantization Failed: {e}")
+        raise e
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build INT8 variants of the Digital Clock Models")
+    subparsers = parser.add_subparsers(dest='selection', required=True, help='Choose model')
+
+    def add_common_quant_args(sub_p):
+        sub_p.add_argument('--weights', type=str, required=True, help='Path to trained .pt file')
+        sub_p.add_argument('--data', type=str, required=True, help='Path to data.yaml file (accuracy + OpenVINO calibration)')
+        sub_p.add_argument('--calib_dir', type=str, required=True, help='Folder of calibration images (dataset images or crop_clock.py output)')
+        sub_p.add_argument('--num_calib', type=int, default=200, help='Number of calibration images')
+        sub_p.add_argument('--format', type=str, default='onnx', choices=['onnx', 'openvino'], help='Runtime format')
+        sub_p.add_argument('--conf', type=float, default=0.25, help='Confidence threshold')
+        sub_p.add_argument('--iou', type=float, default=0.6, help='NMS IoU threshold')
+        sub_p.add_argument('--split', type=str, default='val', choices=['val', 'test'], help="Dataset split to use ('val' or 'test')")
+        sub_p.add_argument('--output', type=str, default=None, help='Optional final path for the INT8 model')
+
+    # Detection
+    parser_det = subparsers.add_parser('detection', help='Quantize Pose Model (Find Clock)')
+    parser_det.add_argument('--imgsz', type=int, default=640, help='Input image size')
+    parser_det.add_argument('--report', default='runs/quantize/pose_report.json', help='Report output path')
+    add_common_quant_args(parser_det)
+
+    # Recognition
+    parser_rec = subparsers.add_parser('recognition', help='Quantize Recognition Model (Read Digits)')
+    parser_rec.add_argument('--imgsz', type=int, default=320, help='Input image size')
+    parser_rec.add_argument('--report', default='runs/quantize/digit_report.json', help='Report output path')
+    add_common_quant_args(parser_rec)
+
+    args = parser.parse_args()
+
+    quantize_model(args, mode=args.selection)
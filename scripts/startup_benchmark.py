@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+PHASES = ["interpreter_s", "import_s", "load_s", "warmup_s", "first_read_s", "time_to_first_reading_s"]
+
+def child(args):
+    """
+    One cold start, in a fresh interpreter: imports, model load, warm-up, first reading.
+    Prints the phase timings as a single JSON line.
+    """
+    started = time.time()
+
+    t0 = time.perf_counter()
+    from main import build_clock_service
+    from src.core import settings
+    from src.utils.synthetic import generate_clock_scene
+    import numpy as np
+    import_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    clock_service = build_clock_service(args.pose, args.digit, lazy_load=args.lazy)
+    load_s = time.perf_counter() - t0
+
+    frame_shape = (settings.camera_height, settings.camera_width)
+    warmup_s = clock_service.warmup(frame_shape) if args.warmup else 0.0
+
+    frame, _ = generate_clock_scene((frame_shape[1], frame_shape[0]), "12:34", np.random.default_rng(0))
+    t0 = time.perf_counter()
+    result = clock_service.read(frame)
+    first_read_s = time.perf_counter() - t0
+
+    print(json.dumps({
+        "interpreter_s": started - args.launched_at,
+        "import_s": import_s,
+        "load_s": load_s,
+        "warmup_s": warmup_s,
+        "first_read_s": first_read_s,
+        "time_to_first_reading_s": time.time() - args.launched_at,
+        "detected": result.detected,
+    }))
+
+def run_once(args, lazy):
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', '--launched_at', repr(time.time())]
+    if args.pose:
+        cmd += ['--pose', args.pose]
+    if args.digit:
+        cmd += ['--digit', args.digit]
+    if not args.warmup:
+        cmd += ['--no_warmup']
+    if lazy:
+        cmd += ['--lazy']
+
+    output = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    # Model loaders may print to stdout too; the timings are the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(runs):
+    summary = {}
+    for phase in PHASES:
+        values = sorted(run[phase] for run in runs)
+        summary[phase] = {
+            "median": values[len(values) // 2],
+            "max": values[-1],
+        }
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start benchmark: time from process launch to the first reading")
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes per mode')
+    parser.add_argument('--pose', type=str, default=None, help='Pose model (default: settings.yaml)')
+    parser.add_argument('--digit', type=str, default=None, help='Digit model (default: settings.yaml)')
+    parser.add_argument('--tiny', action='store_true', help='Use tiny random models from scripts/benchmark.py (no trained weights needed)')
+    parser.add_argument('--no_warmup', dest='warmup', action='store_false', help='Skip the warm-up call before the first reading')
+    parser.add_argument('--budget', type=float, default=None, help='Fail (exit 1) if the median time to first reading exceeds this many seconds')
+    parser.add_argument('--output', type=str, default='runs/benchmark/startup.json', help='Machine-readable results file')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--lazy', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--launched_at', type=float, default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        sys.exit(0)
+
+    if args.tiny:
+        from benchmark import build_tiny_models
+        model_dir = tempfile.mkdtemp(prefix="clock_startup_")
+        print(f"🔧 Building tiny random models in {model_dir}...")
+        args.pose, args.digit = build_tiny_models(model_dir)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "runs": args.runs,
+            "warmup": args.warmup,
+        },
+        "modes": {},
+    }
+
+    for mode in ("eager", "lazy"):
+        print(f"🚀 {mode}: {args.runs} cold starts...")
+        runs = [run_once(args, lazy=(mode == "lazy")) for _ in range(args.runs)]
+        summary = summarize(runs)
+        report["modes"][mode] = {"summary": summary, "runs": runs}
+
+        for phase in PHASES:
+            print(f"   {phase:<24} median {summary[phase]['median'] * 1000:8.1f} ms   max {summary[phase]['max'] * 1000:8.1f} ms")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to: {args.output}")
+
+    if args.budget is not None:
+        worst = max(mode["summary"]["time_to_first_reading_s"]["median"] for mode in report["modes"].values())
+        if worst > args.budget:
+            print(f"❌ Time to first reading {worst:.2f}s exceeds the {args.budget:.2f}s budget")
+            sys.exit(1)
+        print(f"✅ Time to first reading {worst:.2f}s is within the {args.budget:.2f}s budget")
@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.services.stream_server import ResultStreamServer
+
+async def subscribe(host, port, name, delay=0.0, count=0, verbose=True):
+    """
+    Read the /readings event stream. `delay` seconds per event simulates a slow consumer.
+    Output:
+        - number of events received
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"GET /readings HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+    await writer.drain()
+
+    # Response headers
+    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+        pass
+
+    received = 0
+    try:
+        while count <= 0 or received < count:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.startswith(b"data: "):
+                continue
+
+            received += 1
+            reading = json.loads(line[6:])
+            if verbose:
+                print(f"[{name}] {reading.get('time_text')} (frame {reading.get('frame_id')})")
+            if delay > 0:
+                await asyncio.sleep(delay)
+    finally:
+        writer.close()
+    return received
+
+def self_test(args):
+    # In-process server fed by a fake publisher, no camera or model needed
+    server = ResultStreamServer(port=0, client_buffer=args.buffer, max_lag=args.max_lag).start()
+    stop = threading.Event()
+
+    def publisher():
+        frame_id = 0
+        while not stop.is_set():
+            frame_id += 1
+            server.publish({"timestamp": time.time(), "frame_id": frame_id, "time_text": time.strftime("%H:%M")})
+            time.sleep(1.0 / args.rate)
+
+    async def run_clients():
+        await asyncio.sleep(0.1)
+        tasks = [
+            subscribe("127.0.0.1", server.port, f"client{i}",
+                      delay=args.slow_delay if i < args.slow else 0.0,
+                      count=args.count, verbose=False)
+            for i in range(args.clients)
+        ]
+        return await asyncio.gather(*tasks)
+
+    thread = threading.Thread(target=publisher, daemon=True)
+    thread.start()
+    start = time.perf_counter()
+    results = asyncio.run(run_clients())
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+
+    for i, received in enumerate(results):
+        kind = "slow" if i < args.slow else "fast"
+        print(f"client{i} ({kind}): {received} events")
+    print(f"Published {server.published} events in {elapsed:.1f}s, disconnected {server.disconnected} slow subscribers")
+    server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Subscribe to the ClockReader result stream (Server-Sent Events)")
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Server host')
+    parser.add_argument('--port', type=int, default=8765, help='Server port')
+    parser.add_argument('--clients', type=int, default=1, help='Number of concurrent subscribers')
+    parser.add_argument('--count', type=int, default=0, help='Stop each client after N events (0 = run forever)')
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds each client sleeps per event (slow consumer)')
+    parser.add_argument('--self_test', action='store_true', help='Start a local server with a fake publisher and exercise it')
+    parser.add_argument('--rate', type=float, default=1000.0, help='Self-test: events per second')
+    parser.add_argument('--slow', type=int, default=1, help='Self-test: how many of the clients are slow')
+    parser.add_argument('--slow_delay', type=float, default=0.05, help='Self-test: per-event delay of slow clients')
+    parser.add_argument('--buffer', type=int, default=64, help='Self-test: per-client buffer size')
+    parser.add_argument('--max_lag', type=int, default=256, help='Self-test: full-buffer publishes before a client is dropped')
+
+    args = parser.parse_args()
+
+    if args.self_test:
+        if args.count <= 0:
+            args.count = 500
+        self_test(args)
+    else:
+        async def main():
+            await asyncio.gather(*[
+                subscribe(args.host, args.port, f"client{i}", delay=args.delay, count=args.count)
+                for i in range(args.clients)
+            ])
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            pass
@@ -1,4 +1,13 @@
-from .config import settings
-from .logger import logger
+import importlib
 
-__all__ = ["settings", "logger"]
\ No newline at end of file
+# Resolved on first access: importing src.core reads no YAML and opens no log file
+_LAZY = {"settings": ".config", "logger": ".logger"}
+
+__all__ = ["settings", "logger"]
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
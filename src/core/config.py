@@ -1,17 +1,54 @@
-import yaml
 import os
+import threading
 
 class Config:
     def __init__(self, config_path="configs/settings.yaml"):
+        self.config_path = config_path
+        self._data = None
+        self._mtime = None
+
+    @property
+    def _config(self):
+        # settings.yaml is read on first access, so importing src.core stays cheap
+        if self._data is None:
+            self._data = self._load(self.config_path)
+        return self._data
+
+    def _resolve(self, config_path):
         if not os.path.exists(config_path):
             config_path = os.path.join(os.getcwd(), config_path)
-            
+        return config_path
+
+    def _load(self, config_path):
+        import yaml
+
+        config_path = self._resolve(config_path)
         if not os.path.exists(config_path):
             print(f"Warning: Config file not found at {config_path}")
-            self._config = {}
-        else:
-            with open(config_path, 'r') as f:
-                self._config = yaml.safe_load(f)
+            return {}
+
+        self._mtime = os.path.getmtime(config_path)
+        with open(config_path, 'r') as f:
+            return yaml.safe_load(f) or {}
+
+    def reload_if_changed(self):
+        """
+        Re-read settings.yaml if it was modified since the last load.
+        A file that fails to parse (e.g. saved mid-edit) keeps the previous values.
+        Output:
+            - True if new values were loaded
+        """
+        config_path = self._resolve(self.config_path)
+        if not os.path.exists(config_path) or os.path.getmtime(config_path) == self._mtime:
+            return False
+
+        try:
+            self._data = self._load(self.config_path)
+        except Exception as e:
+            self._mtime = os.path.getmtime(config_path)
+            print(f"Warning: Config reload failed, keeping previous settings: {e}")
+            return False
+        return True
 
     @property
     def pose_model_path(self):
@@ -29,6 +66,33 @@ class Config:
     def digit_conf(self):
         return self._config.get('model', {}).get('digit_conf', 0.5)
 
+    @property
+    def backend(self):
+        # "auto", "ultralytics", "onnxruntime" or "openvino"
+        return self._config.get('model', {}).get('backend', 'auto')
+
+    @property
+    def num_threads(self):
+        # 0 = let the inference library decide
+        return self._config.get('model', {}).get('num_threads', 0)
+
+    @property
+    def roi_imgsz(self):
+        # 0 = always search the full frame
+        return self._config.get('model', {}).get('roi_imgsz', 0)
+
+    @property
+    def roi_margin(self):
+        return self._config.get('model', {}).get('roi_margin', 0.5)
+
+    @property
+    def lazy_load(self):
+        return self._config.get('model', {}).get('lazy_load', False)
+
+    @property
+    def warmup(self):
+        return self._config.get('model', {}).get('warmup', True)
+
     @property
     def camera_id(self):
         return self._config.get('camera', {}).get('id', 0)
@@ -47,9 +111,208 @@ class Config:
         h = self._config.get('processing', {}).get('warp_height', 128)
         return (w, h)
 
+    @property
+    def warp_interpolation(self):
+        # "nearest", "linear" or "cubic"
+        return self._config.get('processing', {}).get('interpolation', 'cubic')
+
+    @property
+    def warp_cache(self):
+        return self._config.get('processing', {}).get('warp_cache', False)
+
+    @property
+    def warp_cache_quantum(self):
+        return self._config.get('processing', {}).get('warp_cache_quantum', 1.0)
+
+    @property
+    def skip_unchanged(self):
+        return self._config.get('recognition', {}).get('skip_unchanged', False)
+
+    @property
+    def change_threshold(self):
+        return self._config.get('recognition', {}).get('change_threshold', 16.0)
+
+    @property
+    def segment_decoder_enabled(self):
+        return self._config.get('recognition', {}).get('segment_decoder', False)
+
+    @property
+    def segment_min_confidence(self):
+        return self._config.get('recognition', {}).get('segment_min_confidence', 0.5)
+
+    @property
+    def segment_layout(self):
+        # List of [x0, y0, x1, y1] digit cells as fractions of the warped crop, None = default
+        return self._config.get('recognition', {}).get('segment_layout')
+
+    @property
+    def multi_clock(self):
+        return self._config.get('recognition', {}).get('multi_clock', False)
+
+    @property
+    def max_clocks(self):
+        # 0 = no limit
+        return self._config.get('recognition', {}).get('max_clocks', 0) or None
+
+    @property
+    def instance_max_distance(self):
+        return self._config.get('recognition', {}).get('instance_max_distance', 0.5)
+
+    @property
+    def instance_max_age(self):
+        return self._config.get('recognition', {}).get('instance_max_age', 5)
+
+    @property
+    def time_model_enabled(self):
+        return self._config.get('recognition', {}).get('time_model', False)
+
+    @property
+    def time_model_params(self):
+        rec = self._config.get('recognition', {})
+        return {
+            "min_votes": rec.get('min_votes', 3),
+            "dense_window": rec.get('dense_window', 2.0),
+            "sparse_interval": rec.get('sparse_interval', 10.0),
+            "resync_after": rec.get('resync_after', 3),
+        }
+
+    @property
+    def latency_control_enabled(self):
+        return self._config.get('latency', {}).get('enabled', False)
+
+    @property
+    def latency_params(self):
+        lat = self._config.get('latency', {})
+        # target_fps, when set, takes precedence over target_ms
+        target_fps = lat.get('target_fps')
+        return {
+            "target_ms": 1000.0 / target_fps if target_fps else lat.get('target_ms', 100.0),
+            "max_pose_stride": lat.get('max_pose_stride', 4),
+            "imgsz_levels": lat.get('imgsz_levels', []),
+            "max_digit_interval": lat.get('max_digit_interval', 8),
+            "tolerance": lat.get('tolerance', 0.15),
+            "cooldown": lat.get('cooldown', 15),
+        }
+
+    @property
+    def tracking_enabled(self):
+        return self._config.get('tracking', {}).get('enabled', False)
+
+    @property
+    def redetect_interval(self):
+        return self._config.get('tracking', {}).get('redetect_interval', 15)
+
+    @property
+    def tracking_max_error(self):
+        return self._config.get('tracking', {}).get('max_error', 2.0)
+
+    @property
+    def runtime_mode(self):
+        # "sequential", "pipelined", "multi_stream" or "processes"
+        return self._config.get('runtime', {}).get('mode', 'sequential')
+
+    @property
+    def queue_size(self):
+        return self._config.get('runtime', {}).get('queue_size', 1)
+
+    @property
+    def report_interval(self):
+        return self._config.get('runtime', {}).get('report_interval', 5.0)
+
+    @property
+    def streams(self):
+        # List of {id, source, max_fps} used by runtime.mode: multi_stream
+        return self._config.get('streams', [])
+
+    @property
+    def max_batch(self):
+        return self._config.get('runtime', {}).get('max_batch', 8)
+
+    @property
+    def buffer_pool(self):
+        return self._config.get('runtime', {}).get('buffer_pool', True)
+
+    @property
+    def workers(self):
+        return self._config.get('runtime', {}).get('workers', 2)
+
+    @property
+    def worker_threads(self):
+        return self._config.get('runtime', {}).get('worker_threads', 1)
+
+    @property
+    def worker_slots(self):
+        # Shared-memory frame slots, 0 = two per worker
+        return self._config.get('runtime', {}).get('worker_slots', 0) or None
+
+    @property
+    def metrics_enabled(self):
+        return self._config.get('metrics', {}).get('enabled', False)
+
+    @property
+    def metrics_export(self):
+        # "log" (JSON lines through the app logger) or "prometheus"
+        return self._config.get('metrics', {}).get('export', 'log')
+
+    @property
+    def metrics_port(self):
+        return self._config.get('metrics', {}).get('port', 9100)
+
+    @property
+    def metrics_interval(self):
+        return self._config.get('metrics', {}).get('interval', 10.0)
+
+    @property
+    def hot_reload(self):
+        return self._config.get('app', {}).get('hot_reload', True)
+
+    @property
+    def reload_interval(self):
+        return self._config.get('app', {}).get('reload_interval', 2.0)
+
+    @property
+    def headless(self):
+        # No windows and no debug drawing
+        return self._config.get('app', {}).get('headless', False)
+
+    @property
+    def sinks(self):
+        # Result sinks, e.g. [{type: stdout}, {type: file, path: ...}, {type: socket, address: ...}]
+        return self._config.get('output', {}).get('sinks', [])
+
     @property
     def debug_mode(self):
         return self._config.get('app', {}).get('debug_mode', True)
 
+class SettingsWatcher:
+    """
+    Polls settings.yaml in a background thread and calls `on_change(settings)`
+    after the file was modified and re-read.
+    """
+    def __init__(self, config, on_change, interval=2.0):
+        self.config = config
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="settings-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if self.config.reload_if_changed():
+                    self.on_change(self.config)
+            except Exception as e:
+                print(f"Warning: Settings reload error: {e}")
+
 # Initialize global object for use everywhere
 settings = Config()
\ No newline at end of file
@@ -7,10 +7,18 @@ from src.core.config import settings
 LOG_FORMAT = "%(asctime)s | %(levelname)-8s | %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+class _DelayedFileHandler(logging.FileHandler):
+    # Opens (and creates the folder for) the log file on the first record, not at import
+    def __init__(self, filename, encoding=None):
+        super().__init__(filename, encoding=encoding, delay=True)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
 def setup_logger():
-    # 1. Create 'logs' folder if it doesn't exist
+    # 1. 'logs' folder is created by the file handler when the first record is written
     log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
 
     # 2. Create the logger object
     logger = logging.getLogger("DigitalClockApp")
@@ -28,7 +36,7 @@ def setup_logger():
     logger.addHandler(console_handler)
 
     # 6. Handler 2: Save logs to 'app.log' file
-    file_handler = logging.FileHandler(log_dir / "app.log", encoding="utf-8")
+    file_handler = _DelayedFileHandler(log_dir / "app.log", encoding="utf-8")
     file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT))
     logger.addHandler(file_handler)
 
@@ -0,0 +1,212 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from src.core import logger
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.metrics.inc(f"{self.stage}_exceptions")
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class RollingHistogram:
+    """Keeps the last `size` samples (seconds); quantiles are computed on read."""
+    def __init__(self, size=1000):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantiles(self, qs=QUANTILES, samples=None):
+        samples = np.fromiter(self.samples, dtype=np.float64) if samples is None else samples
+        if len(samples) == 0:
+            return {q: 0.0 for q in qs}
+        values = np.quantile(samples, qs)
+        return dict(zip(qs, values.tolist()))
+
+
+class Metrics:
+    """
+    Per-stage timers and counters.
+    Usage:
+        with metrics.timer("pose"): ...
+        metrics.inc("detections")
+    Updated from the pipeline, stream and exporter threads, so every read and
+    write goes through one lock; readers work on a copy taken under it.
+    """
+    enabled = True
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.counters = defaultdict(int)
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def timer(self, stage):
+        return _Timer(self, stage)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = RollingHistogram(self.window)
+            hist.observe(seconds)
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def _copy(self):
+        # (counters, {stage: (histogram, count, total, samples)}) at one instant
+        with self._lock:
+            stages = {stage: (hist, hist.count, hist.total, np.fromiter(hist.samples, dtype=np.float64))
+                      for stage, hist in self.histograms.items()}
+            return dict(self.counters), stages
+
+    def snapshot(self):
+        counters, stages = self._copy()
+        return {
+            "counters": counters,
+            "stages": {
+                stage: {
+                    "count": count,
+                    "sum_s": total,
+                    **{f"p{int(q * 100)}_ms": v * 1000 for q, v in hist.quantiles(samples=samples).items()},
+                }
+                for stage, (hist, count, total, samples) in stages.items()
+            },
+        }
+
+    def prometheus_text(self, prefix="clock_reader"):
+        counters, stages = self._copy()
+        lines = []
+        for name, value in sorted(counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+
+        lines.append(f"# TYPE {prefix}_stage_seconds summary")
+        for stage, (hist, count, total, samples) in sorted(stages.items()):
+            for q, v in hist.quantiles(samples=samples).items():
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} {v:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics:
+    """Drop-in for Metrics when instrumentation is off: every call is a no-op."""
+    enabled = False
+    _timer = _NullTimer()
+
+    def timer(self, stage):
+        return self._timer
+
+    def observe(self, stage, seconds):
+        pass
+
+    def inc(self, name, value=1):
+        pass
+
+    def snapshot(self):
+        return {"counters": {}, "stages": {}}
+
+
+NULL_METRICS = NullMetrics()
+
+
+class PrometheusExporter:
+    """Serves metrics.prometheus_text() on http://<host>:<port>/metrics."""
+    def __init__(self, metrics, port=9100, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"Metrics endpoint: http://{self.server.server_address[0]}:{self.server.server_address[1]}/metrics")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class JsonLogExporter:
+    """Writes metrics.snapshot() as one JSON line through the app logger every `interval` seconds."""
+    def __init__(self, metrics, interval=10.0):
+        self.metrics = metrics
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="metrics-log", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+        self.flush()
+
+    def flush(self):
+        logger.info("metrics " + json.dumps(self.metrics.snapshot(), separators=(",", ":")))
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+
+def create_exporter(metrics, mode="log", port=9100, interval=10.0):
+    if not metrics.enabled:
+        return None
+    if mode == "prometheus":
+        return PrometheusExporter(metrics, port).start()
+    return JsonLogExporter(metrics, interval).start()
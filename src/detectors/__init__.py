@@ -1,4 +1,18 @@
-from .clock_detector import ClockDetector
-from .digit_detector import DigitDetector
+import importlib
 
-__all__ = ["ClockDetector", "DigitDetector"]
\ No newline at end of file
+# Detector modules (and cv2/numpy with them) are imported on first use
+_LAZY = {
+    "ClockDetector": ".clock_detector",
+    "DigitDetector": ".digit_detector",
+    "KeypointTracker": ".keypoint_tracker",
+    "SevenSegmentDecoder": ".segment_decoder",
+}
+
+__all__ = ["ClockDetector", "DigitDetector", "KeypointTracker", "SevenSegmentDecoder"]
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,249 @@
+import ast
+import os
+
+import cv2
+import numpy as np
+
+BACKENDS = ("auto", "ultralytics", "onnxruntime", "openvino")
+
+class Prediction:
+    """
+    Backend-independent result for one image.
+        - boxes: (N, 6) array [x_min, y_min, x_max, y_max, confidence, class_id], sorted by confidence
+        - keypoints: (N, K, 3) array [x, y, visibility] or None for detection models
+    """
+    def __init__(self, boxes, keypoints=None):
+        self.boxes = boxes
+        self.keypoints = keypoints
+
+
+class UltralyticsBackend:
+    def __init__(self, model_path, task=None, num_threads=0):
+        from ultralytics import YOLO
+
+        if num_threads > 0:
+            import torch
+            torch.set_num_threads(num_threads)
+
+        self.model = YOLO(model_path, task=task)
+        self.names = self.model.names
+
+    def predict(self, images, conf, imgsz=None):
+        kwargs = {"conf": conf, "verbose": False}
+        if imgsz is not None:
+            kwargs["imgsz"] = imgsz
+
+        predictions = []
+        for result in self.model.predict(list(images), **kwargs):
+            boxes = result.boxes.data.cpu().numpy() if result.boxes is not None else np.zeros((0, 6), dtype=np.float32)
+            keypoints = result.keypoints.data.cpu().numpy() if result.keypoints is not None else None
+            predictions.append(Prediction(boxes, keypoints))
+        return predictions
+
+
+class _ExportedBackend:
+    """
+    Shared pre/post-processing for exported YOLOv8 graphs (ONNX, OpenVINO).
+    The raw output is (B, 4 + num_classes + K*3, num_anchors).
+    """
+    iou_threshold = 0.7
+    max_det = 300
+
+    def _load_metadata(self, metadata):
+        self.names = {int(k): v for k, v in metadata.get("names", {}).items()}
+        self.kpt_shape = tuple(metadata["kpt_shape"]) if metadata.get("kpt_shape") else None
+        self._imgsz_warned = False
+
+        if self.dynamic_shape:
+            # Dynamic graphs run at the export size, like ultralytics; 640 only without metadata
+            imgsz = metadata.get("imgsz") or 640
+            height, width = (imgsz, imgsz) if isinstance(imgsz, int) else imgsz
+            self.input_size = (int(width), int(height))
+
+    def predict(self, images, conf, imgsz=None):
+        # imgsz only applies to graphs exported with dynamic spatial axes
+        images = list(images)
+        predictions = []
+        input_size = (imgsz, imgsz) if imgsz and self.dynamic_shape else self.input_size
+        if imgsz and not self.dynamic_shape and imgsz != max(self.input_size) and not self._imgsz_warned:
+            self._imgsz_warned = True
+            print(f"Warning: imgsz {imgsz} ignored, the graph has a fixed {self.input_size[0]}x{self.input_size[1]} input; export with dynamic=True to resize at runtime")
+
+        step = len(images) if self.dynamic_batch else 1
+        for start in range(0, len(images), step):
+            chunk = images[start:start + step]
+            blob, transforms = zip(*[letterbox(image, input_size) for image in chunk])
+            outputs = self._run(np.stack(blob))
+            for output, transform in zip(outputs, transforms):
+                predictions.append(self._decode(output, conf, transform))
+
+        return predictions
+
+    def _decode(self, output, conf, transform):
+        preds = output.T  # (num_anchors, channels)
+        num_classes = len(self.names)
+
+        scores = preds[:, 4:4 + num_classes]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(preds)), class_ids]
+
+        mask = confidences >= conf
+        preds, class_ids, confidences = preds[mask], class_ids[mask], confidences[mask]
+
+        # cx, cy, w, h -> x_min, y_min, x_max, y_max
+        xyxy = np.empty((len(preds), 4), dtype=np.float32)
+        xyxy[:, 0] = preds[:, 0] - preds[:, 2] / 2
+        xyxy[:, 1] = preds[:, 1] - preds[:, 3] / 2
+        xyxy[:, 2] = preds[:, 0] + preds[:, 2] / 2
+        xyxy[:, 3] = preds[:, 1] + preds[:, 3] / 2
+
+        keep = nms(xyxy, confidences, class_ids, self.iou_threshold)[:self.max_det]
+
+        gain, pad_x, pad_y, width, height = transform
+        xyxy = xyxy[keep]
+        xyxy[:, [0, 2]] = np.clip((xyxy[:, [0, 2]] - pad_x) / gain, 0, width)
+        xyxy[:, [1, 3]] = np.clip((xyxy[:, [1, 3]] - pad_y) / gain, 0, height)
+
+        boxes = np.concatenate([xyxy, confidences[keep, None], class_ids[keep, None].astype(np.float32)], axis=1)
+
+        keypoints = None
+        if self.kpt_shape is not None:
+            num_kpts, dims = self.kpt_shape
+            keypoints = preds[keep, 4 + num_classes:].reshape(-1, num_kpts, dims).copy()
+            keypoints[..., 0] = (keypoints[..., 0] - pad_x) / gain
+            keypoints[..., 1] = (keypoints[..., 1] - pad_y) / gain
+
+        return Prediction(boxes, keypoints)
+
+
+class OnnxRuntimeBackend(_ExportedBackend):
+    def __init__(self, model_path, task=None, num_threads=0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        shape = self.session.get_inputs()[0].shape
+        self.dynamic_batch = not isinstance(shape[0], int)
+        self.dynamic_shape = not isinstance(shape[2], int)
+        self.input_size = None if self.dynamic_shape else (shape[3], shape[2])
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self._load_metadata({k: _literal(v) for k, v in metadata.items()})
+
+    def _run(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVinoBackend(_ExportedBackend):
+    def __init__(self, model_path, task=None, num_threads=0):
+        import openvino as ov
+        import yaml
+
+        # Accept either the export folder or the .xml file inside it
+        if os.path.isdir(model_path):
+            xml_files = [f for f in os.listdir(model_path) if f.endswith(".xml")]
+            model_dir, model_path = model_path, os.path.join(model_path, xml_files[0])
+        else:
+            model_dir = os.path.dirname(model_path)
+
+        core = ov.Core()
+        model = core.read_model(model_path)
+
+        shape = model.inputs[0].get_partial_shape()
+        self.dynamic_batch = shape[0].is_dynamic
+        self.dynamic_shape = shape[2].is_dynamic
+        self.input_size = None if self.dynamic_shape else (shape[3].get_length(), shape[2].get_length())
+
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if num_threads > 0:
+            config["INFERENCE_NUM_THREADS"] = num_threads
+        self.compiled = core.compile_model(model, "CPU", config)
+
+        metadata = {}
+        metadata_path = os.path.join(model_dir, "metadata.yaml")
+        if os.path.exists(metadata_path):
+            with open(metadata_path, 'r') as f:
+                metadata = yaml.safe_load(f)
+        self._load_metadata(metadata)
+
+    def _run(self, blob):
+        return self.compiled(blob)[0]
+
+
+def letterbox(image, size):
+    """
+    Resize keeping aspect ratio and pad to `size` (width, height), like YOLOv8.
+    Output:
+        - CHW float32 RGB blob in [0, 1]
+        - (gain, pad_x, pad_y, width, height) to map predictions back
+    """
+    height, width = image.shape[:2]
+    target_w, target_h = size
+
+    gain = min(target_w / width, target_h / height)
+    new_w, new_h = int(round(width * gain)), int(round(height * gain))
+    pad_x, pad_y = (target_w - new_w) / 2, (target_h - new_h) / 2
+
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, left = int(round(pad_y - 0.1)), int(round(pad_x - 0.1))
+    canvas = cv2.copyMakeBorder(resized, top, target_h - new_h - top, left, target_w - new_w - left,
+                                cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+    blob = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB).transpose(2, 0, 1).astype(np.float32) / 255.0
+    return blob, (gain, left, top, width, height)
+
+def nms(boxes, scores, class_ids, iou_threshold):
+    """Class-aware greedy NMS. Returns kept indices sorted by score."""
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=int)
+
+    # Offset boxes per class so different classes never overlap
+    offset = boxes + (class_ids[:, None] * 4096.0)
+    x1, y1, x2, y2 = offset.T
+    areas = (x2 - x1) * (y2 - y1)
+
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-9)
+        order = order[1:][iou <= iou_threshold]
+
+    return np.array(keep, dtype=int)
+
+def create_backend(model_path, task=None, backend="auto", num_threads=0):
+    if backend == "auto":
+        if model_path.endswith(".onnx"):
+            backend = "onnxruntime"
+        elif model_path.endswith(".xml") or model_path.rstrip("/").endswith("_openvino_model"):
+            backend = "openvino"
+        else:
+            backend = "ultralytics"
+
+    if backend == "ultralytics":
+        return UltralyticsBackend(model_path, task, num_threads)
+    if backend == "onnxruntime":
+        return OnnxRuntimeBackend(model_path, task, num_threads)
+    if backend == "openvino":
+        return OpenVinoBackend(model_path, task, num_threads)
+
+    raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+def _literal(value):
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
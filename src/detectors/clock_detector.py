@@ -1,34 +1,164 @@
 import numpy as np
-from ultralytics import YOLO
+from .backends import create_backend
 
 class ClockDetector:
-    def __init__(self, model_path, conf_threshold):
-        print(f"Loading model pose from: {model_path}")
+    def __init__(self, model_path, conf_threshold, backend="auto", num_threads=0, roi_imgsz=None, roi_margin=0.5, lazy=False):
+        self.model_path = model_path
+        self.backend_name = backend
+        self.num_threads = num_threads
+        self.conf  = conf_threshold
+        self._backend = None
+
+        # lazy: the model is loaded on the first predict (or warmup) instead of here
+        if not lazy:
+            self.load()
+
+        # Search-window mode: when set, detect() looks in an expanded box around
+        # the previous keypoints at this (smaller) inference size
+        self.roi_imgsz = roi_imgsz
+        # Full-frame inference size, None = the model's own; set at runtime by LatencyController
+        self.imgsz = None
+        self.roi_margin = roi_margin
+        self.last_keypoints = None
+        
+    @property
+    def backend(self):
+        return self.load()
+
+    def load(self):
+        if self._backend is None:
+            print(f"Loading model pose from: {self.model_path}")
+            try:
+                self._backend = create_backend(self.model_path, task="pose", backend=self.backend_name, num_threads=self.num_threads)
+            except Exception as e:
+                print(f"Error: {e}")
+                raise e
+        return self._backend
+
+    def warmup(self, frame_shape, batch_size=1):
+        """
+        Dummy inference at the sizes used at runtime, so the first real frame
+        doesn't pay for lazy init, graph compilation or allocator growth.
+        """
+        frame = np.zeros((frame_shape[0], frame_shape[1], 3), dtype=np.uint8)
+        self.backend.predict([frame] * batch_size, conf=self.conf)
+        if self.roi_imgsz:
+            self.backend.predict([frame], conf=self.conf, imgsz=self.roi_imgsz)
+
+    def detect(self, image, return_score=False):
+        """
+        Output:
+            - keypoints (4, 2) or None; (keypoints, box confidence) if return_score
+        """
+        kpts, score = None, 0.0
         try:
-            self.model = YOLO(model_path)
-            self.conf  = conf_threshold
+            if self.roi_imgsz and self.last_keypoints is not None:
+                kpts, score = self._detect_roi(image)
+
+            if kpts is None:
+                # Full-frame search
+                results = self.backend.predict([image], conf=self.conf, imgsz=self.imgsz)
+                if len(results) > 0:
+                    kpts, score = self._parse_result(results[0])
+
+            self.last_keypoints = kpts
         except Exception as e:
-            print(f"Error: {e}")
-            raise e
-        
-    def detect(self, image):
+            print(f"Detect error: {e}")
+            self.last_keypoints = None
+            kpts, score = None, 0.0
+
+        return (kpts, score) if return_score else kpts
+
+    def detect_all(self, image, max_instances=None):
+        """
+        Every clock above the confidence threshold, not just the best one.
+        Output:
+            - list of (keypoints (4, 2), box confidence), highest confidence first
+        """
         try:
-            results = self.model.predict(image, conf=self.conf, verbose=False)
+            results = self.backend.predict([image], conf=self.conf, imgsz=self.imgsz)
+        except Exception as e:
+            print(f"Detect error: {e}")
+            return []
 
-            if len(results) == 0:
-                return None
-            
-            result = results[0]
-        
+        instances = self._parse_all(results[0]) if len(results) > 0 else []
+        return instances[:max_instances] if max_instances else instances
 
-            if result.keypoints is None or result.keypoints.data.shape[1] == 0:
-                return None
-            
-            kpts = result.keypoints.xy[0].cpu().numpy()
+    def search_window(self, image_shape):
+        """
+        Box around the last keypoints, grown by `roi_margin` of its size on each side.
+        Output:
+            - (x0, y0, x1, y1) clipped to the image
+        """
+        h, w = image_shape[:2]
+        x_min, y_min = self.last_keypoints.min(axis=0)
+        x_max, y_max = self.last_keypoints.max(axis=0)
 
-            if np.all(kpts == 0):
-                return None
-            return kpts
+        pad_x = (x_max - x_min) * self.roi_margin
+        pad_y = (y_max - y_min) * self.roi_margin
+        # Keep a square-ish window so a wide display doesn't leave no vertical slack
+        pad = max(pad_x, pad_y)
+
+        x0, y0 = int(max(0, x_min - pad)), int(max(0, y_min - pad))
+        x1, y1 = int(min(w, x_max + pad)), int(min(h, y_max + pad))
+        return x0, y0, x1, y1
+
+    def _detect_roi(self, image):
+        x0, y0, x1, y1 = self.search_window(image.shape)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            return None, 0.0
+
+        results = self.backend.predict([image[y0:y1, x0:x1]], conf=self.conf, imgsz=self.roi_imgsz)
+        if len(results) == 0:
+            return None, 0.0
+
+        kpts, score = self._parse_result(results[0])
+        if kpts is None:
+            return None, 0.0
+
+        # Back to full-frame coordinates; corners predicted past the window edge stay inside the frame
+        h, w = image.shape[:2]
+        kpts = kpts + np.array([x0, y0], dtype=kpts.dtype)
+        np.clip(kpts, 0, np.array([w - 1, h - 1], dtype=kpts.dtype), out=kpts)
+        return kpts, score
+
+    def detect_batch(self, images, return_score=False):
+        """
+        Run pose inference on a list of frames in a single predict call.
+        Output:
+            - list of keypoints (or None), in the same order as `images`;
+              (keypoints, score) pairs if return_score
+        """
+        if len(images) == 0:
+            return []
+
+        try:
+            parsed = [self._parse_result(result) for result in self.backend.predict(images, conf=self.conf, imgsz=self.imgsz)]
         except Exception as e:
             print(f"Detect error: {e}")
-            return None
\ No newline at end of file
+            parsed = [(None, 0.0)] * len(images)
+
+        return parsed if return_score else [kpts for kpts, _ in parsed]
+
+    def _parse_all(self, result):
+        if result.keypoints is None or result.keypoints.shape[0] == 0:
+            return []
+
+        instances = []
+        for kpts, box in zip(result.keypoints[:, :, :2], result.boxes):
+            if not np.all(kpts == 0):
+                instances.append((np.ascontiguousarray(kpts), float(box[4])))
+
+        instances.sort(key=lambda item: item[1], reverse=True)
+        return instances
+
+    def _parse_result(self, result):
+        if result.keypoints is None or result.keypoints.shape[0] == 0:
+            return None, 0.0
+        
+        # Contiguous copy: OpenCV rejects the strided (x, y) view of (x, y, conf) rows
+        kpts = np.ascontiguousarray(result.keypoints[0, :, :2])
+
+        if np.all(kpts == 0):
+            return None, 0.0
+        return kpts, float(result.boxes[0, 4])
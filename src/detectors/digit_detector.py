@@ -1,25 +1,74 @@
-from ultralytics import YOLO
+import numpy as np
+from .backends import create_backend
 
 class DigitDetector:
-    def __init__(self, model_path, conf_threshold=0.5):
-        try:
-            self.model = YOLO(model_path)
-            self.conf =  conf_threshold
-        except Exception as e:
-            print(f"Error: {e}")
-            self.model = None
-
-    def detect(self, image):
-        if self.model  is None or image is None:
-            return []
-        
-        results = self.model.predict(image, conf=self.conf, verbose=False)
-
-        if len(results) == 0:
-            return []
-        
+    def __init__(self, model_path, conf_threshold=0.5, backend="auto", num_threads=0, lazy=False):
+        self.model_path = model_path
+        self.backend_name = backend
+        self.num_threads = num_threads
+        self.conf =  conf_threshold
+        self._backend = None
+        self._loaded = False
+
+        # lazy: the model is loaded on the first predict (or warmup) instead of here
+        if not lazy:
+            self.load()
+
+    @property
+    def backend(self):
+        return self.load()
+
+    def load(self):
+        if not self._loaded:
+            # A failed load leaves backend None, detect() then returns no digits
+            self._loaded = True
+            try:
+                self._backend = create_backend(self.model_path, task="detect", backend=self.backend_name, num_threads=self.num_threads)
+            except Exception as e:
+                print(f"Error: {e}")
+        return self._backend
+
+    def warmup(self, crop_shape, batch_size=1):
+        if self.backend is not None:
+            crop = np.zeros((crop_shape[0], crop_shape[1], 3), dtype=np.uint8)
+            self.backend.predict([crop] * batch_size, conf=self.conf)
+
+    def detect(self, image, return_conf=False):
+        """
+        Output:
+            - digit class names, left to right; (names, confidences) if return_conf
+        """
+        digits, confs = [], []
+        if self.backend is not None and image is not None:
+            results = self.backend.predict([image], conf=self.conf)
+
+            if len(results) > 0:
+                digits, confs = self._parse_result(results[0])
+
+        return (digits, confs) if return_conf else digits
+
+    def detect_batch(self, images, return_conf=False):
+        """
+        Run digit recognition on a list of warped crops in a single predict call.
+        None entries are skipped and get an empty digit list back.
+        Output:
+            - list of digit lists, in the same order as `images`;
+              (names, confidences) pairs if return_conf
+        """
+        outputs = [([], []) for _ in images]
+
+        indices = [i for i, image in enumerate(images) if image is not None]
+        if self.backend is not None and indices:
+            results = self.backend.predict([images[i] for i in indices], conf=self.conf)
+
+            for i, result in zip(indices, results):
+                outputs[i] = self._parse_result(result)
+
+        return outputs if return_conf else [digits for digits, _ in outputs]
+
+    def _parse_result(self, result):
         # Format: [x_min, y_min, x_max, y_max, confidence, class_id]
-        boxes = results[0].boxes.data.cpu().numpy()
+        boxes = result.boxes
 
         detected_items = []
 
@@ -27,12 +76,13 @@ class DigitDetector:
             x_min = box[0]
             cls_id = int(box[5])
 
-            class_name = self.model.names[cls_id]
+            class_name = self.backend.names[cls_id]
 
-            detected_items.append((x_min, class_name))
+            detected_items.append((x_min, class_name, float(box[4])))
 
         detected_items.sort(key=lambda x: x[0])
 
         final_digits = [item[1] for item in detected_items]
+        confidences = [item[2] for item in detected_items]
 
-        return final_digits
\ No newline at end of file
+        return final_digits, confidences
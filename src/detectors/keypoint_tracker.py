@@ -0,0 +1,135 @@
+import cv2
+import numpy as np
+
+class KeypointTracker:
+    """
+    Propagates the 4 clock keypoints between frames without running the pose model.
+    Feature points inside the quad are followed with sparse optical flow, the
+    corners are moved by the estimated homography and smoothed by a Kalman
+    filter per corner. The tracker asks for a re-detection every
+    `redetect_interval` frames or as soon as tracking looks unreliable.
+    """
+    def __init__(self, redetect_interval=15, max_error=2.0, min_inliers=8, max_area_change=0.3):
+        self.redetect_interval = redetect_interval
+        self.max_error = max_error
+        self.min_inliers = min_inliers
+        self.max_area_change = max_area_change
+
+        self.lk_params = dict(
+            winSize=(21, 21),
+            maxLevel=3,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+        )
+
+        self.reset()
+
+    @property
+    def active(self):
+        return self.keypoints is not None
+
+    def needs_redetect(self):
+        return not self.active or self.frames_since_detect >= self.redetect_interval
+
+    def reset(self):
+        self.keypoints = None
+        self.prev_gray = None
+        self.features = None
+        self.filters = []
+        self.ref_area = 0.0
+        self.frames_since_detect = 0
+
+    def init(self, gray, keypoints):
+        """Start tracking from keypoints given by the pose model."""
+        keypoints = np.ascontiguousarray(keypoints, dtype=np.float32)
+
+        self.prev_gray = gray
+        self.keypoints = keypoints
+        self.ref_area = abs(cv2.contourArea(keypoints))
+        self.frames_since_detect = 0
+        self.filters = [self._create_filter(x, y) for x, y in keypoints]
+        self.features = self._find_features(gray, keypoints)
+
+    def track(self, gray):
+        """
+        Output:
+            - keypoints propagated to `gray`, or None if tracking failed
+        """
+        if not self.active or self.features is None:
+            return self._fail()
+
+        new_features, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, self.features, None, **self.lk_params)
+        back_features, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, new_features, None, **self.lk_params)
+
+        # Forward-backward error per feature point
+        fb_error = np.linalg.norm(self.features - back_features, axis=2).ravel()
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < self.max_error)
+
+        if np.count_nonzero(good) < self.min_inliers:
+            return self._fail()
+
+        H, inliers = cv2.findHomography(self.features[good], new_features[good], cv2.RANSAC, 3.0)
+        if H is None or np.count_nonzero(inliers) < self.min_inliers:
+            return self._fail()
+
+        measured = cv2.perspectiveTransform(self.keypoints.reshape(-1, 1, 2), H).reshape(-1, 2)
+
+        smoothed = []
+        for kf, (x, y) in zip(self.filters, measured):
+            kf.predict()
+            state = kf.correct(np.array([[x], [y]], dtype=np.float32))
+            smoothed.append(state[:2].ravel())
+        smoothed = np.array(smoothed, dtype=np.float32)
+
+        if not self._is_valid_quad(smoothed, gray.shape):
+            return self._fail()
+
+        self.prev_gray = gray
+        self.keypoints = smoothed
+        self.features = new_features[good].reshape(-1, 1, 2)
+        self.frames_since_detect += 1
+
+        return smoothed
+
+    def _fail(self):
+        self.reset()
+        return None
+
+    def _find_features(self, gray, keypoints):
+        mask = np.zeros(gray.shape[:2], dtype=np.uint8)
+        cv2.fillConvexPoly(mask, keypoints.astype(np.int32), 255)
+
+        features = cv2.goodFeaturesToTrack(gray, maxCorners=100, qualityLevel=0.01, minDistance=5, mask=mask)
+        if features is None or len(features) < self.min_inliers:
+            return None
+        return features.astype(np.float32)
+
+    def _is_valid_quad(self, keypoints, shape):
+        h, w = shape[:2]
+
+        if not cv2.isContourConvex(keypoints.reshape(-1, 1, 2)):
+            return False
+
+        # Keypoints must stay roughly inside the frame
+        if np.any(keypoints < -0.1 * w) or np.any(keypoints[:, 0] > 1.1 * w) or np.any(keypoints[:, 1] > 1.1 * h):
+            return False
+
+        area = abs(cv2.contourArea(keypoints))
+        if self.ref_area <= 0 or abs(area - self.ref_area) / self.ref_area > self.max_area_change:
+            return False
+
+        return True
+
+    def _create_filter(self, x, y):
+        # Constant-velocity model, state = [x, y, vx, vy]
+        kf = cv2.KalmanFilter(4, 2)
+        kf.transitionMatrix = np.array([[1, 0, 1, 0],
+                                        [0, 1, 0, 1],
+                                        [0, 0, 1, 0],
+                                        [0, 0, 0, 1]], dtype=np.float32)
+        kf.measurementMatrix = np.array([[1, 0, 0, 0],
+                                         [0, 1, 0, 0]], dtype=np.float32)
+        kf.processNoiseCov = np.eye(4, dtype=np.float32) * 1e-2
+        kf.measurementNoiseCov = np.eye(2, dtype=np.float32) * 1e-1
+        kf.errorCovPost = np.eye(4, dtype=np.float32)
+        kf.statePost = np.array([[x], [y], [0], [0]], dtype=np.float32)
+        return kf
@@ -0,0 +1,158 @@
+import cv2
+import numpy as np
+
+# Segment order a, b, c, d, e, f, g
+SEGMENTS = "abcdefg"
+
+DIGIT_PATTERNS = {
+    "0": "abcdef", "1": "bc", "2": "abdeg", "3": "abcdg", "4": "bcfg",
+    "5": "acdfg", "6": "acdefg", "7": "abc", "8": "abcdefg", "9": "abcdfg",
+}
+
+# Where to sample each segment inside a digit cell, as (x0, y0, x1, y1) fractions.
+# Regions sit on the segment centre lines so a slightly off warp still hits them.
+DEFAULT_SEGMENT_REGIONS = {
+    "a": (0.35, 0.06, 0.65, 0.13),
+    "b": (0.77, 0.20, 0.86, 0.38),
+    "c": (0.77, 0.62, 0.86, 0.80),
+    "d": (0.35, 0.87, 0.65, 0.94),
+    "e": (0.14, 0.62, 0.23, 0.80),
+    "f": (0.14, 0.20, 0.23, 0.38),
+    "g": (0.35, 0.46, 0.65, 0.54),
+}
+
+def default_digit_cells(num_digits=4, margin=0.25):
+    """
+    Evenly spaced digit cells across the warped display, with `margin` cell widths
+    of padding split between the two sides (room for a colon in the middle).
+    """
+    cell_w = 1.0 / (num_digits + 2 * margin)
+    return [((margin + i) * cell_w, 0.0, (margin + i + 1) * cell_w, 1.0) for i in range(num_digits)]
+
+
+class SevenSegmentDecoder:
+    """
+    Classical seven-segment reader for the canonical warped display.
+    The crop is binarized with Otsu (polarity picked automatically), segment
+    fill ratios for every digit are read from one integral image in a single
+    vectorized lookup, and each digit is matched against the 7-bit patterns.
+    Confidence is the weakest segment margin over all digits, 0 if any digit
+    does not match a pattern exactly.
+    """
+    def __init__(self, digit_cells=None, segment_regions=None, min_confidence=0.5, allow_blank=True):
+        self.digit_cells = np.array(digit_cells or default_digit_cells(), dtype=np.float32)
+        regions = segment_regions or DEFAULT_SEGMENT_REGIONS
+        self.segment_regions = np.array([regions[s] for s in SEGMENTS], dtype=np.float32)
+        self.min_confidence = min_confidence
+        self.allow_blank = allow_blank
+
+        self.patterns = np.array([[s in DIGIT_PATTERNS[d] for s in SEGMENTS] for d in "0123456789"], dtype=bool)
+        self._boxes_cache = {}
+
+    def binarize(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        _, binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        # Lit segments are the minority class; flip for dark-on-light LCDs
+        if binary.mean() > 0.5:
+            binary = 1 - binary
+        return binary
+
+    def segment_fill(self, binary):
+        """
+        Output:
+            - (num_digits, 7) fraction of lit pixels in every segment region
+        """
+        h, w = binary.shape[:2]
+        x0, y0, x1, y1 = self._pixel_boxes(w, h)
+
+        integral = cv2.integral(binary, sdepth=cv2.CV_32S)
+        sums = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        area = np.maximum((x1 - x0) * (y1 - y0), 1)
+        return sums / area
+
+    def decode(self, image):
+        """
+        Output:
+            - (digits, confidence, per-digit confidences)
+        """
+        return self.decode_batch([image])[0]
+
+    def decode_batch(self, images):
+        """
+        Decode several crops; pattern matching for all of them is one array operation.
+        Output:
+            - list of (digits, confidence, per-digit confidences), in input order
+        """
+        if not images:
+            return []
+        fill = np.stack([self.segment_fill(self.binarize(image)) for image in images])
+        values, matched, digit_conf, valid = self._match(fill)
+
+        outputs = []
+        for i in range(len(images)):
+            digits = [str(v) for v, m in zip(values[i], matched[i]) if m]
+            confs = digit_conf[i][matched[i]]
+            if digits and valid[i].all():
+                confidence = float(digit_conf[i].min())
+            else:
+                confidence = 0.0
+            outputs.append((digits, confidence, [float(c) for c in confs]))
+        return outputs
+
+    def digit_boxes(self, image):
+        """
+        Digit boxes for labeling: the segment extent of every decoded cell.
+        Output:
+            - (list of (digit, (x0, y0, x1, y1)) as fractions of the crop, confidence)
+        """
+        fill = self.segment_fill(self.binarize(image))[None]
+        values, matched, digit_conf, valid = self._match(fill)
+        confidence = float(digit_conf[0].min()) if matched[0].any() and valid[0].all() else 0.0
+
+        rx0, ry0 = self.segment_regions[:, :2].min(axis=0)
+        rx1, ry1 = self.segment_regions[:, 2:].max(axis=0)
+
+        boxes = []
+        for (cx0, cy0, cx1, cy1), value, is_digit in zip(self.digit_cells, values[0], matched[0]):
+            if is_digit:
+                cw, ch = cx1 - cx0, cy1 - cy0
+                box = (cx0 + rx0 * cw, cy0 + ry0 * ch, cx0 + rx1 * cw, cy0 + ry1 * ch)
+                boxes.append((str(int(value)), tuple(float(v) for v in box)))
+        return boxes, confidence
+
+    def _match(self, fill):
+        """
+        Input:
+            - fill: (N, D, 7) segment fill ratios
+        Output:
+            - (digit values, matched, per-digit confidence, matched or blank), each (N, D)
+        """
+        lit = fill > 0.5                          # (N, D, 7)
+        margin = np.abs(fill - 0.5) * 2           # 0 = ambiguous, 1 = clean segment
+        digit_conf = margin.min(axis=2)           # (N, D)
+
+        matches = np.all(lit[:, :, None, :] == self.patterns[None, None], axis=3)  # (N, D, 10)
+        matched = matches.any(axis=2)
+        values = matches.argmax(axis=2)
+        # Unlit cells, e.g. the leading digit of " 9:30"
+        blank = ~lit.any(axis=2) & self.allow_blank
+        return values, matched, digit_conf, matched | blank
+
+    def _pixel_boxes(self, w, h):
+        boxes = self._boxes_cache.get((w, h))
+        if boxes is None:
+            cells = self.digit_cells[:, None, :]    # (D, 1, 4)
+            regions = self.segment_regions[None]     # (1, 7, 4)
+
+            cell_w = cells[..., 2] - cells[..., 0]
+            cell_h = cells[..., 3] - cells[..., 1]
+            x0 = (cells[..., 0] + regions[..., 0] * cell_w) * w
+            x1 = (cells[..., 0] + regions[..., 2] * cell_w) * w
+            y0 = (cells[..., 1] + regions[..., 1] * cell_h) * h
+            y1 = (cells[..., 1] + regions[..., 3] * cell_h) * h
+
+            boxes = tuple(np.clip(np.round(v), 0, lim).astype(np.intp) for v, lim in ((x0, w), (y0, h), (x1, w), (y1, h)))
+            self._boxes_cache[(w, h)] = boxes
+        return boxes
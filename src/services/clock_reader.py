@@ -1,41 +1,451 @@
+import threading
+import time
+
 import cv2
 import numpy as np
-from src.detectors import PoseDetector, DigitDetector
-from src.utils.geometry import four_point_transform
+from src.core import logger
+from src.core.metrics import NULL_METRICS
+from src.detectors import ClockDetector, DigitDetector
+from src.services.instance_tracker import InstanceTracker
+from src.services.sinks import ReadingResult
+from src.utils.geometry import four_point_transform, four_point_transform_batch
 
 class ClockReader:
-    def __init__(self, pose_model_path, digit_model_path, pose_conf=0.6, digit_conf=0.5):
-        self.pose_detector = PoseDetector(pose_model_path, pose_conf)
-        self.digit_detector = DigitDetector(digit_model_path, digit_conf)
+    def __init__(self, pose_model_path, digit_model_path, pose_conf=0.6, digit_conf=0.5, warp_size=None, tracker=None, warper=None, interpolation=cv2.INTER_CUBIC, change_detector=None, time_model=None, backend="auto", num_threads=0, roi_imgsz=None, roi_margin=0.5, metrics=None, draw=True, segment_decoder=None, lazy_load=False, latency_controller=None, instance_tracker=None, max_clocks=None, buffer_pool=None):
+        self.pose_detector = ClockDetector(pose_model_path, pose_conf, backend=backend, num_threads=num_threads, roi_imgsz=roi_imgsz, roi_margin=roi_margin, lazy=lazy_load)
+        self.digit_detector = DigitDetector(digit_model_path, digit_conf, backend=backend, num_threads=num_threads, lazy=lazy_load)
+        self.warp_size = warp_size
+        self.interpolation = interpolation
+        # Optional KeypointTracker, lets most frames skip the pose model
+        self.tracker = tracker
+        # Optional CachedWarper, reuses homographies while the quad is stable
+        self.warper = warper
+        # Optional DisplayChangeDetector, reuses the last digits on an unchanged display
+        self.change_detector = change_detector
+        self.last_digits = None
+        # Optional TimeModel, votes over frames and schedules recognition around transitions
+        self.time_model = time_model
+        # Stage timers/counters, NULL_METRICS makes every call a no-op
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        # False in headless mode: no debug copy of the frame, no drawing
+        self.draw = draw
+        self.last_digit_confs = []
+        # Optional SevenSegmentDecoder, tried before the digit model
+        self.segment_decoder = segment_decoder
+        # Optional LatencyController, sets pose stride, pose imgsz and digit cadence per frame
+        self.latency_controller = latency_controller
+        self.last_keypoints = None
+        # Multi-clock mode (read_all): identity across frames and an upper bound per frame
+        self.instance_tracker = instance_tracker if instance_tracker is not None else InstanceTracker()
+        self.max_clocks = max_clocks
+        # Optional BufferPool for gray images, debug frames and warped crops;
+        # buffers in a ReadingResult from read() go back through release()
+        self.buffer_pool = buffer_pool
+        self._tracker_gray = None
+        # Changes queued by other threads (settings hot reload), applied between frames
+        self._deferred = []
+        self._deferred_lock = threading.Lock()
+
+    def defer(self, update):
+        """
+        Queue `update()` to run on the inference thread before the next frame,
+        so attributes like latency_controller never change in the middle of one.
+        """
+        with self._deferred_lock:
+            self._deferred.append(update)
+
+    def apply_deferred(self):
+        if not self._deferred:
+            return
+        with self._deferred_lock:
+            updates, self._deferred = self._deferred, []
+        for update in updates:
+            update()
+
+    def warmup(self, frame_shape, batch_size=1):
+        """
+        Load both models and run dummy inference at the runtime sizes.
+        Input:
+            - frame_shape: (height, width) of the camera frames
+        Output:
+            - seconds spent
+        """
+        start = time.perf_counter()
+        self.pose_detector.warmup(frame_shape, batch_size)
+
+        # Digit crops have the canonical warp size; without one use the default 320x128
+        crop_w, crop_h = self.warp_size or (320, 128)
+        self.digit_detector.warmup((crop_h, crop_w), batch_size)
+        if self.segment_decoder is not None:
+            self.segment_decoder.decode(np.zeros((crop_h, crop_w, 3), dtype=np.uint8))
+
+        return time.perf_counter() - start
+
+    def locate(self, frame):
+        """
+        Output:
+            - (keypoints or None, pose confidence); confidence is None for tracked or reused frames
+        """
+        controller = self.latency_controller
+        if controller is not None:
+            if not controller.pose_due() and self.last_keypoints is not None:
+                # Over budget: the pose model runs every pose_stride-th frame only
+                self.metrics.inc("pose_skipped")
+                return self.last_keypoints, None
+            self.pose_detector.imgsz = controller.imgsz
+
+        keypoints, score = self._locate(frame)
+        self.last_keypoints = keypoints
+        return keypoints, score
+
+    def _locate(self, frame):
+        if self.tracker is None:
+            return self.pose_detector.detect(frame, return_score=True)
+
+        gray = None
+        if self.buffer_pool is not None:
+            gray = self.buffer_pool.acquire(frame.shape[:2])
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+
+        keypoints, score = None, None
+        if not self.tracker.needs_redetect():
+            keypoints = self.tracker.track(gray)
+
+        if keypoints is not None:
+            # Pose model skipped for this frame
+            self.metrics.inc("frames_tracked")
+        else:
+            keypoints, score = self.pose_detector.detect(frame, return_score=True)
+
+            if keypoints is None:
+                self.tracker.reset()
+            else:
+                self.tracker.init(gray, keypoints)
+
+        self._retire_gray(gray)
+        return keypoints, score
+
+    def _retire_gray(self, gray):
+        # The tracker keeps the last gray image it used; every other one goes back to the pool
+        if self.buffer_pool is None:
+            return
+        kept = self.tracker.prev_gray
+        for buffer in (self._tracker_gray, gray):
+            if buffer is not None and buffer is not kept:
+                self.buffer_pool.release(buffer)
+        self._tracker_gray = kept
+
+    def warp(self, frame, keypoints, reuse_output=True):
+        if self.warper is None:
+            return four_point_transform(frame, keypoints, self.warp_size, self.interpolation)
+        return self.warper.warp(frame, keypoints, reuse_output=reuse_output)
+
+    def read_digits(self, warped_img):
+        controller = self.latency_controller
+        if controller is not None and not controller.digits_due() and self.last_digits is not None:
+            self.metrics.inc("digits_skipped")
+            return self.last_digits
+
+        if self.change_detector is not None:
+            if self.last_digits is not None and not self.change_detector.has_changed(warped_img):
+                self.metrics.inc("digits_unchanged")
+                return self.last_digits
+            self.change_detector.update(warped_img)
+
+        digits, confs = None, None
+        if self.segment_decoder is not None:
+            digits, confs = self._decode_segments([warped_img])[0]
+
+        if digits is None:
+            digits, confs = self.digit_detector.detect(warped_img, return_conf=True)
+        self.last_digits = digits
+        self.last_digit_confs = confs
+        return digits
+
+    def read_time(self, warped_img):
+        if self.time_model is None:
+            digits = self.read_digits(warped_img)
+            return "".join(digits) if digits else "..."
+
+        now = time.monotonic()
+        digits = None
+        if self.time_model.should_recognize(now):
+            digits = self.read_digits(warped_img)
+            self.time_model.update(digits, now)
+        else:
+            self.metrics.inc("digits_not_scheduled")
+
+        time_text = self.time_model.text(now)
+        if time_text is None:
+            # Not locked yet, show the raw reading
+            time_text = "".join(digits) if digits else "..."
+        return time_text
+
+    def reset_digits(self):
+        # The display was lost, the next crop must be read again
+        self.last_digits = None
+        self.last_digit_confs = []
+        if self.change_detector is not None:
+            self.change_detector.reset()
 
     def process_frame(self, frame):
-        keypoints = self.pose_detector.detect(frame)
+        result = self.read(frame)
+        if self.buffer_pool is not None:
+            # The caller keeps these arrays, they never come back to the pool
+            self.buffer_pool.detach(result.debug_frame)
+            self.buffer_pool.detach(result.warped_img)
+        return result.debug_frame, result.warped_img, result.time_text
 
-        warped_img = None
-        time_text = "Checking..."
-        debug_frame = frame.copy()
+    def read(self, frame, stream_id=None, frame_id=None):
+        """
+        Output:
+            - ReadingResult; debug_frame is None unless drawing is enabled
+        """
+        self.apply_deferred()
+        metrics = self.metrics
+        metrics.inc("frames")
+        start = time.perf_counter()
+        controller = self.latency_controller
+        result = ReadingResult(time.time(), stream_id=stream_id, frame_id=frame_id)
+
+        with metrics.timer("pose"):
+            keypoints, result.pose_conf = self.locate(frame)
+
+        if self.draw:
+            result.debug_frame = self._copy_frame(frame)
 
         if keypoints is not None:
+            metrics.inc("detections")
+            result.keypoints = keypoints
             try: 
-                warped_img  = four_point_transform(frame, keypoints)
+                with metrics.timer("warp"):
+                    result.warped_img  = self._warp_pooled(frame, keypoints)
+
+                with metrics.timer("digits"):
+                    result.time_text = self.read_time(result.warped_img)
+                result.digits = self.last_digits or []
+                result.digit_confs = self.last_digit_confs
 
-                digits = self.digit_detector.detect(warped_img)
+                if self.draw:
+                    with metrics.timer("draw"):
+                        self.draw_debug(result.debug_frame, keypoints, result.time_text)
 
-                time_text = "".join(digits) if digits else "..."
+            except Exception as e:
+                metrics.inc("exceptions")
+                logger.error(f"Error processing frame: {e}")
+        else:
+            metrics.inc("misses")
+            self.reset_digits()
+
+        if controller is not None:
+            controller.update((time.perf_counter() - start) * 1000)
+        return result
+
+    def release(self, result):
+        """
+        Give the buffers of a read() result back to the pool. The caller must be
+        done with debug_frame and warped_img (shown, serialized); they are cleared.
+        """
+        if self.buffer_pool is not None:
+            self.buffer_pool.release(result.debug_frame)
+            self.buffer_pool.release(result.warped_img)
+        result.debug_frame = result.warped_img = None
+
+    def _copy_frame(self, frame):
+        if self.buffer_pool is None:
+            return frame.copy()
+        copy = self.buffer_pool.acquire_like(frame)
+        np.copyto(copy, frame)
+        return copy
 
-                pts_int = keypoints.astype(int)
-                
-                for i, (x, y) in enumerate(pts_int):
-                    cv2.circle(debug_frame, (x, y), 5, (0, 0, 255), -1)
-                
-                pts_poly = pts_int.reshape((-1, 1, 2))
-                cv2.polylines(debug_frame, [pts_poly], isClosed=True, color=(0, 255, 0), thickness=2)
+    def _warp_pooled(self, frame, keypoints):
+        # CachedWarper has its own output buffer; the plain transform writes into a pooled one
+        if self.buffer_pool is None or self.warper is not None or self.warp_size is None:
+            return self.warp(frame, keypoints)
+        warp_w, warp_h = self.warp_size
+        dst = self.buffer_pool.acquire((warp_h, warp_w) + frame.shape[2:])
+        try:
+            return four_point_transform(frame, keypoints, self.warp_size, self.interpolation, dst=dst)
+        except Exception:
+            self.buffer_pool.release(dst)
+            raise
 
-                text_pos = (pts_int[0][0], pts_int[0][1] - 10)
-                cv2.putText(debug_frame, f"Result: {time_text}", text_pos, 
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+    def process_frames(self, frames):
+        """
+        Batched version of process_frame.
+        Output:
+            - list of (debug_frame, warped_img, time_text), in input order
+        """
+        return [(r.debug_frame, r.warped_img, r.time_text) for r in self.read_batch(frames)]
 
+    def read_batch(self, frames, stream_ids=None):
+        """
+        Batched version of read.
+        All frames go through the pose model in one predict call, then all
+        warped crops go through the digit model in a second one.
+        Output:
+            - list of ReadingResult, in input order
+        """
+        self.apply_deferred()
+        metrics = self.metrics
+        metrics.inc("frames", len(frames))
+        start = time.perf_counter()
+        stream_ids = stream_ids if stream_ids is not None else [None] * len(frames)
+        self._apply_imgsz()
+
+        with metrics.timer("pose_batch"):
+            detections = self.pose_detector.detect_batch(frames, return_score=True)
+        all_keypoints = [kpts for kpts, _ in detections]
+
+        warped_imgs = [None] * len(frames)
+        for i, (frame, keypoints) in enumerate(zip(frames, all_keypoints)):
+            if keypoints is None:
+                continue
+            try:
+                # Crops must coexist until the digit batch runs
+                with metrics.timer("warp"):
+                    warped_imgs[i] = self.warp(frame, keypoints, reuse_output=False)
             except Exception as e:
-                print(f"Error; {e}")
+                metrics.inc("exceptions")
+                logger.error(f"Error warping frame: {e}")
+
+        found = sum(img is not None for img in warped_imgs)
+        metrics.inc("detections", found)
+        metrics.inc("misses", len(frames) - found)
+
+        with metrics.timer("digits_batch"):
+            all_digits = self._read_crops(warped_imgs)
+
+        timestamp = time.time()
+        outputs = []
+        for frame, stream_id, (keypoints, score), warped_img, (digits, confs) in zip(frames, stream_ids, detections, warped_imgs, all_digits):
+            result = ReadingResult(timestamp, stream_id=stream_id, debug_frame=frame.copy() if self.draw else None)
+
+            if warped_img is not None:
+                result.keypoints, result.pose_conf = keypoints, score
+                result.warped_img = warped_img
+                result.digits, result.digit_confs = digits, confs
+                result.time_text = "".join(digits) if digits else "..."
+                if self.draw:
+                    self.draw_debug(result.debug_frame, keypoints, result.time_text)
+
+            outputs.append(result)
+
+        self._update_latency(start)
+        return outputs
+
+    def read_all(self, frame, stream_id=None, frame_id=None):
+        """
+        Multi-clock version of read: every display in the frame is warped and
+        all crops go through the digit model in one batch.
+        The change detector and time model track a single display and are not used here.
+        Output:
+            - list of ReadingResult, one per clock, each with a stable instance_id
+        """
+        self.apply_deferred()
+        metrics = self.metrics
+        metrics.inc("frames")
+        start = time.perf_counter()
+        timestamp = time.time()
+        self._apply_imgsz()
+
+        with metrics.timer("pose"):
+            instances = self.pose_detector.detect_all(frame, self.max_clocks)
+        all_keypoints = [kpts for kpts, _ in instances]
+        instance_ids = self.instance_tracker.assign(all_keypoints)
+
+        if not instances:
+            metrics.inc("misses")
+        metrics.inc("detections", len(instances))
+
+        warped_imgs = []
+        try:
+            with metrics.timer("warp"):
+                warped_imgs = four_point_transform_batch(frame, all_keypoints, self.warp_size, self.interpolation)
+        except Exception as e:
+            metrics.inc("exceptions")
+            logger.error(f"Error warping frame: {e}")
+            instances, instance_ids = [], []
+
+        with metrics.timer("digits_batch"):
+            all_digits = self._read_crops(warped_imgs)
+
+        # One debug frame shared by all clocks of this frame
+        debug_frame = frame.copy() if self.draw else None
+
+        outputs = []
+        for instance_id, (keypoints, score), warped_img, (digits, confs) in zip(instance_ids, instances, warped_imgs, all_digits):
+            if warped_img is None:
+                # Degenerate quad (collinear corners), not a readable display
+                metrics.inc("degenerate_quads")
+                continue
+            result = ReadingResult(timestamp, keypoints=keypoints, pose_conf=score, digits=digits, digit_confs=confs,
+                                   time_text="".join(digits) if digits else "...", stream_id=stream_id,
+                                   frame_id=frame_id, debug_frame=debug_frame, warped_img=warped_img,
+                                   instance_id=instance_id)
+            if self.draw:
+                self.draw_debug(debug_frame, keypoints, f"#{instance_id} {result.time_text}")
+            outputs.append(result)
+
+        self._update_latency(start)
+        return outputs
+
+    def _apply_imgsz(self):
+        # Batched paths follow the controller's pose imgsz only, see LatencyController
+        controller = self.latency_controller
+        if controller is not None:
+            self.pose_detector.imgsz = controller.imgsz
+
+    def _update_latency(self, start):
+        controller = self.latency_controller
+        if controller is not None:
+            controller.update((time.perf_counter() - start) * 1000, imgsz_only=True)
+
+    def _read_crops(self, warped_imgs):
+        """
+        Segment decoder first, then one digit model batch for the crops it could not read.
+        Output:
+            - list of (digits, confs), in input order; ([], []) for None crops
+        """
+        all_digits = [(None, None)] * len(warped_imgs)
+        if self.segment_decoder is not None:
+            all_digits = self._decode_segments(warped_imgs)
+
+        # Only crops the segment decoder was unsure about reach the digit model
+        fallback = [img if digits is None else None for img, (digits, _) in zip(warped_imgs, all_digits)]
+        for i, detected in enumerate(self.digit_detector.detect_batch(fallback, return_conf=True)):
+            if all_digits[i][0] is None:
+                all_digits[i] = detected
+        return all_digits
+
+    def _decode_segments(self, warped_imgs):
+        """
+        Output:
+            - list of (digits, confs); (None, None) where the digit model must decide
+        """
+        indices = [i for i, img in enumerate(warped_imgs) if img is not None]
+        outputs = [(None, None)] * len(warped_imgs)
+
+        with self.metrics.timer("segments"):
+            decoded = self.segment_decoder.decode_batch([warped_imgs[i] for i in indices])
+
+        for i, (digits, confidence, confs) in zip(indices, decoded):
+            if confidence >= self.segment_decoder.min_confidence:
+                self.metrics.inc("digits_segment_decoder")
+                outputs[i] = (digits, confs)
+            else:
+                self.metrics.inc("digits_fallback")
+        return outputs
+
+    def draw_debug(self, debug_frame, keypoints, time_text):
+        pts_int = keypoints.astype(int)
+        
+        for i, (x, y) in enumerate(pts_int):
+            cv2.circle(debug_frame, (x, y), 5, (0, 0, 255), -1)
+        
+        pts_poly = pts_int.reshape((-1, 1, 2))
+        cv2.polylines(debug_frame, [pts_poly], isClosed=True, color=(0, 255, 0), thickness=2)
 
-        return debug_frame, warped_img
\ No newline at end of file
+        text_pos = (pts_int[0][0], pts_int[0][1] - 10)
+        cv2.putText(debug_frame, f"Result: {time_text}", text_pos, 
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
@@ -0,0 +1,67 @@
+import numpy as np
+
+class InstanceTracker:
+    """
+    Keeps clock identities stable across frames when several displays are visible.
+    Quads are matched greedily to the previous frame's quads by mean corner
+    distance, relative to the previous quad's size. Unmatched quads get a new id;
+    an id survives `max_age` frames without a match (missed detections).
+    """
+    def __init__(self, max_distance=0.5, max_age=5):
+        self.max_distance = max_distance
+        self.max_age = max_age
+
+        # id -> [keypoints, frames since last match]
+        self._tracks = {}
+        self._next_id = 0
+
+    def assign(self, all_keypoints):
+        """
+        Input:
+            - all_keypoints: list of (4, 2) quads in the current frame
+        Output:
+            - list of instance ids, in the same order
+        """
+        ids = [None] * len(all_keypoints)
+        track_ids = list(self._tracks)
+
+        if all_keypoints and track_ids:
+            current = np.stack([np.asarray(k, dtype=np.float32) for k in all_keypoints])   # (N, 4, 2)
+            previous = np.stack([self._tracks[i][0] for i in track_ids])                   # (M, 4, 2)
+
+            distance = np.linalg.norm(current[:, None] - previous[None], axis=3).mean(axis=2)
+            scale = np.linalg.norm(previous.max(axis=1) - previous.min(axis=1), axis=1)
+            cost = distance / np.maximum(scale, 1.0)[None]
+
+            used_tracks = set()
+            for flat in np.argsort(cost, axis=None):
+                row, col = np.unravel_index(flat, cost.shape)
+                if cost[row, col] > self.max_distance:
+                    break
+                if ids[row] is not None or col in used_tracks:
+                    continue
+                ids[row] = track_ids[col]
+                used_tracks.add(col)
+
+        matched = set()
+        for row, keypoints in enumerate(all_keypoints):
+            if ids[row] is None:
+                ids[row] = self._next_id
+                self._next_id += 1
+            self._tracks[ids[row]] = [np.asarray(keypoints, dtype=np.float32), 0]
+            matched.add(ids[row])
+
+        for track_id in track_ids:
+            if track_id not in matched:
+                self._tracks[track_id][1] += 1
+                if self._tracks[track_id][1] > self.max_age:
+                    del self._tracks[track_id]
+
+        return ids
+
+    def reset(self):
+        self._tracks.clear()
+
+    @property
+    def active(self):
+        return len(self._tracks)
@@ -0,0 +1,129 @@
+class LatencyController:
+    """
+    Keeps per-frame latency near a budget by trading quality for speed.
+    Knobs, cheapest quality loss first:
+        - digit_interval: read digits every N-th frame, reuse the last reading in between
+        - pose_stride: run the pose model every N-th frame, reuse the last keypoints in between
+        - imgsz: pose inference size, stepped down through `imgsz_levels`
+    Over budget, the next knob in that order is degraded; under budget they are
+    restored in reverse order. `cooldown` frames between changes give the smoothed
+    latency time to settle, and `tolerance` is the dead band around the target.
+    Batched paths (several streams or clocks per call, worker processes) have no
+    single frame sequence to skip frames of, so they only use the imgsz knob.
+    """
+    def __init__(self, target_ms, max_pose_stride=4, imgsz_levels=None, max_digit_interval=8, tolerance=0.15, cooldown=15, smoothing=0.1):
+        self.target_ms = target_ms
+        self.max_pose_stride = max_pose_stride
+        # e.g. [640, 480, 320]; None/empty keeps the model's own size
+        self.imgsz_levels = list(imgsz_levels or [])
+        self.max_digit_interval = max_digit_interval
+        self.tolerance = tolerance
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+
+        self.pose_stride = 1
+        self.digit_interval = 1
+        self.imgsz_index = 0
+
+        self.latency_ms = None
+        self.adjustments = 0
+        self._since_change = 0
+        # Separate counters: in pipelined mode the stages run on different frames
+        self._pose_frames = 0
+        self._digit_frames = 0
+
+    @property
+    def imgsz(self):
+        return self.imgsz_levels[self.imgsz_index] if self.imgsz_levels else None
+
+    def configure(self, target_ms=None, max_pose_stride=None, imgsz_levels=None, max_digit_interval=None, tolerance=None, cooldown=None):
+        # Applies new bounds (e.g. after settings.yaml changed) and clamps the current knobs to them
+        if target_ms is not None: self.target_ms = target_ms
+        if max_pose_stride is not None: self.max_pose_stride = max_pose_stride
+        if imgsz_levels is not None: self.imgsz_levels = list(imgsz_levels)
+        if max_digit_interval is not None: self.max_digit_interval = max_digit_interval
+        if tolerance is not None: self.tolerance = tolerance
+        if cooldown is not None: self.cooldown = cooldown
+
+        self.pose_stride = min(self.pose_stride, max(1, self.max_pose_stride))
+        self.digit_interval = min(self.digit_interval, max(1, self.max_digit_interval))
+        self.imgsz_index = min(self.imgsz_index, max(0, len(self.imgsz_levels) - 1))
+        self._since_change = 0
+
+    def pose_due(self):
+        # Called once per frame by the pose stage
+        due = self._pose_frames % self.pose_stride == 0
+        self._pose_frames += 1
+        return due
+
+    def digits_due(self):
+        # Called once per frame by the digit stage
+        due = self._digit_frames % self.digit_interval == 0
+        self._digit_frames += 1
+        return due
+
+    def update(self, latency_ms, imgsz_only=False):
+        """
+        Input:
+            - latency_ms: time spent on the last frame (or batch)
+            - imgsz_only: the caller can only apply imgsz; the stride knobs are left alone
+        Output:
+            - True if a knob was changed
+        """
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += self.smoothing * (latency_ms - self.latency_ms)
+
+        self._since_change += 1
+        if self._since_change < self.cooldown:
+            return False
+
+        changed = False
+        if self.latency_ms > self.target_ms * (1 + self.tolerance):
+            changed = self._degrade(imgsz_only)
+        elif self.latency_ms < self.target_ms * (1 - self.tolerance):
+            changed = self._upgrade(imgsz_only)
+
+        if changed:
+            self.adjustments += 1
+            self._since_change = 0
+        return changed
+
+    def _degrade(self, imgsz_only=False):
+        if imgsz_only:
+            if self.imgsz_index >= len(self.imgsz_levels) - 1:
+                return False
+            self.imgsz_index += 1
+        elif self.digit_interval < self.max_digit_interval:
+            self.digit_interval = min(self.digit_interval * 2, self.max_digit_interval)
+        elif self.pose_stride < self.max_pose_stride:
+            self.pose_stride += 1
+        elif self.imgsz_index < len(self.imgsz_levels) - 1:
+            self.imgsz_index += 1
+        else:
+            return False
+        return True
+
+    def _upgrade(self, imgsz_only=False):
+        if self.imgsz_index > 0:
+            self.imgsz_index -= 1
+        elif imgsz_only:
+            return False
+        elif self.pose_stride > 1:
+            self.pose_stride -= 1
+        elif self.digit_interval > 1:
+            self.digit_interval = max(self.digit_interval // 2, 1)
+        else:
+            return False
+        return True
+
+    def stats(self):
+        return {
+            "latency_ms": round(self.latency_ms, 2) if self.latency_ms is not None else None,
+            "target_ms": self.target_ms,
+            "pose_stride": self.pose_stride,
+            "digit_interval": self.digit_interval,
+            "imgsz": self.imgsz,
+            "adjustments": self.adjustments,
+        }
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from src.core import logger
+from src.services.pipeline import LatestQueue
+
+
+class StreamSource:
+    """
+    One camera/video feed. A capture thread keeps only the newest frame,
+    so a stream that is not scheduled in time drops frames instead of lagging.
+    """
+    def __init__(self, stream_id, source, max_fps=0.0):
+        self.stream_id = stream_id
+        self.source = source
+        self.max_fps = max_fps
+
+        self.queue = LatestQueue(1)
+        self.cap = None
+        self.finished = False
+
+        self.captured = 0
+        self.processed = 0
+        self.last_scheduled = 0.0
+        self.latencies = deque(maxlen=200)
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            logger.error(f"Stream '{self.stream_id}': cannot open {self.source}")
+            return False
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return True
+
+    def capture_loop(self, stop_event):
+        while not stop_event.is_set():
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            self.captured += 1
+            self.queue.put((time.perf_counter(), frame))
+
+        self.finished = True
+        self.queue.close()
+        self.cap.release()
+
+    @property
+    def exhausted(self):
+        # Capture ended and its last frame was scheduled
+        return self.finished and len(self.queue) == 0
+
+    def ready(self, now):
+        # Respect the per-stream FPS cap
+        if self.max_fps <= 0:
+            return True
+        return now - self.last_scheduled >= 1.0 / self.max_fps
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "captured": self.captured,
+            "processed": self.processed,
+            "dropped": self.queue.dropped,
+            "latency_mean_ms": float(latencies.mean()),
+            "latency_p95_ms": float(np.percentile(latencies, 95)),
+        }
+
+
+class MultiStreamScheduler:
+    """
+    Serves many StreamSource feeds with one shared ClockReader.
+    Each round collects at most one frame per ready stream, starting from a
+    rotating offset so no stream is always first, and sends them through
+    ClockReader.read_batch as one batch.
+    """
+    def __init__(self, clock_service, sources, max_batch=8, report_interval=5.0):
+        self.clock_service = clock_service
+        self.sources = sources
+        self.max_batch = max_batch
+        self.report_interval = report_interval
+
+        self._offset = 0
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for source in self.sources:
+            if not source.open():
+                source.finished = True
+                continue
+            thread = threading.Thread(target=source.capture_loop, args=(self._stop,), name=f"stream-{source.stream_id}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+
+    def next_batch(self):
+        now = time.perf_counter()
+        batch = []
+
+        count = len(self.sources)
+        for i in range(count):
+            source = self.sources[(self._offset + i) % count]
+            if len(batch) >= self.max_batch:
+                break
+            if not source.ready(now):
+                continue
+
+            item = source.queue.get(timeout=0)
+            if item is None:
+                continue
+
+            source.last_scheduled = now
+            batch.append((source, item[0], item[1]))
+
+        self._offset = (self._offset + 1) % max(count, 1)
+        return batch
+
+    def run(self, on_result):
+        """
+        on_result(result) is called with a ReadingResult for every processed frame.
+        """
+        self.start()
+        last_report = time.perf_counter()
+
+        try:
+            while not self._stop.is_set():
+                batch = self.next_batch()
+
+                if not batch:
+                    # An FPS-capped stream may still hold its last frame
+                    if all(source.exhausted for source in self.sources):
+                        break
+                    time.sleep(0.001)
+                    continue
+
+                results = self.clock_service.read_batch(
+                    [frame for _, _, frame in batch],
+                    stream_ids=[source.stream_id for source, _, _ in batch]
+                )
+
+                done = time.perf_counter()
+                for (source, capture_time, _), result in zip(batch, results):
+                    source.processed += 1
+                    source.latencies.append(done - capture_time)
+                    on_result(result)
+
+                if done - last_report >= self.report_interval:
+                    self.report()
+                    last_report = done
+        finally:
+            self.stop()
+            self.report()
+
+    def report(self):
+        for source in self.sources:
+            stats = source.stats()
+            logger.info(
+                f"[{source.stream_id}] processed {stats['processed']}/{stats['captured']}, "
+                f"dropped {stats['dropped']}, latency mean {stats['latency_mean_ms']:.1f} ms, "
+                f"p95 {stats['latency_p95_ms']:.1f} ms"
+            )
@@ -0,0 +1,238 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from src.core import logger
+from src.services.sinks import ReadingResult
+
+
+class LatestQueue:
+    """
+    Bounded queue with a "latest-frame-wins" policy:
+    putting into a full queue drops the oldest item instead of blocking.
+    """
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        # Returns None once the queue is closed and drained, or on timeout
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class FramePacket:
+    def __init__(self, frame_id, frame):
+        self.frame_id = frame_id
+        self.frame = frame
+        self.capture_time = time.perf_counter()
+        self.keypoints = None
+        self.pose_conf = None
+        self.warped_img = None
+        self.time_text = "Checking..."
+        self.digits = []
+        self.digit_confs = []
+
+    def to_result(self):
+        return ReadingResult(
+            time.time(), keypoints=self.keypoints, pose_conf=self.pose_conf,
+            digits=self.digits, digit_confs=self.digit_confs, time_text=self.time_text,
+            frame_id=self.frame_id, warped_img=self.warped_img
+        )
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.busy_time = 0.0
+        self._window_count = 0
+        self._window_start = time.perf_counter()
+
+    def record(self, elapsed):
+        self.count += 1
+        self._window_count += 1
+        self.busy_time += elapsed
+
+    def fps(self):
+        # Throughput since the last call, then reset the window
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        fps = self._window_count / elapsed if elapsed > 0 else 0.0
+        self._window_count = 0
+        self._window_start = now
+        return fps
+
+
+class PipelineRunner:
+    """
+    Runs capture -> pose -> warp -> digits -> output, each stage on its own
+    thread, connected by LatestQueue so a slow stage drops stale frames
+    instead of letting latency grow.
+    """
+    STAGES = ("capture", "pose", "warp", "digits", "output")
+
+    def __init__(self, clock_service, cap, queue_size=1, report_interval=5.0):
+        self.clock_service = clock_service
+        self.cap = cap
+        self.report_interval = report_interval
+
+        self.stats = {name: StageStats(name) for name in self.STAGES}
+        # One queue feeding each stage after capture
+        self.queues = {name: LatestQueue(queue_size) for name in self.STAGES[1:]}
+        self.latencies = deque(maxlen=100)
+
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        workers = [
+            ("capture", self._capture_loop),
+            ("pose", lambda: self._stage_loop("pose", "warp", self._run_pose)),
+            ("warp", lambda: self._stage_loop("warp", "digits", self._run_warp)),
+            ("digits", lambda: self._stage_loop("digits", "output", self._run_digits)),
+        ]
+        for name, target in workers:
+            thread = threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for q in self.queues.values():
+            q.close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+
+    def run(self, on_result, show=True):
+        """
+        Start the worker stages and consume results on the calling thread
+        (cv2.imshow must stay on the main thread).
+        """
+        self.start()
+        last_report = time.perf_counter()
+
+        try:
+            while not self._stop.is_set():
+                packet = self.queues["output"].get(timeout=0.1)
+
+                if packet is not None:
+                    start = time.perf_counter()
+                    on_result(packet)
+                    done = time.perf_counter()
+                    self.latencies.append(done - packet.capture_time)
+                    self.stats["output"].record(done - start)
+                    self.clock_service.metrics.observe("output", done - start)
+                    self.clock_service.metrics.observe("end_to_end", done - packet.capture_time)
+                    controller = self.clock_service.latency_controller
+                    if controller is not None:
+                        controller.update((done - packet.capture_time) * 1000)
+                elif self.queues["output"].closed:
+                    break
+
+                if show and cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+
+                if time.perf_counter() - last_report >= self.report_interval:
+                    self.report()
+                    last_report = time.perf_counter()
+        finally:
+            self.stop()
+            self.report()
+
+    def report(self):
+        parts = []
+        for name in self.STAGES:
+            stat = self.stats[name]
+            dropped = self.queues[name].dropped if name in self.queues else 0
+            avg_ms = 1000 * stat.busy_time / stat.count if stat.count else 0.0
+            parts.append(f"{name}: {stat.fps():.1f} fps, {avg_ms:.1f} ms, dropped {dropped}")
+
+        latency_ms = 1000 * sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+        logger.info(" | ".join(parts) + f" | e2e latency: {latency_ms:.1f} ms")
+
+    def _capture_loop(self):
+        frame_id = 0
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+
+            frame_id += 1
+            elapsed = time.perf_counter() - start
+            self.stats["capture"].record(elapsed)
+            self.clock_service.metrics.observe("capture", elapsed)
+            self.queues["pose"].put(FramePacket(frame_id, frame))
+
+        self.queues["pose"].close()
+
+    def _stage_loop(self, name, next_name, fn):
+        in_queue = self.queues[name]
+        out_queue = self.queues[next_name]
+
+        while not self._stop.is_set():
+            packet = in_queue.get(timeout=0.1)
+            if packet is None:
+                if in_queue.closed:
+                    break
+                continue
+
+            start = time.perf_counter()
+            try:
+                fn(packet)
+            except Exception as e:
+                self.clock_service.metrics.inc("exceptions")
+                logger.error(f"Pipeline stage '{name}' failed: {e}")
+            elapsed = time.perf_counter() - start
+            self.stats[name].record(elapsed)
+            self.clock_service.metrics.observe(name, elapsed)
+            out_queue.put(packet)
+
+        out_queue.close()
+
+    def _run_pose(self, packet):
+        # Settings reloaded since the last frame take effect here, ahead of this frame's stages
+        self.clock_service.apply_deferred()
+        packet.keypoints, packet.pose_conf = self.clock_service.locate(packet.frame)
+
+    def _run_warp(self, packet):
+        if packet.keypoints is not None:
+            # Each packet keeps its own crop while it moves through the queues
+            packet.warped_img = self.clock_service.warp(packet.frame, packet.keypoints, reuse_output=False)
+
+    def _run_digits(self, packet):
+        if packet.warped_img is None:
+            self.clock_service.reset_digits()
+        else:
+            packet.time_text = self.clock_service.read_time(packet.warped_img)
+            packet.digits = self.clock_service.last_digits or []
+            packet.digit_confs = self.clock_service.last_digit_confs
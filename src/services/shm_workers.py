@@ -0,0 +1,293 @@
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.core import logger
+from src.core.metrics import NULL_METRICS
+from src.services.sinks import ReadingResult
+
+
+class SharedRing:
+    """
+    Fixed number of equally sized array slots in one shared-memory block.
+    Only slot indices travel between processes; the pixels stay in place.
+    """
+    def __init__(self, slots, shape, dtype=np.uint8, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slot_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+
+        # name=None creates the block (owner), otherwise attaches to an existing one
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=slots * self.slot_bytes)
+        self.array = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, slot, image):
+        """
+        Output:
+            - the view holding the copy, cropped to the image's own size
+        """
+        h, w = image.shape[:2]
+        if h > self.shape[0] or w > self.shape[1] or image.shape[2:] != self.shape[2:]:
+            raise ValueError(f"{image.shape} does not fit ring slots of {self.shape}")
+
+        view = self.array[slot, :h, :w]
+        view[...] = image
+        return view
+
+    def view(self, slot, shape):
+        return self.array[slot, :shape[0], :shape[1]]
+
+    def close(self):
+        del self.array
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker_main(worker_id, reader_factory, reader_kwargs, frame_ring_args, crop_ring_args, tasks, results, current):
+    """
+    Worker process: attaches to both rings, owns one ClockReader (models included)
+    and answers frame descriptors with small result descriptors.
+    current[worker_id] is the frame it is working on, for the parent to find
+    frames lost with a crashed worker.
+    """
+    if reader_factory is None:
+        from src.services.clock_reader import ClockReader as reader_factory
+
+    frame_ring = SharedRing(*frame_ring_args)
+    crop_ring = SharedRing(*crop_ring_args)
+    reader = reader_factory(**reader_kwargs, draw=False)
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+
+            slot, frame_id, stream_id, shape, capture_time, imgsz = task
+            current[worker_id] = frame_id
+            start = time.perf_counter()
+            frame = frame_ring.view(slot, shape)
+            # Pose imgsz chosen by the parent's LatencyController
+            reader.pose_detector.imgsz = imgsz
+
+            crop_shape = None
+            try:
+                result = reader.read(frame, stream_id=stream_id, frame_id=frame_id)
+                if result.warped_img is not None:
+                    crop_shape = crop_ring.write(slot, result.warped_img).shape
+            except Exception as e:
+                logger.error(f"Worker {worker_id}: error processing frame {frame_id}: {e}")
+                result = ReadingResult(time.time(), stream_id=stream_id, frame_id=frame_id)
+
+            record = {
+                "timestamp": result.timestamp,
+                "keypoints": result.keypoints,
+                "pose_conf": result.pose_conf,
+                "digits": result.digits,
+                "digit_confs": result.digit_confs,
+                "time_text": result.time_text,
+            }
+            results.put((slot, frame_id, stream_id, shape, capture_time, crop_shape, record, time.perf_counter() - start))
+    finally:
+        frame_ring.close()
+        crop_ring.close()
+
+
+class SharedMemoryWorkerPool:
+    """
+    Runs ClockReader in `workers` processes.
+    Frames are copied once into a shared-memory ring, the worker writes the warped
+    crop into the matching slot of a second ring, and only (slot, ids, shapes) plus
+    the small reading record go through the queues. A slot is free again once its
+    result has been collected; when all slots are busy, submit() drops the frame.
+    Workers see interleaved frames, so per-sequence state (tracker, change detector,
+    time model) is not used inside them. An optional LatencyController is fed the
+    end-to-end latency here and its imgsz is sent along with each frame.
+    A frame whose worker exits before answering is skipped (counted as frames_lost)
+    and its slot reused, so results after it are not held back.
+    """
+    def __init__(self, reader_kwargs, frame_shape, crop_shape, workers=2, slots=None, metrics=None, latency_controller=None, reader_factory=None):
+        self.reader_kwargs = reader_kwargs
+        # Builds the reader in each worker, ClockReader by default; must be picklable
+        self.reader_factory = reader_factory
+        self.frame_shape = tuple(frame_shape)
+        self.crop_shape = tuple(crop_shape)
+        self.workers = workers
+        self.slots = slots or 2 * workers
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.latency_controller = latency_controller
+
+        self.frame_ring = None
+        self.crop_ring = None
+        self.processes = []
+        self.submitted = 0
+        self.dropped = 0
+        self.lost = 0
+
+        self._free = list(range(self.slots))
+        # frame_id -> slot of every frame submitted and not answered yet
+        self._outstanding = {}
+        # Results are handed out in frame order; lost frame ids are skipped
+        self._pending = {}
+        self._lost = set()
+        self._next_id = 0
+        self._exited = set()
+
+    def start(self):
+        # spawn: no forked copies of the parent's inference thread pools
+        ctx = mp.get_context("spawn")
+        self.frame_ring = SharedRing(self.slots, self.frame_shape)
+        self.crop_ring = SharedRing(self.slots, self.crop_shape)
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        # Frame id each worker took last, -1 before its first one
+        self.current = ctx.Array("q", [-1] * self.workers, lock=False)
+
+        for worker_id in range(self.workers):
+            process = ctx.Process(
+                target=_worker_main,
+                args=(worker_id, self.reader_factory, self.reader_kwargs,
+                      (self.slots, self.frame_shape, np.uint8, self.frame_ring.name),
+                      (self.slots, self.crop_shape, np.uint8, self.crop_ring.name),
+                      self.tasks, self.results, self.current),
+                name=f"clock-worker-{worker_id}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        return self
+
+    def submit(self, frame, stream_id=None):
+        """
+        Output:
+            - frame id, or None if every slot is busy and the frame was dropped
+        """
+        if not self._free:
+            self.dropped += 1
+            self.metrics.inc("frames_dropped")
+            return None
+
+        slot = self._free.pop()
+        self.frame_ring.write(slot, frame)
+
+        frame_id = self.submitted
+        self.submitted += 1
+        self._outstanding[frame_id] = slot
+        controller = self.latency_controller
+        imgsz = controller.imgsz if controller is not None else None
+        self.tasks.put((slot, frame_id, stream_id, frame.shape, time.perf_counter(), imgsz))
+        return frame_id
+
+    @property
+    def in_flight(self):
+        return self.slots - len(self._free)
+
+    def collect(self, timeout=0.1, with_frame=False):
+        """
+        Gather finished results without blocking longer than `timeout`.
+        with_frame copies the source frame into debug_frame (for drawing).
+        Output:
+            - list of ReadingResult, in submission order
+        """
+        try:
+            item = self.results.get(timeout=timeout)
+            while item is not None:
+                self._accept(item, with_frame)
+                item = self.results.get_nowait()
+        except queue.Empty:
+            pass
+
+        self._check_workers(with_frame)
+
+        ready = []
+        while True:
+            if self._next_id in self._pending:
+                ready.append(self._pending.pop(self._next_id))
+            elif self._next_id in self._lost:
+                self._lost.remove(self._next_id)
+            else:
+                break
+            self._next_id += 1
+        return ready
+
+    def _check_workers(self, with_frame):
+        # A worker that died mid-frame never answers it: free the slot and skip the id
+        for worker_id, process in enumerate(self.processes):
+            if worker_id in self._exited or process.is_alive():
+                continue
+            self._exited.add(worker_id)
+
+            # Anything it did answer is in the queue by now
+            try:
+                while True:
+                    self._accept(self.results.get_nowait(), with_frame)
+            except queue.Empty:
+                pass
+
+            frame_id = self.current[worker_id]
+            slot = self._outstanding.pop(frame_id, None)
+            if slot is not None:
+                self._free.append(slot)
+                self._lost.add(frame_id)
+                self.lost += 1
+                self.metrics.inc("frames_lost")
+            logger.error(f"Worker {worker_id} exited with code {process.exitcode}" + (f", frame {frame_id} lost" if slot is not None else ""))
+
+        if self.processes and len(self._exited) == len(self.processes):
+            raise RuntimeError("All inference workers exited")
+
+    def _accept(self, item, with_frame):
+        slot, frame_id, stream_id, shape, capture_time, crop_shape, record, elapsed = item
+        if self._outstanding.pop(frame_id, None) is None:
+            # Already given up on; its slot was freed then
+            return
+
+        result = ReadingResult(stream_id=stream_id, frame_id=frame_id, **record)
+        if crop_shape is not None:
+            result.warped_img = self.crop_ring.view(slot, crop_shape).copy()
+        if with_frame:
+            result.debug_frame = self.frame_ring.view(slot, shape).copy()
+
+        # The slot's frame and crop are no longer needed
+        self._free.append(slot)
+        self._pending[frame_id] = result
+
+        latency = time.perf_counter() - capture_time
+        self.metrics.observe("worker_read", elapsed)
+        self.metrics.observe("end_to_end", latency)
+        controller = self.latency_controller
+        if controller is not None:
+            controller.update(latency * 1000, imgsz_only=True)
+
+    def stop(self):
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+        if self.frame_ring is not None:
+            self.frame_ring.close()
+            self.crop_ring.close()
+            self.frame_ring = self.crop_ring = None
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "slots": self.slots,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "lost": self.lost,
+        }
@@ -0,0 +1,205 @@
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from src.core import logger
+from src.services.stream_server import ResultStreamServer
+
+
+class ReadingResult:
+    """
+    Structured output of ClockReader for one frame.
+    debug_frame and warped_img are kept for viewers but never serialized.
+    """
+    def __init__(self, timestamp, keypoints=None, pose_conf=0.0, digits=None, digit_confs=None,
+                 time_text="Checking...", stream_id=None, frame_id=None, debug_frame=None, warped_img=None,
+                 instance_id=None):
+        self.timestamp = timestamp
+        self.stream_id = stream_id
+        self.frame_id = frame_id
+        # Which clock in the frame (multi-clock mode), stable across frames
+        self.instance_id = instance_id
+        self.keypoints = keypoints
+        self.pose_conf = pose_conf
+        self.digits = digits or []
+        self.digit_confs = digit_confs or []
+        self.time_text = time_text
+        self.debug_frame = debug_frame
+        self.warped_img = warped_img
+
+    @property
+    def detected(self):
+        return self.keypoints is not None
+
+    def to_dict(self):
+        return {
+            "timestamp": self.timestamp,
+            "stream_id": self.stream_id,
+            "frame_id": self.frame_id,
+            "instance_id": self.instance_id,
+            "detected": self.detected,
+            "keypoints": self.keypoints.round(1).tolist() if self.keypoints is not None else None,
+            "pose_conf": round(self.pose_conf, 4) if self.pose_conf is not None else None,
+            "digits": list(self.digits),
+            "digit_confs": [round(c, 4) for c in self.digit_confs],
+            "time_text": self.time_text,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+
+class BatchedSink:
+    """
+    Buffers serialized records and hands them to _write_lines() in batches,
+    once `batch_size` records are pending or `flush_interval` seconds have passed.
+    A background thread flushes on time too, so at low reading rates records
+    don't wait for the next emit().
+    """
+    def __init__(self, batch_size=32, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        self._stop = threading.Event()
+        self._thread = None
+        if flush_interval > 0:
+            self._thread = threading.Thread(target=self._flush_loop, name=f"{type(self).__name__}-flush", daemon=True)
+            self._thread.start()
+
+    def emit(self, result):
+        with self._lock:
+            self._buffer.append(result.to_json())
+            if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1.0)
+        self.flush()
+
+    def _flush_loop(self):
+        # Checked twice per interval: a record waits at most 1.5x flush_interval
+        while not self._stop.wait(self.flush_interval / 2):
+            with self._lock:
+                if self._buffer and time.monotonic() - self._last_flush >= self.flush_interval:
+                    self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            try:
+                self._write_lines(self._buffer)
+            except Exception as e:
+                logger.error(f"{type(self).__name__} write failed, dropping {len(self._buffer)} records: {e}")
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def _write_lines(self, lines):
+        raise NotImplementedError
+
+
+class StdoutJsonlSink(BatchedSink):
+    def _write_lines(self, lines):
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
+class RotatingFileSink(BatchedSink):
+    """JSON lines into `path`, rotated at `max_bytes` keeping `backup_count` old files."""
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backup_count=5, **kwargs):
+        super().__init__(**kwargs)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Reuse logging's rotation logic, writing raw lines
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+
+    def _write_lines(self, lines):
+        for line in lines:
+            record = _RawRecord(line)
+            if self._handler.shouldRollover(record):
+                self._handler.doRollover()
+            self._handler.stream.write(line + "\n")
+        self._handler.flush()
+
+    def close(self):
+        super().close()
+        self._handler.close()
+
+
+class SocketSink(BatchedSink):
+    """
+    JSON lines over a local stream socket: "host:port" for TCP or a filesystem path
+    for a Unix socket. Reconnects on the next flush after a failure.
+    """
+    def __init__(self, address, **kwargs):
+        super().__init__(**kwargs)
+        self.address = address
+        self._sock = None
+
+    def _connect(self):
+        if ":" in self.address and not os.path.exists(self.address):
+            host, port = self.address.rsplit(":", 1)
+            sock = socket.create_connection((host, int(port)), timeout=1.0)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(1.0)
+            sock.connect(self.address)
+        return sock
+
+    def _write_lines(self, lines):
+        if self._sock is None:
+            self._sock = self._connect()
+        try:
+            self._sock.sendall(("\n".join(lines) + "\n").encode("utf-8"))
+        except OSError:
+            self._sock.close()
+            self._sock = None
+            raise
+
+    def close(self):
+        super().close()
+        if self._sock is not None:
+            self._sock.close()
+
+
+class _RawRecord:
+    # Minimal stand-in for logging.LogRecord, enough for RotatingFileHandler.shouldRollover
+    def __init__(self, msg):
+        self.msg = msg
+        self.args = None
+        self.exc_info = None
+        self.exc_text = None
+        self.stack_info = None
+
+    def getMessage(self):
+        return self.msg
+
+
+SINK_TYPES = {"stdout": StdoutJsonlSink, "file": RotatingFileSink, "socket": SocketSink, "server": ResultStreamServer}
+
+def create_sinks(configs):
+    """
+    Build sinks from settings, e.g.
+        [{"type": "stdout"}, {"type": "file", "path": "logs/readings.jsonl"}]
+    """
+    sinks = []
+    for config in configs:
+        config = dict(config)
+        sink_type = config.pop("type")
+        if sink_type not in SINK_TYPES:
+            raise ValueError(f"Unknown sink type '{sink_type}', expected one of {list(SINK_TYPES)}")
+        sink = SINK_TYPES[sink_type](**config)
+        if isinstance(sink, ResultStreamServer):
+            sink.start()
+        sinks.append(sink)
+    return sinks
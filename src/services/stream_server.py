@@ -0,0 +1,182 @@
+import asyncio
+import json
+import socket
+import threading
+
+from src.core import logger
+
+
+class _Client:
+    def __init__(self, writer, buffer_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = 0
+        self.lagging = 0
+
+
+class ResultStreamServer:
+    """
+    Local asyncio HTTP server publishing readings as Server-Sent Events.
+        GET /readings  -> text/event-stream, one `data: {json}` event per reading
+        GET /latest    -> the last reading as JSON
+        GET /health    -> subscriber and drop counters
+    publish() is thread-safe and never blocks the caller: each subscriber has a
+    bounded buffer and the oldest event is dropped when it is full. Every drop
+    raises a client's lag score and every clean delivery lowers it, so a client
+    keeping up with less than half the publish rate reaches `max_lag` and is
+    disconnected.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, client_buffer=64, max_lag=256):
+        self.host = host
+        self.port = port
+        self.client_buffer = client_buffer
+        self.max_lag = max_lag
+
+        self.clients = set()
+        self.latest = None
+        self.published = 0
+        self.disconnected = 0
+
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="result-stream", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        logger.info(f"Result stream: http://{self.host}:{self.port}/readings")
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5.0)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5.0)
+
+    def publish(self, payload):
+        """Queue a JSON string (or dict) for every subscriber. Safe to call from any thread."""
+        if self._loop is None:
+            return
+        if not isinstance(payload, str):
+            payload = json.dumps(payload, separators=(",", ":"))
+        self._loop.call_soon_threadsafe(self._broadcast, payload)
+
+    # Sink interface, so the server can sit in output.sinks
+    def emit(self, result):
+        self.publish(result.to_json())
+
+    def close(self):
+        self.stop()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        # Report the real port when started with port=0
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _shutdown(self):
+        # Stop accepting, then end the open streams: since Python 3.12 wait_closed()
+        # also waits for the connection handlers, which sit in queue.get()
+        self._server.close()
+        for client in list(self.clients):
+            self._end_stream(client)
+            client.writer.close()
+        await self._server.wait_closed()
+
+    def _broadcast(self, payload):
+        self.latest = payload
+        self.published += 1
+
+        for client in list(self.clients):
+            if client.queue.full():
+                # Latest wins: make room by dropping the oldest event
+                client.queue.get_nowait()
+                client.dropped += 1
+                client.lagging += 1
+                if client.lagging >= self.max_lag:
+                    self._disconnect(client)
+                    continue
+            elif client.lagging > 0:
+                client.lagging -= 1
+            client.queue.put_nowait(payload)
+
+    def _end_stream(self, client):
+        self.clients.discard(client)
+        # Wake the client's stream coroutine with the end marker
+        if client.queue.full():
+            client.queue.get_nowait()
+        client.queue.put_nowait(None)
+
+    def _disconnect(self, client):
+        self.disconnected += 1
+        self._end_stream(client)
+        logger.warning(f"Result stream: dropped slow subscriber after {client.dropped} lost events")
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            # Skip the remaining request headers
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            path = parts[1] if len(parts) >= 2 else "/"
+
+            if path == "/readings":
+                await self._stream(writer)
+            elif path == "/latest":
+                await self._respond(writer, "200 OK", "application/json", self.latest or "null")
+            elif path == "/health":
+                body = json.dumps({
+                    "subscribers": len(self.clients),
+                    "published": self.published,
+                    "disconnected": self.disconnected,
+                    "dropped": sum(c.dropped for c in self.clients),
+                })
+                await self._respond(writer, "200 OK", "application/json", body)
+            else:
+                await self._respond(writer, "404 Not Found", "text/plain", "not found")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, content_type, body):
+        data = body.encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+
+    async def _stream(self, writer):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n"
+        )
+        await writer.drain()
+
+        # Keep kernel-side buffering small so back-pressure shows up in the client queue
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 16 * 1024)
+
+        client = _Client(writer, self.client_buffer)
+        self.clients.add(client)
+        try:
+            while not writer.is_closing():
+                payload = await client.queue.get()
+                if payload is None:
+                    break
+                writer.write(f"data: {payload}\n\n".encode("utf-8"))
+                await writer.drain()
+        finally:
+            self.clients.discard(client)
@@ -0,0 +1,138 @@
+import time
+from collections import Counter, deque
+
+DAY_SECONDS = 24 * 3600
+
+class TimeModel:
+    """
+    Temporal decoder on top of DigitDetector output.
+    - Locks onto a reading once it wins a multi-frame vote.
+    - Predicts the next transition (every minute for HHMM, every second for HHMMSS).
+    - should_recognize() asks for digit recognition densely around the expected
+      transition and sparsely otherwise.
+    - Readings that keep contradicting the prediction trigger a resync.
+    """
+    def __init__(self, min_votes=3, vote_window=5, dense_window=2.0, sparse_interval=10.0, resync_after=3):
+        self.min_votes = min_votes
+        self.dense_window = dense_window
+        self.sparse_interval = sparse_interval
+        self.resync_after = resync_after
+
+        self.votes = deque(maxlen=vote_window)
+        self.resync()
+
+    def resync(self):
+        self.votes.clear()
+        self.value = None            # Locked reading, in seconds of the day
+        self.unit = 60               # Seconds between transitions
+        self.transition_time = None  # Monotonic time the locked value first appeared
+        self.locked_time = None
+        self.last_check = None
+        self.separator = ""
+        self.contradictions = 0
+
+    @property
+    def locked(self):
+        return self.value is not None
+
+    def parse(self, digits):
+        """
+        Output:
+            - (seconds of the day, unit) or None if the digits are not a valid time
+        """
+        text = "".join(str(d) for d in digits)
+        numbers = [c for c in text if c.isdigit()]
+
+        if len(numbers) == 4:
+            hh, mm, ss, unit = int("".join(numbers[:2])), int("".join(numbers[2:])), 0, 60
+        elif len(numbers) == 6:
+            hh, mm, ss, unit = int("".join(numbers[:2])), int("".join(numbers[2:4])), int("".join(numbers[4:])), 1
+        else:
+            return None
+
+        if hh > 23 or mm > 59 or ss > 59:
+            return None
+
+        self.separator = ":" if ":" in text else ""
+        return hh * 3600 + mm * 60 + ss, unit
+
+    def predict(self, now=None):
+        if not self.locked:
+            return None
+        if self.transition_time is None:
+            return self.value
+
+        now = time.monotonic() if now is None else now
+        steps = int((now - self.transition_time) // self.unit)
+        return (self.value + steps * self.unit) % DAY_SECONDS
+
+    def next_transition(self, now=None):
+        if not self.locked or self.transition_time is None:
+            return None
+
+        now = time.monotonic() if now is None else now
+        steps = int((now - self.transition_time) // self.unit) + 1
+        return self.transition_time + steps * self.unit
+
+    def should_recognize(self, now=None):
+        now = time.monotonic() if now is None else now
+
+        # Dense until locked and the transition phase is known
+        if self.transition_time is None:
+            return True
+
+        next_t = self.next_transition(now)
+        prev_t = next_t - self.unit
+        if next_t - now <= self.dense_window or now - prev_t <= self.dense_window:
+            return True
+
+        return self.last_check is None or now - self.last_check >= self.sparse_interval
+
+    def update(self, digits, now=None):
+        now = time.monotonic() if now is None else now
+        self.last_check = now
+
+        parsed = self.parse(digits)
+        if parsed is None:
+            return
+
+        value, unit = parsed
+
+        if not self.locked:
+            self._vote(value, unit, now)
+            return
+
+        predicted = self.predict(now)
+        if value == predicted:
+            self.contradictions = 0
+        elif value == (predicted + self.unit) % DAY_SECONDS:
+            # Transition seen slightly earlier than predicted (or phase still unknown)
+            self.value = value
+            self.transition_time = now
+            self.contradictions = 0
+        else:
+            self.contradictions += 1
+            if self.contradictions >= self.resync_after:
+                self.resync()
+                self._vote(value, unit, now)
+
+    def text(self, now=None):
+        value = self.predict(now)
+        if value is None:
+            return None
+
+        hh, mm, ss = value // 3600, (value % 3600) // 60, value % 60
+        parts = [f"{hh:02d}", f"{mm:02d}"]
+        if self.unit == 1:
+            parts.append(f"{ss:02d}")
+        return self.separator.join(parts)
+
+    def _vote(self, value, unit, now):
+        self.votes.append((value, unit))
+        (best, best_unit), count = Counter(self.votes).most_common(1)[0]
+
+        if count >= self.min_votes:
+            self.value = best
+            self.unit = best_unit
+            self.locked_time = now
+            self.votes.clear()
@@ -0,0 +1,82 @@
+import threading
+
+import numpy as np
+
+class BufferPool:
+    """
+    Reusable NumPy buffers, kept in free lists per (shape, dtype).
+    acquire() hands out a buffer the caller owns exclusively (contents are stale,
+    not zeroed) until it gives it back with release(); after that it must not be
+    touched. Arrays the pool did not hand out are ignored by release(), so a
+    buffer that OpenCV had to reallocate (e.g. a camera changing resolution)
+    is simply left to the garbage collector.
+    """
+    def __init__(self, max_free=8):
+        # Upper bound of idle buffers kept per shape
+        self.max_free = max_free
+
+        self._free = {}
+        self._owned = {}
+        self._lock = threading.Lock()
+
+        self.reserved = 0
+        self.allocations = 0
+        self.reuses = 0
+        self.releases = 0
+        self.detached = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buffer = free.pop()
+                self.reuses += 1
+            else:
+                buffer = np.empty(key[0], dtype=dtype)
+                self.allocations += 1
+            self._owned[id(buffer)] = buffer
+        return buffer
+
+    def acquire_like(self, array):
+        return self.acquire(array.shape, array.dtype)
+
+    def release(self, buffer):
+        if buffer is None:
+            return
+        with self._lock:
+            if self._owned.pop(id(buffer), None) is None:
+                return
+            self.releases += 1
+
+            free = self._free.setdefault((buffer.shape, buffer.dtype.str), [])
+            if len(free) < self.max_free:
+                free.append(buffer)
+
+    def detach(self, buffer):
+        """Hand a buffer over for good (e.g. to a background writer); the pool forgets it."""
+        with self._lock:
+            if self._owned.pop(id(buffer), None) is not None:
+                self.detached += 1
+
+    def reserve(self, shape, dtype=np.uint8, count=1):
+        """Preallocate `count` idle buffers at startup; they are counted as reserved, not as allocations."""
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.setdefault(key, [])
+            free.extend(np.empty(key[0], dtype=dtype) for _ in range(count))
+            self.reserved += count
+
+    def stats(self):
+        with self._lock:
+            total = self.allocations + self.reuses
+            return {
+                "reserved": self.reserved,
+                "allocations": self.allocations,
+                "reuses": self.reuses,
+                "reuse_rate": self.reuses / total if total else 0.0,
+                "outstanding": len(self._owned),
+                "detached": self.detached,
+                "idle": sum(len(free) for free in self._free.values()),
+                "idle_mb": sum(b.nbytes for free in self._free.values() for b in free) / (1024 * 1024),
+            }
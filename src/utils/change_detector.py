@@ -0,0 +1,58 @@
+import cv2
+import numpy as np
+
+class DisplayChangeDetector:
+    """
+    Tells whether a warped clock display differs from the one digits were
+    last read from. Both images are shrunk to a small grayscale thumbnail,
+    normalized for brightness, and compared block by block: the largest mean
+    absolute difference over `block` x `block` cells must stay under `threshold`.
+    A single changed segment is a small part of the display, so a global mean
+    would dilute it below the noise level.
+    """
+    def __init__(self, threshold=16.0, size=(32, 16), block=4):
+        self.threshold = threshold
+        self.size = size
+        self.block = block
+        self.reference = None
+
+        self.checks = 0
+        self.skipped = 0
+
+    def _thumbnail(self, image):
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        thumb = cv2.resize(image, self.size, interpolation=cv2.INTER_AREA).astype(np.float32)
+        # Remove global brightness shifts (auto exposure, flicker)
+        return thumb - thumb.mean()
+
+    def has_changed(self, image):
+        self.checks += 1
+        if self.reference is None:
+            return True
+
+        if self.difference(image) < self.threshold:
+            self.skipped += 1
+            return False
+        return True
+
+    def difference(self, image):
+        diff = np.abs(self._thumbnail(image) - self.reference)
+        h, w = diff.shape
+        b = self.block
+        # Crop to whole blocks, then mean per block
+        blocks = diff[:h - h % b, :w - w % b].reshape(h // b, b, w // b, b).mean(axis=(1, 3))
+        return float(blocks.max())
+
+    def update(self, image):
+        self.reference = self._thumbnail(image)
+
+    def reset(self):
+        self.reference = None
+
+    def stats(self):
+        return {
+            "checks": self.checks,
+            "skipped": self.skipped,
+            "skip_rate": self.skipped / self.checks if self.checks else 0.0,
+        }
@@ -0,0 +1,231 @@
+import glob
+import os
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+# One fixed-size record per crop in the .idx file next to each .bin shard
+INDEX_DTYPE = np.dtype([
+    ("timestamp", "<i8"),        # ms from the start of the video
+    ("blur_score", "<f4"),
+    ("keypoints", "<f4", (4, 2)),
+    ("offset", "<i8"),           # byte offset of the encoded image in the .bin shard
+    ("length", "<i4"),
+])
+
+class CropShardWriter:
+    """
+    Append-only sink for warped crops.
+    write() only queues the crop; a background thread JPEG-encodes it and appends
+    it to <prefix>_<n>.bin, plus one INDEX_DTYPE record to <prefix>_<n>.idx.
+    A new shard is started once the current one reaches `shard_size_mb`.
+    Numbering continues after the shards already in `output_dir` with the same
+    prefix, so a rerun into the same directory never appends to an old shard.
+    """
+    def __init__(self, output_dir, prefix="shard", shard_size_mb=256, quality=95, max_pending=256):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.shard_size = shard_size_mb * 1024 * 1024
+        self.quality = quality
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._shard_id = self._last_shard_id()
+        self._data_file = None
+        self._index_file = None
+        self._offset = 0
+        self._records = 0
+        self._queued = 0
+        self.written = 0
+        # (shard name, record number) of every crop in write() order, None if it could not be encoded
+        self.locations = []
+        self.error = None
+
+        self._thread = threading.Thread(target=self._write_loop, name="crop-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, image, timestamp, blur_score, keypoints):
+        """
+        Output:
+            - sequence number of the crop, its position in `locations` once the writer is closed
+        """
+        # Blocks only when the writer is `max_pending` crops behind
+        self._put((image, timestamp, blur_score, np.asarray(keypoints, dtype=np.float32)))
+        self._queued += 1
+        return self._queued - 1
+
+    def close(self):
+        if self._thread.is_alive():
+            self._put(None)
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _put(self, item):
+        # A dead writer thread would never drain the queue: fail with its error instead of blocking
+        while True:
+            if self.error is not None:
+                raise self.error
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if not self._thread.is_alive():
+                    raise RuntimeError("Crop writer thread exited")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_loop(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                self._append(*item)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._close_shard()
+
+    def _append(self, image, timestamp, blur_score, keypoints):
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            self.locations.append(None)
+            return
+
+        data = encoded.tobytes()
+        if self._data_file is None or self._offset + len(data) > self.shard_size:
+            self._open_next_shard()
+
+        record = np.zeros(1, dtype=INDEX_DTYPE)
+        record["timestamp"] = timestamp
+        record["blur_score"] = blur_score
+        record["keypoints"] = keypoints
+        record["offset"] = self._offset
+        record["length"] = len(data)
+
+        self._data_file.write(data)
+        self._index_file.write(record.tobytes())
+        self._offset += len(data)
+        self.locations.append((f"{self.prefix}_{self._shard_id:05d}", self._records))
+        self._records += 1
+        self.written += 1
+
+    def _last_shard_id(self):
+        last = -1
+        for path in glob.glob(os.path.join(glob.escape(self.output_dir), f"{glob.escape(self.prefix)}_*")):
+            suffix = os.path.splitext(os.path.basename(path))[0][len(self.prefix) + 1:]
+            if suffix.isdigit():
+                last = max(last, int(suffix))
+        return last
+
+    def _open_next_shard(self):
+        self._close_shard()
+        self._shard_id += 1
+        base = os.path.join(self.output_dir, f"{self.prefix}_{self._shard_id:05d}")
+        # "x": another writer claiming the same shard fails here instead of interleaving records
+        self._data_file = open(base + ".bin", "xb")
+        self._index_file = open(base + ".idx", "xb")
+        self._offset = 0
+        self._records = 0
+
+    def _close_shard(self):
+        for f in (self._data_file, self._index_file):
+            if f is not None:
+                f.close()
+        self._data_file = None
+        self._index_file = None
+
+
+def remove_records(shard_dir, locations):
+    """
+    Drop the index records at these (shard name, record number) locations, as
+    reported by CropShardWriter.locations. Only the named shards are touched;
+    the encoded bytes stay in the .bin files, unreferenced.
+    Output:
+        - number of records removed
+    """
+    by_shard = {}
+    for shard_name, record in locations:
+        by_shard.setdefault(shard_name, []).append(record)
+
+    removed = 0
+    for shard_name in sorted(by_shard):
+        idx_path = os.path.join(shard_dir, shard_name + ".idx")
+        index = np.fromfile(idx_path, dtype=INDEX_DTYPE)
+        keep = np.ones(len(index), dtype=bool)
+        keep[by_shard[shard_name]] = False
+
+        # Write then rename, so an interrupted run never leaves a truncated index
+        index[keep].tofile(idx_path + ".tmp")
+        os.replace(idx_path + ".tmp", idx_path)
+        removed += int((~keep).sum())
+    return removed
+
+
+class CropShardReader:
+    """
+    Random access over every shard in a directory.
+    Shard data is memory-mapped, so only the crops that are read get paged in.
+    Crops are ordered by timestamp across all shards.
+    """
+    def __init__(self, shard_dir):
+        self.shards = []
+        entries = []
+
+        for shard_id, idx_path in enumerate(sorted(glob.glob(os.path.join(shard_dir, "*.idx")))):
+            bin_path = idx_path[:-4] + ".bin"
+            index = np.fromfile(idx_path, dtype=INDEX_DTYPE)
+            if len(index) == 0 or not os.path.exists(bin_path):
+                continue
+
+            self.shards.append(np.memmap(bin_path, dtype=np.uint8, mode="r"))
+            shard_ref = np.full(len(index), len(self.shards) - 1, dtype=np.int32)
+            entries.append((index, shard_ref))
+
+        if entries:
+            self.index = np.concatenate([e[0] for e in entries])
+            self._shard_of = np.concatenate([e[1] for e in entries])
+            order = np.argsort(self.index["timestamp"], kind="stable")
+            self.index, self._shard_of = self.index[order], self._shard_of[order]
+        else:
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+            self._shard_of = np.zeros(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.index)
+
+    def read_bytes(self, i):
+        record = self.index[i]
+        data = self.shards[self._shard_of[i]]
+        return data[record["offset"]:record["offset"] + record["length"]]
+
+    def __getitem__(self, i):
+        """
+        Output:
+            - (decoded BGR image, index record)
+        """
+        return cv2.imdecode(np.asarray(self.read_bytes(i)), cv2.IMREAD_COLOR), self.index[i]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def export(self, output_dir):
+        """
+        Write every crop back out as clock_<timestamp>ms_<n>.jpg. The record number
+        keeps crops with the same timestamp (several clocks, parallel shards) apart.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        for i in range(len(self)):
+            path = os.path.join(output_dir, f"clock_{int(self.index[i]['timestamp'])}ms_{i:06d}.jpg")
+            with open(path, "wb") as f:
+                f.write(self.read_bytes(i).tobytes())
+        return len(self)
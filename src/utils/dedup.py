@@ -0,0 +1,139 @@
+import os
+
+import cv2
+import numpy as np
+
+# Hash grid (width, height): one bit per cell, 512 bits
+HASH_SIZE = (32, 16)
+HASH_BYTES = HASH_SIZE[0] * HASH_SIZE[1] // 8
+
+def block_hash(image, hash_size=HASH_SIZE):
+    """
+    Perceptual hash of a display crop (BGR or grayscale): one bit per cell of a
+    small thumbnail, set where the cell is lit. The threshold sits halfway between
+    the dark and bright levels, so exposure changes don't move it, and each bit
+    covers a fixed part of the display, so one changed segment flips the bits it
+    covers. On rendered displays any two readings are at least 5 bits apart,
+    while sensor noise flips about 3.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    thumb = cv2.resize(image, hash_size, interpolation=cv2.INTER_AREA).astype(np.float32)
+    low, high = np.percentile(thumb, (5, 95))
+    bits = (thumb > (low + high) / 2).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance, for near-duplicate lookup."""
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, h):
+        """
+        Output:
+            - False if `h` was already stored (size unchanged), True otherwise
+        """
+        if self.root is None:
+            self.root = (h, {})
+            self.size += 1
+            return True
+
+        node = self.root
+        while True:
+            dist = hamming(h, node[0])
+            if dist == 0:
+                return False
+            child = node[1].get(dist)
+            if child is None:
+                node[1][dist] = (h, {})
+                self.size += 1
+                return True
+            node = child
+
+    def find(self, h, max_distance):
+        """
+        Output:
+            - the first stored hash within `max_distance` of `h`, or None
+        """
+        if self.root is None:
+            return None
+
+        stack = [self.root]
+        while stack:
+            value, children = stack.pop()
+            dist = hamming(h, value)
+            if dist <= max_distance:
+                return value
+            # Triangle inequality: only these subtrees can hold a match
+            for d in range(max(dist - max_distance, 1), dist + max_distance + 1):
+                child = children.get(d)
+                if child is not None:
+                    stack.append(child)
+        return None
+
+
+class DedupIndex:
+    """
+    Persistent near-duplicate index over saved crops.
+    Hashes are stored in a .npy file as rows of HASH_BYTES bytes, so repeated
+    harvests of the same camera reject what earlier runs already captured.
+    """
+    def __init__(self, path=None, max_distance=3):
+        self.path = path
+        self.max_distance = max_distance
+        self.tree = BKTree()
+        self.new_hashes = []
+        self.rejected = 0
+
+        for row in self._load_existing():
+            self.tree.add(int.from_bytes(row.tobytes(), "big"))
+
+    def _load_existing(self):
+        if self.path is None or not os.path.exists(self.path):
+            return np.zeros((0, HASH_BYTES), dtype=np.uint8)
+
+        hashes = np.load(self.path)
+        if hashes.dtype != np.uint8 or hashes.ndim != 2 or hashes.shape[1] != HASH_BYTES:
+            # Index written with another hash (e.g. the former 128-bit DCT hash): not comparable
+            print(f"Warning: {self.path} uses an incompatible hash format, starting a new index")
+            return np.zeros((0, HASH_BYTES), dtype=np.uint8)
+        return hashes
+
+    def __len__(self):
+        return self.tree.size
+
+    def check_and_add(self, image):
+        """
+        Output:
+            - True if the image is new (and now indexed), False if a near-duplicate exists
+        """
+        h = block_hash(image)
+        if self.tree.find(h, self.max_distance) is not None:
+            self.rejected += 1
+            return False
+
+        self.add_hash(h)
+        return True
+
+    def add_hash(self, h):
+        if self.tree.add(h):
+            self.new_hashes.append(h)
+
+    def save(self):
+        if self.path is None or not self.new_hashes:
+            return
+
+        new = np.frombuffer(b"".join(h.to_bytes(HASH_BYTES, "big") for h in self.new_hashes), dtype=np.uint8)
+        hashes = np.concatenate([self._load_existing(), new.reshape(-1, HASH_BYTES)])
+
+        # Write then rename, so an interrupted run never leaves a truncated index
+        tmp_path = self.path + ".tmp.npy"
+        np.save(tmp_path, hashes)
+        os.replace(tmp_path, self.path)
+        self.new_hashes = []
@@ -1,44 +1,219 @@
+from collections import OrderedDict
+
 import cv2
 import numpy  as np
 
-def four_point_transform(image, pts, target_size=None):
+INTERPOLATIONS = {
+    "nearest": cv2.INTER_NEAREST,
+    "linear": cv2.INTER_LINEAR,
+    "cubic": cv2.INTER_CUBIC,
+}
+
+def _target_dims(pts, target_size=None):
+    (tl, tr, br, bl) = pts
+
+    if target_size is not None:
+        return target_size
+
+    # 1. Calculate the Width of the new image
+    # Max (BR-BL) or (TR-TL)
+    widthA = np.sqrt(((br[0]-bl[0])**2 + (br[1]-bl[1])**2))
+    widthB = np.sqrt(((tr[0]-tl[0])**2 + (tr[1]-tl[1])**2))
+    maxWidth = max(int(widthA), int(widthB))
+
+    # 2. Calculate the Height of the new image
+    # Max  (TR-BR) or (TL-BL)
+    heightA  =  np.sqrt(((tr[0]-br[0])**2 +(tr[1]-br[1])**2))
+    heightB  =  np.sqrt(((tl[0]-bl[0])**2 +(tl[1]-bl[1])**2))
+    maxHeight = max(int(heightA), int(heightB))
+
+    return maxWidth, maxHeight
+
+def _perspective_matrix(pts, maxWidth, maxHeight):
+    # 3. Construct the Destination Points
+    dst = np.array([
+        [0,0],                    # Top-left corner
+        [maxWidth-1, 0],          # Top-right corner
+        [maxWidth-1,maxHeight-1], # Bottom-right corner
+        [0, maxHeight-1]          # Bottom-left corner
+    ], dtype="float32")
+
+    src = np.array(pts, dtype="float32")
+
+    return cv2.getPerspectiveTransform(src, dst)
+
+def four_point_transform(image, pts, target_size=None, interpolation=cv2.INTER_CUBIC, dst=None):
     """
     Perspective Transform
     Input:
         - image: raw  (numpy array)
         - pts: list 4 points from YOLO pose
+        - interpolation: cv2 interpolation flag (INTER_CUBIC by default)
+        - dst: optional preallocated output of the target size (e.g. from a BufferPool)
     Output:
         - warped
     """
-    (tl, tr, br, bl) = pts
+    maxWidth, maxHeight = _target_dims(pts, target_size)
+
+    M = _perspective_matrix(pts, maxWidth, maxHeight)
+    warped = cv2.warpPerspective(image, M, (maxWidth, maxHeight), dst=dst, flags=interpolation)
+
+    return warped
+
+
+def perspective_matrices(quads, width, height):
+    """
+    Homographies for many quads at once (one batched 8x8 solve instead of a
+    cv2.getPerspectiveTransform call per quad).
+    Input:
+        - quads: (N, 4, 2) corners in tl, tr, br, bl order
+    Output:
+        - (N, 3, 3) float64; NaN for degenerate quads (see valid_quads), so one
+          bad detection doesn't fail the whole batch
+    """
+    src = np.asarray(quads, dtype=np.float64).reshape(-1, 4, 2)
+    dst = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float64)
+
+    matrices = np.full((src.shape[0], 3, 3), np.nan)
+    valid = valid_quads(src)
+    if valid.any():
+        matrices[valid] = _solve_homographies(src[valid], dst)
+    return matrices
+
+def valid_quads(quads, min_area=1.0):
+    """
+    A homography needs four corners with no three (nearly) collinear: every
+    triangle of three corners must have an area of at least `min_area` px².
+    Output:
+        - (N,) bool
+    """
+    quads = np.asarray(quads, dtype=np.float64).reshape(-1, 4, 2)
+    valid = np.ones(len(quads), dtype=bool)
+    for skip in range(4):
+        a, b, c = quads[:, [i for i in range(4) if i != skip]].transpose(1, 0, 2)
+        area = 0.5 * np.abs((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+        valid &= area >= min_area
+    return valid & np.isfinite(quads).all(axis=(1, 2))
+
+def _solve_homographies(src, dst):
+    n = src.shape[0]
+    x, y = src[..., 0], src[..., 1]
+    u, v = dst[:, 0], dst[:, 1]
+    zeros, ones = np.zeros((n, 4)), np.ones((n, 4))
+
+    # u = (h0 x + h1 y + h2) / (h6 x + h7 y + 1), same for v with h3..h5
+    rows_u = np.stack([x, y, ones, zeros, zeros, zeros, -u * x, -u * y], axis=2)
+    rows_v = np.stack([zeros, zeros, zeros, x, y, ones, -v * x, -v * y], axis=2)
+    A = np.concatenate([rows_u, rows_v], axis=1)
+    b = np.broadcast_to(np.concatenate([u, v]), (n, 8))
+
+    h = np.linalg.solve(A, b[..., None])[..., 0]
+    return np.concatenate([h, np.ones((n, 1))], axis=1).reshape(n, 3, 3)
+
+def four_point_transform_batch(image, quads, target_size=None, interpolation=cv2.INTER_CUBIC):
+    """
+    four_point_transform for several quads in the same image.
+    Input:
+        - quads: sequence of (4, 2) keypoints
+        - target_size: (w, h); when set, all homographies come from one batched
+          solve and the crops share one contiguous (N, h, w, C) buffer
+    Output:
+        - list of warped crops, in input order; None for degenerate quads
+    """
+    if len(quads) == 0:
+        return []
 
     if target_size is None:
-        # 1. Calculate the Width of the new image
-        # Max (BR-BL) or (TR-TL)
-        widthA = np.sqrt(((br[0]-bl[0])**2 + (br[1]-bl[1])**2))
-        widthB = np.sqrt(((tr[0]-tl[0])**2 + (tr[1]-tl[1])**2))
-        maxWidth = max(int(widthA), int(widthB))
-
-        # 2. Calculate the Height of the new image
-        # Max  (TR-BR) or (TL-BL)
-        heightA  =  np.sqrt(((tr[0]-br[0])**2 +(tr[1]-br[1])**2))
-        heightB  =  np.sqrt(((tl[0]-bl[0])**2 +(tl[1]-bl[1])**2))
-        maxHeight = max(int(heightA), int(heightB))
-
-    else:
-        maxWidth, maxHeight = target_size
-        
-    # 3. Construct the Destination Points
-    dst = np.array([
-        [0,0],                    # Top-left corner
-        [maxWidth-1, 0],          # Top-right corner
-        [maxWidth-1,maxHeight-1], # Bottom-right corner
-        [0, maxHeight-1]          # Bottom-left corner
-    ], dtype="float32")
+        valid = valid_quads(np.stack(quads))
+        return [four_point_transform(image, pts, None, interpolation) if ok else None for pts, ok in zip(quads, valid)]
+
+    width, height = target_size
+    matrices = perspective_matrices(np.stack(quads), width, height)
+
+    out = np.empty((len(quads), height, width) + image.shape[2:], dtype=image.dtype)
+    crops = []
+    for M, dst in zip(matrices, out):
+        if np.isnan(M).any():
+            crops.append(None)
+            continue
+        cv2.warpPerspective(image, M, (width, height), dst=dst, flags=interpolation)
+        crops.append(dst)
+    return crops
+
+
+class CachedWarper:
+    """
+    Stateful four_point_transform.
+    The homography and the cv2.remap maps are cached, keyed by the keypoints
+    quantized to `quantum` pixels and the target size, so a stable quad only
+    pays for the remap itself. By default the result is written into a
+    reused output buffer, which is overwritten by the next call.
+    """
+    def __init__(self, target_size=None, interpolation=cv2.INTER_CUBIC, quantum=1.0, max_entries=8):
+        self.target_size = target_size
+        self.interpolation = interpolation
+        self.quantum = quantum
+        self.max_entries = max_entries
+
+        self._cache = OrderedDict()
+        self._output = None
+        self.hits = 0
+        self.misses = 0
+
+    def warp(self, image, pts, reuse_output=True):
+        pts = np.asarray(pts, dtype=np.float32)
+        size = _target_dims(pts, self.target_size)
+
+        key = (tuple(np.round(pts / self.quantum).astype(int).ravel()), size)
+        maps = self._cache.get(key)
+
+        if maps is None:
+            self.misses += 1
+            maps = self._build_maps(pts, size)
+            self._cache[key] = maps
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+
+        map1, map2 = maps
+        dst = self._output_buffer(image, size) if reuse_output else None
+
+        return cv2.remap(image, map1, map2, self.interpolation, dst=dst)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._cache),
+        }
+
+    def clear(self):
+        self._cache.clear()
+        self._output = None
+
+    def _build_maps(self, pts, size):
+        maxWidth, maxHeight = size
+        M = _perspective_matrix(pts, maxWidth, maxHeight)
+
+        # Map every destination pixel back to its source location
+        M_inv = np.linalg.inv(M)
+        xs, ys = np.meshgrid(np.arange(maxWidth, dtype=np.float64), np.arange(maxHeight, dtype=np.float64))
+        grid = np.stack([xs, ys, np.ones_like(xs)], axis=-1) @ M_inv.T
+
+        map_x = (grid[..., 0] / grid[..., 2]).astype(np.float32)
+        map_y = (grid[..., 1] / grid[..., 2]).astype(np.float32)
 
-    src = np.array([tl, tr, br, bl], dtype="float32")
+        # Fixed-point maps are faster to remap with
+        return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
 
-    M = cv2.getPerspectiveTransform(src, dst)
-    warped = cv2.warpPerspective(image, M, (maxWidth, maxHeight), flags=cv2.INTER_CUBIC)
+    def _output_buffer(self, image, size):
+        maxWidth, maxHeight = size
+        shape = (maxHeight, maxWidth) + image.shape[2:]
 
-    return warped
\ No newline at end of file
+        if self._output is None or self._output.shape != shape or self._output.dtype != image.dtype:
+            self._output = np.empty(shape, dtype=image.dtype)
+        return self._output
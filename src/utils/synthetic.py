@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+
+# Segments a-g, lit per digit
+SEGMENT_DIGITS = {
+    "0": "abcdef", "1": "bc", "2": "abged", "3": "abgcd", "4": "fgbc",
+    "5": "afgcd", "6": "afgedc", "7": "abc", "8": "abcdefg", "9": "abcdfg",
+}
+
+# Segment rectangles inside one digit cell, as (x0, y0, x1, y1) fractions of the cell
+SEGMENT_BOXES = {
+    "a": (0.20, 0.05, 0.80, 0.15),
+    "b": (0.75, 0.10, 0.88, 0.48),
+    "c": (0.75, 0.52, 0.88, 0.90),
+    "d": (0.20, 0.85, 0.80, 0.95),
+    "e": (0.12, 0.52, 0.25, 0.90),
+    "f": (0.12, 0.10, 0.25, 0.48),
+    "g": (0.20, 0.45, 0.80, 0.55),
+}
+
+def render_display(time_text, size=(320, 128), on_color=(40, 255, 80), off_color=(20, 35, 20)):
+    """
+    Draw a seven-segment display filling `size` (width, height).
+    `time_text` is digits with an optional ':' between pairs, e.g. "12:34".
+    """
+    width, height = size
+    display = np.full((height, width, 3), 10, dtype=np.uint8)
+
+    digits = [c for c in time_text if c.isdigit()]
+    cell_w = width / (len(digits) + 0.5)
+    x = cell_w * 0.25
+
+    for i, ch in enumerate(time_text):
+        if ch == ":":
+            for cy in (0.35, 0.65):
+                cv2.circle(display, (int(x - cell_w * 0.05), int(height * cy)), max(2, height // 24), on_color, -1)
+            continue
+
+        lit = SEGMENT_DIGITS.get(ch, "")
+        for seg, (x0, y0, x1, y1) in SEGMENT_BOXES.items():
+            color = on_color if seg in lit else off_color
+            cv2.rectangle(display,
+                          (int(x + x0 * cell_w), int(y0 * height)),
+                          (int(x + x1 * cell_w), int(y1 * height)),
+                          color, -1)
+        x += cell_w
+
+    return display
+
+def random_quad(frame_size, rng, scale=0.4, jitter=0.08):
+    """
+    A perspective quad (tl, tr, br, bl) with the display's aspect ratio,
+    placed at a random position in a frame of `frame_size` (width, height).
+    """
+    width, height = frame_size
+    quad_w = width * scale
+    quad_h = quad_w * 0.4
+
+    cx = rng.uniform(quad_w / 2 + 10, width - quad_w / 2 - 10)
+    cy = rng.uniform(quad_h / 2 + 10, height - quad_h / 2 - 10)
+
+    base = np.array([[-quad_w / 2, -quad_h / 2], [quad_w / 2, -quad_h / 2],
+                     [quad_w / 2, quad_h / 2], [-quad_w / 2, quad_h / 2]])
+    noise = rng.uniform(-jitter, jitter, size=(4, 2)) * np.array([quad_w, quad_h])
+    return (base + noise + np.array([cx, cy])).astype(np.float32)
+
+def generate_clock_scene(frame_size=(640, 480), time_text="12:34", rng=None, display_size=(320, 128)):
+    """
+    Synthetic camera frame with a seven-segment clock under perspective.
+    Output:
+        - frame (BGR)
+        - keypoints (tl, tr, br, bl) of the display in the frame
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    width, height = frame_size
+
+    frame = rng.integers(60, 160, size=(height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (0, 0), 3)
+
+    display = render_display(time_text, display_size)
+    quad = random_quad(frame_size, rng)
+
+    dw, dh = display_size
+    src = np.array([[0, 0], [dw - 1, 0], [dw - 1, dh - 1], [0, dh - 1]], dtype=np.float32)
+    M = cv2.getPerspectiveTransform(src, quad)
+
+    warped = cv2.warpPerspective(display, M, (width, height))
+    mask = cv2.warpPerspective(np.full((dh, dw), 255, dtype=np.uint8), M, (width, height))
+    frame[mask > 0] = warped[mask > 0]
+
+    return frame, quad
+
+def random_time_text(rng):
+    return f"{rng.integers(0, 24):02d}:{rng.integers(0, 60):02d}"
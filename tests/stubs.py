@@ -0,0 +1,48 @@
+"""
+Stub model backends shared by the tests that run ClockDetector/ClockReader
+without trained weights.
+"""
+import numpy as np
+
+from src.detectors.backends import Prediction
+from src.services.clock_reader import ClockReader
+
+
+class StubBackend:
+    """
+    Stands in for a model backend: `respond(image)` gives the Prediction for
+    each image. Every predict call is recorded as (image shapes, imgsz).
+    """
+    def __init__(self, respond, names=None):
+        self.respond = respond
+        self.names = names or {i: str(i) for i in range(10)}
+        self.calls = []
+
+    def predict(self, images, conf, imgsz=None):
+        images = list(images)
+        self.calls.append(([image.shape for image in images], imgsz))
+        return [self.respond(image) for image in images]
+
+
+def pose_prediction(*quads):
+    """Prediction with one pose instance per quad, confidence falling in the given order."""
+    if not quads:
+        return Prediction(np.zeros((0, 6), np.float32), np.zeros((0, 4, 3), np.float32))
+    keypoints = np.array([np.hstack([np.asarray(q, np.float32), np.ones((4, 1), np.float32)]) for q in quads])
+    boxes = np.array([[*kpts[:, :2].min(0), *kpts[:, :2].max(0), 0.9 - 0.1 * i, 0] for i, kpts in enumerate(keypoints)], np.float32)
+    return Prediction(boxes, keypoints)
+
+
+def digit_prediction(digits):
+    """Prediction with one box per digit, left to right."""
+    boxes = np.array([[10 + 40 * i, 10, 40 + 40 * i, 100, 0.9, int(d)] for i, d in enumerate(digits)], np.float32).reshape(-1, 6)
+    return Prediction(boxes)
+
+
+def make_reader(pose, digits=lambda crop: digit_prediction("1234"), **kwargs):
+    """ClockReader on stub backends: `pose(frame)` and `digits(crop)` return Predictions."""
+    reader = ClockReader("pose.onnx", "digits.onnx", warp_size=(320, 128), draw=False, lazy_load=True, **kwargs)
+    reader.pose_detector._backend = StubBackend(pose)
+    reader.digit_detector._backend = StubBackend(digits)
+    reader.digit_detector._loaded = True
+    return reader
@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.detectors.backends import _ExportedBackend, letterbox
+
+
+def _backend(dynamic_shape, input_size=None):
+    backend = _ExportedBackend()
+    backend.dynamic_shape = dynamic_shape
+    backend.input_size = input_size
+    return backend
+
+
+def test_dynamic_graph_uses_export_imgsz():
+    backend = _backend(dynamic_shape=True)
+    backend._load_metadata({"names": {0: "0"}, "imgsz": [320, 320]})
+    assert backend.input_size == (320, 320)
+
+
+def test_dynamic_graph_without_imgsz_falls_back_to_640():
+    backend = _backend(dynamic_shape=True)
+    backend._load_metadata({})
+    assert backend.input_size == (640, 640)
+
+
+def test_static_graph_keeps_its_input_shape():
+    backend = _backend(dynamic_shape=False, input_size=(480, 288))
+    backend._load_metadata({"imgsz": [320, 320]})
+    assert backend.input_size == (480, 288)
+
+
+def test_letterbox_output_size():
+    blob, (gain, pad_x, pad_y, width, height) = letterbox(np.zeros((128, 320, 3), np.uint8), (320, 320))
+    assert blob.shape == (3, 320, 320)
+    assert (width, height) == (320, 128) and gain == 1.0
+
+
+def test_static_graph_warns_once_when_imgsz_is_ignored(capsys):
+    backend = _backend(dynamic_shape=False, input_size=(320, 320))
+    backend._load_metadata({"names": {0: "0"}})
+    backend.dynamic_batch = True
+    seen = []
+    backend._run = lambda blob: seen.append(blob.shape) or np.zeros((len(blob), 5, 0), np.float32)
+
+    image = np.zeros((240, 320, 3), np.uint8)
+    backend.predict([image], conf=0.5, imgsz=160)
+    backend.predict([image], conf=0.5, imgsz=160)
+
+    # Still run at the graph's own size
+    assert seen == [(1, 3, 320, 320)] * 2
+    assert capsys.readouterr().out.count("imgsz 160 ignored") == 1
@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.detectors import ClockDetector
+from stubs import StubBackend, digit_prediction, make_reader, pose_prediction
+
+QUAD = np.array([[100, 100], [420, 100], [420, 228], [100, 228]], dtype=np.float32)
+
+
+def _frame(value):
+    # The fill value tells the stubs which frame they are looking at; 0 has no clock
+    return np.full((480, 640, 3), value, np.uint8)
+
+
+def _pose(frame):
+    value = int(frame[0, 0, 0])
+    return pose_prediction(QUAD + value) if value else pose_prediction()
+
+
+def _digits(crop):
+    # Crops are filled with their frame's value too
+    return digit_prediction(f"{int(crop[0, 0, 0]):04d}")
+
+
+def test_detect_batch_keeps_input_order():
+    detector = ClockDetector("pose.onnx", 0.5, lazy=True)
+    detector._backend = StubBackend(_pose)
+
+    results = detector.detect_batch([_frame(3), _frame(0), _frame(7)], return_score=True)
+    assert len(detector.backend.calls) == 1
+    np.testing.assert_array_equal(results[0][0], QUAD + 3)
+    assert results[1] == (None, 0.0)
+    np.testing.assert_array_equal(results[2][0], QUAD + 7)
+
+
+def test_read_batch_results_stay_at_their_index():
+    reader = make_reader(_pose, digits=_digits)
+    frames = [_frame(0), _frame(5), _frame(0), _frame(9)]
+
+    results = reader.read_batch(frames, stream_ids=["a", "b", "c", "d"])
+    assert [r.stream_id for r in results] == ["a", "b", "c", "d"]
+    assert [r.time_text for r in results] == ["Checking...", "0005", "Checking...", "0009"]
+    assert results[0].warped_img is None and results[2].keypoints is None
+    np.testing.assert_array_equal(results[3].keypoints, QUAD + 9)
+    # One batch per model, only the two found crops go to the digit model
+    assert len(reader.digit_detector.backend.calls) == 1
+    assert len(reader.digit_detector.backend.calls[0][0]) == 2
+
+
+def test_process_frames_matches_read_batch():
+    reader = make_reader(_pose, digits=_digits)
+    outputs = reader.process_frames([_frame(2), _frame(0)])
+
+    assert [time_text for _, _, time_text in outputs] == ["0002", "Checking..."]
+    assert outputs[0][1] is not None and outputs[1][1] is None
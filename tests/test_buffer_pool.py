@@ -0,0 +1,70 @@
+import numpy as np
+
+import src.services.clock_reader as clock_reader
+from src.utils.buffer_pool import BufferPool
+from stubs import make_reader, pose_prediction
+
+
+def test_released_buffer_is_reused():
+    pool = BufferPool()
+    first = pool.acquire((4, 4, 3))
+    pool.release(first)
+    second = pool.acquire((4, 4, 3))
+
+    assert second is first
+    stats = pool.stats()
+    assert stats["allocations"] == 1 and stats["reuses"] == 1
+
+
+def test_shapes_and_dtypes_are_kept_apart():
+    pool = BufferPool()
+    pool.release(pool.acquire((4, 4)))
+    assert pool.acquire((4, 4), np.float32).dtype == np.float32
+    assert pool.acquire((2, 8)).shape == (2, 8)
+    assert pool.stats()["reuses"] == 0
+
+
+def test_reserved_buffers_are_not_allocations():
+    pool = BufferPool()
+    pool.reserve((8, 8), count=2)
+    a, b = pool.acquire((8, 8)), pool.acquire((8, 8))
+
+    assert a is not b
+    stats = pool.stats()
+    assert stats["reserved"] == 2 and stats["allocations"] == 0 and stats["outstanding"] == 2
+
+
+def test_foreign_and_detached_buffers_are_ignored():
+    pool = BufferPool()
+    pool.release(np.empty((4, 4)))
+    pool.release(None)
+
+    buffer = pool.acquire((4, 4))
+    pool.detach(buffer)
+    pool.release(buffer)
+
+    stats = pool.stats()
+    assert stats["idle"] == 0 and stats["detached"] == 1 and stats["outstanding"] == 0
+
+
+def test_idle_buffers_are_capped():
+    pool = BufferPool(max_free=2)
+    buffers = [pool.acquire((4,)) for _ in range(5)]
+    for buffer in buffers:
+        pool.release(buffer)
+    assert pool.stats()["idle"] == 2
+
+
+def test_failed_warp_returns_its_buffer(monkeypatch):
+    quad = [[10, 10], [110, 10], [110, 50], [10, 50]]
+    pool = BufferPool()
+    reader = make_reader(lambda frame: pose_prediction(quad), buffer_pool=pool)
+
+    def fail(*args, **kwargs):
+        raise ValueError("bad quad")
+    monkeypatch.setattr(clock_reader, "four_point_transform", fail)
+
+    result = reader.read(np.zeros((120, 160, 3), np.uint8))
+    assert result.warped_img is None
+    reader.release(result)
+    assert pool.stats()["outstanding"] == 0
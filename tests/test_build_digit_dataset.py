@@ -0,0 +1,115 @@
+import json
+import os
+import sys
+import types
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core import settings
+from src.detectors.segment_decoder import default_digit_cells
+from src.utils.geometry import perspective_matrices
+from src.utils.synthetic import render_display
+
+# A plain module import, so the pool workers can unpickle build_item
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+import build_digit_dataset
+
+# Display corners in a 640x480 frame, tl, tr, br, bl
+QUAD = np.array([[160, 176], [480, 176], [480, 304], [160, 304]], dtype=np.float32)
+
+
+def _pose_row(quad, width=640, height=480, visibility=True):
+    kpts = quad / np.array([width, height], dtype=np.float32)
+    values = [v for x, y in kpts for v in ((x, y, 2) if visibility else (x, y))]
+    return "0 0.5 0.5 0.5 0.27 " + " ".join(f"{v:.6f}" for v in values)
+
+
+def test_parse_pose_labels_scales_to_pixels():
+    text = "\n".join([_pose_row(QUAD), _pose_row(QUAD + 10, visibility=False), "0 0.5 0.5 0.1 0.1"])
+    quads = build_digit_dataset.parse_pose_labels(text, 640, 480)
+
+    # Triplets and pairs both parse, the row without keypoints is skipped
+    assert len(quads) == 2
+    np.testing.assert_allclose(quads[0], QUAD, atol=1e-3)
+    np.testing.assert_allclose(quads[1], QUAD + 10, atol=1e-3)
+    assert build_digit_dataset.parse_pose_labels(None, 640, 480) == []
+
+
+def test_project_digit_labels_into_the_crop():
+    M = perspective_matrices(QUAD[None], 320, 128)[0]
+    # Left quarter of the display, and a box entirely outside it
+    text = "3 0.3125 0.5 0.125 0.2666667\n5 0.05 0.05 0.05 0.05\n"
+    rows = build_digit_dataset.project_digit_labels(text, M, 640, 480, 320, 128)
+
+    assert len(rows) == 1
+    cls, box = rows[0]
+    assert cls == 3
+    np.testing.assert_allclose(box, (0.0, 0.0, 0.25, 1.0), atol=0.01)
+
+
+def test_autolabel_uses_the_configured_segment_layout():
+    layout = [[0.0, 0.0, 0.5, 1.0], [0.5, 0.0, 1.0, 1.0]]
+    build_digit_dataset.init_worker({"autolabel": True, "segment_layout": layout, "min_confidence": 0.5})
+    np.testing.assert_allclose(build_digit_dataset._decoder.digit_cells, layout)
+
+
+def _args(tmp_path, **kwargs):
+    defaults = dict(pose_data=str(tmp_path / "pose"), output=str(tmp_path / "digits"), digit_labels=None,
+                    min_confidence=0.5, workers=1, quality=95, force=False)
+    defaults.update(kwargs)
+    return types.SimpleNamespace(**defaults)
+
+
+def _pose_dataset(tmp_path, times):
+    for folder in ("images/train", "labels/train"):
+        os.makedirs(tmp_path / "pose" / folder, exist_ok=True)
+    for name, time_text in times.items():
+        frame = np.zeros((480, 640, 3), np.uint8)
+        frame[176:304, 160:480] = render_display(time_text)
+        cv2.imwrite(str(tmp_path / "pose" / "images" / "train" / f"{name}.png"), frame)
+        (tmp_path / "pose" / "labels" / "train" / f"{name}.txt").write_text(_pose_row(QUAD) + "\n")
+
+
+def _manifest(tmp_path):
+    with open(tmp_path / "digits" / build_digit_dataset.MANIFEST) as f:
+        return json.load(f)
+
+
+def test_manifest_skips_unchanged_and_rebuilds_on_changes(tmp_path, capsys, monkeypatch):
+    pytest.importorskip("yaml")
+    _pose_dataset(tmp_path, {"a": "12:34", "b": "07:50"})
+    args = _args(tmp_path)
+
+    build_digit_dataset.build_dataset(args)
+    assert "0 unchanged, 2 to build" in capsys.readouterr().out
+    labels = sorted(os.listdir(tmp_path / "digits" / "labels" / "train"))
+    assert labels == ["a_0.txt", "b_0.txt"]
+    # Auto-labelled: four digits, classes in reading order
+    rows = (tmp_path / "digits" / "labels" / "train" / "a_0.txt").read_text().splitlines()
+    assert [row.split()[0] for row in rows] == ["1", "2", "3", "4"]
+
+    build_digit_dataset.build_dataset(args)
+    assert "2 unchanged, 0 to build" in capsys.readouterr().out
+
+    # A changed label only rebuilds its own image
+    (tmp_path / "pose" / "labels" / "train" / "b.txt").write_text(_pose_row(QUAD + 1) + "\n")
+    build_digit_dataset.build_dataset(args)
+    assert "1 unchanged, 1 to build" in capsys.readouterr().out
+
+    # A different segment layout invalidates every auto-label, and the boxes follow it
+    layout = [[x0, 0.05, x1, 0.95] for x0, _, x1, _ in default_digit_cells()]
+    monkeypatch.setitem(settings._config, "recognition", dict(settings._config.get("recognition", {}), segment_layout=layout))
+    build_digit_dataset.build_dataset(args)
+    assert "0 unchanged, 2 to build" in capsys.readouterr().out
+    assert _manifest(tmp_path)["params"]["segment_layout"] == layout
+    relabeled = (tmp_path / "digits" / "labels" / "train" / "a_0.txt").read_text().splitlines()
+    assert [row.split()[0] for row in relabeled] == ["1", "2", "3", "4"]
+    assert float(relabeled[0].split()[4]) < float(rows[0].split()[4])
+
+    # Removed sources lose their crops and labels
+    os.remove(tmp_path / "pose" / "images" / "train" / "b.png")
+    build_digit_dataset.build_dataset(args)
+    assert sorted(os.listdir(tmp_path / "digits" / "labels" / "train")) == ["a_0.txt"]
+    assert list(_manifest(tmp_path)["entries"]) == ["train/a.png"]
@@ -0,0 +1,39 @@
+import numpy as np
+
+from src.utils.change_detector import DisplayChangeDetector
+from src.utils.synthetic import render_display
+
+
+def _noisy(image, rng):
+    noisy = image.astype(np.float32) * rng.uniform(0.9, 1.1) + rng.normal(0, 6, image.shape)
+    return np.clip(noisy, 0, 255).astype(np.uint8)
+
+
+def test_consecutive_minutes_are_changes():
+    detector = DisplayChangeDetector()
+    for hour in (0, 12, 23):
+        for minute in range(59):
+            detector.update(render_display(f"{hour:02d}:{minute:02d}"))
+            assert detector.has_changed(render_display(f"{hour:02d}:{minute + 1:02d}")), f"{hour:02d}:{minute:02d}"
+
+
+def test_single_segment_changes_are_detected():
+    detector = DisplayChangeDetector()
+    for before, after in [("12:35", "12:36"), ("12:38", "12:39"), ("12:31", "12:37")]:
+        detector.update(render_display(before))
+        assert detector.has_changed(render_display(after))
+
+
+def test_sensor_noise_and_brightness_are_not_changes():
+    rng = np.random.default_rng(0)
+    detector = DisplayChangeDetector()
+    display = render_display("08:15")
+    detector.update(display)
+
+    for _ in range(50):
+        assert not detector.has_changed(_noisy(display, rng))
+    assert detector.stats()["skipped"] == 50
+
+
+def test_first_frame_counts_as_changed():
+    assert DisplayChangeDetector().has_changed(render_display("10:00"))
@@ -0,0 +1,69 @@
+import numpy as np
+
+from src.detectors import ClockDetector
+from stubs import StubBackend, pose_prediction
+
+FRAME = np.zeros((480, 640, 3), np.uint8)
+QUAD = np.array([[200, 200], [300, 200], [300, 250], [200, 250]], dtype=np.float32)
+
+
+def _detector(respond):
+    detector = ClockDetector("pose.onnx", 0.5, roi_imgsz=320, roi_margin=0.5, lazy=True)
+    detector._backend = StubBackend(respond)
+    return detector
+
+
+def test_search_window_is_grown_and_clipped():
+    detector = _detector(None)
+    detector.last_keypoints = QUAD
+    # 100x50 box, padded by 50 on every side
+    assert detector.search_window(FRAME.shape) == (150, 150, 350, 300)
+
+    detector.last_keypoints = QUAD - 190
+    assert detector.search_window(FRAME.shape)[:2] == (0, 0)
+
+
+def test_roi_keypoints_are_mapped_back_to_the_frame():
+    def respond(image):
+        if image.shape[:2] == FRAME.shape[:2]:
+            return pose_prediction(QUAD)
+        # Window origin is (150, 150); one corner predicted past the window's top-left
+        return pose_prediction(QUAD - 150 + [[-400, -400], [5, 0], [5, 0], [5, 0]])
+
+    detector = _detector(respond)
+    np.testing.assert_array_equal(detector.detect(FRAME), QUAD)
+
+    kpts = detector.detect(FRAME)
+    shapes, imgsz = detector.backend.calls[-1]
+    assert shapes == [(150, 200, 3)] and imgsz == 320
+    np.testing.assert_array_equal(kpts, [[0, 0], [305, 200], [305, 250], [205, 250]])
+
+
+def test_roi_keypoints_are_clamped_to_the_frame():
+    near_edge = np.array([[560, 400], [630, 400], [630, 470], [560, 470]], dtype=np.float32)
+
+    def respond(image):
+        if image.shape[:2] == FRAME.shape[:2]:
+            return pose_prediction(near_edge)
+        # Predicted beyond the window, which already ends at the frame border
+        return pose_prediction(near_edge - [525, 365] + 60)
+
+    detector = _detector(respond)
+    detector.detect(FRAME)
+    kpts = detector.detect(FRAME)
+    assert kpts[:, 0].max() == 639 and kpts[:, 1].max() == 479
+    assert kpts.min() >= 0
+
+
+def test_falls_back_to_the_full_frame_when_the_window_misses():
+    def respond(image):
+        if image.shape[:2] == FRAME.shape[:2]:
+            return pose_prediction(QUAD + 100)
+        return pose_prediction()
+
+    detector = _detector(respond)
+    detector.last_keypoints = QUAD
+
+    np.testing.assert_array_equal(detector.detect(FRAME), QUAD + 100)
+    assert [shapes for shapes, _ in detector.backend.calls] == [[(150, 200, 3)], [FRAME.shape]]
+    assert detector.backend.calls[-1][1] is None
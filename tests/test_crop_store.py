@@ -0,0 +1,91 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from src.utils.crop_store import CropShardReader, CropShardWriter, remove_records
+from src.utils.synthetic import render_display
+
+KEYPOINTS = np.array([[0, 0], [319, 0], [319, 127], [0, 127]], dtype=np.float32)
+
+
+def _write(output_dir, items, **kwargs):
+    with CropShardWriter(str(output_dir), **kwargs) as writer:
+        for timestamp, time_text in items:
+            writer.write(render_display(time_text), timestamp, 100.0, KEYPOINTS)
+    return writer
+
+
+def test_round_trip_in_timestamp_order(tmp_path):
+    _write(tmp_path, [(2000, "10:02"), (1000, "10:01")], prefix="a")
+    _write(tmp_path, [(1500, "10:15")], prefix="b")
+
+    reader = CropShardReader(str(tmp_path))
+    assert len(reader) == 3
+    assert list(reader.index["timestamp"]) == [1000, 1500, 2000]
+
+    image, record = reader[0]
+    assert image.shape == (128, 320, 3)
+    # JPEG: close to the written crop, further from the others
+    error = {t: np.abs(image.astype(int) - render_display(t).astype(int)).mean() for t in ("10:01", "10:02")}
+    assert error["10:01"] < 6 and error["10:01"] < error["10:02"]
+    np.testing.assert_array_equal(record["keypoints"], KEYPOINTS)
+
+
+def test_rolls_over_to_a_new_shard(tmp_path):
+    writer = _write(tmp_path, [(i, "12:00") for i in range(20)], shard_size_mb=0.005)
+    assert writer.written == 20
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(".bin")]) > 1
+    assert len(CropShardReader(str(tmp_path))) == 20
+
+
+def test_export_keeps_crops_with_equal_timestamps(tmp_path):
+    _write(tmp_path / "shards", [(500, "01:00"), (500, "02:00")], prefix="a")
+    _write(tmp_path / "shards", [(500, "03:00")], prefix="b")
+
+    count = CropShardReader(str(tmp_path / "shards")).export(str(tmp_path / "out"))
+    assert count == 3
+    assert len(os.listdir(tmp_path / "out")) == 3
+
+
+def test_remove_records_only_touches_given_locations(tmp_path):
+    # An earlier run with the same timestamps
+    _write(tmp_path, [(1, "00:01"), (2, "00:02")], prefix="old")
+    writer = _write(tmp_path, [(1, "00:01"), (2, "00:02"), (3, "00:03")], prefix="new")
+    assert writer.locations == [("new_00000", 0), ("new_00000", 1), ("new_00000", 2)]
+
+    assert remove_records(str(tmp_path), [writer.locations[1]]) == 1
+    assert list(CropShardReader(str(tmp_path)).index["timestamp"]) == [1, 1, 2, 3]
+
+
+def test_writer_error_is_raised_by_write(tmp_path):
+    writer = CropShardWriter(str(tmp_path), max_pending=1)
+    # Not an image: encoding fails on the writer thread
+    writer.write(object(), 0, 0.0, KEYPOINTS)
+    writer._thread.join(timeout=5)
+
+    with pytest.raises(cv2.error):
+        for i in range(5):
+            writer.write(render_display("00:00"), i, 0.0, KEYPOINTS)
+    with pytest.raises(cv2.error):
+        writer.close()
+
+
+def test_rerun_starts_new_shards(tmp_path):
+    _write(tmp_path, [(1, "00:01"), (2, "00:02")])
+    _write(tmp_path, [(3, "00:03")])
+
+    assert sorted(f for f in os.listdir(tmp_path) if f.endswith(".bin")) == ["shard_00000.bin", "shard_00001.bin"]
+    # Each crop once, not the first run's crops again
+    assert list(CropShardReader(str(tmp_path)).index["timestamp"]) == [1, 2, 3]
+
+
+def test_shard_already_taken_fails(tmp_path):
+    writer = CropShardWriter(str(tmp_path))
+    # Claimed by someone else after the writer picked its shard id
+    open(tmp_path / "shard_00000.bin", "wb").close()
+    writer.write(render_display("00:00"), 0, 0.0, KEYPOINTS)
+
+    with pytest.raises(FileExistsError):
+        writer.close()
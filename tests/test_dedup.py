@@ -0,0 +1,67 @@
+import numpy as np
+
+from src.utils.dedup import BKTree, DedupIndex, block_hash, hamming
+from src.utils.synthetic import render_display
+
+TIMES = [f"{h:02d}:{m:02d}" for h in range(24) for m in range(60)]
+
+
+def _noisy(image, rng):
+    noisy = image.astype(np.float32) * rng.uniform(0.9, 1.1) + rng.normal(0, 3, image.shape)
+    return np.clip(noisy, 0, 255).astype(np.uint8)
+
+
+def test_different_readings_are_never_duplicates():
+    index = DedupIndex()
+    for time_text in TIMES:
+        assert index.check_and_add(render_display(time_text)), time_text
+    assert len(index) == len(TIMES)
+    assert index.rejected == 0
+
+
+def test_one_segment_change_is_past_the_threshold():
+    assert hamming(block_hash(render_display("12:30")), block_hash(render_display("12:38"))) > DedupIndex().max_distance
+
+
+def test_noisy_repeats_are_duplicates():
+    rng = np.random.default_rng(0)
+    index = DedupIndex()
+    for time_text in TIMES[::97]:
+        display = render_display(time_text)
+        assert index.check_and_add(display)
+        assert not index.check_and_add(_noisy(display, rng)), time_text
+
+
+def test_bktree_find_and_size():
+    tree = BKTree()
+    assert tree.add(0b1111)
+    assert tree.add(0b0111)
+    assert not tree.add(0b1111)
+    assert tree.size == 2
+
+    assert tree.find(0b0011, 1) == 0b0111
+    assert tree.find(0, 1) is None
+
+
+def test_index_persists(tmp_path):
+    path = str(tmp_path / "hashes.npy")
+    index = DedupIndex(path)
+    index.check_and_add(render_display("07:45"))
+    index.add_hash(block_hash(render_display("07:45")))
+    index.save()
+
+    reloaded = DedupIndex(path)
+    assert len(reloaded) == 1
+    assert not reloaded.check_and_add(render_display("07:45"))
+    assert reloaded.check_and_add(render_display("07:46"))
+
+
+def test_incompatible_index_is_ignored(tmp_path):
+    path = str(tmp_path / "old.npy")
+    np.save(path, np.zeros((3, 2), dtype=np.uint64))
+    index = DedupIndex(path)
+    assert len(index) == 0
+
+    index.check_and_add(render_display("01:23"))
+    index.save()
+    assert np.load(path).shape == (1, 64)
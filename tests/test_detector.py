@@ -0,0 +1,67 @@
+import glob
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("ultralytics")
+pytest.importorskip("onnxruntime")
+
+from src.core import settings
+from src.detectors import ClockDetector, DigitDetector
+from src.utils.geometry import four_point_transform
+
+# Parity between the PyTorch (ultralytics) path and the exported ONNX path.
+# Needs the trained weights from settings.yaml and a few sample frames.
+SAMPLE_DIR = os.environ.get("PARITY_SAMPLES", "data/samples")
+
+
+def _sample_images():
+    paths = sorted(glob.glob(os.path.join(SAMPLE_DIR, "*.jpg")) + glob.glob(os.path.join(SAMPLE_DIR, "*.png")))
+    return [cv2.imread(p) for p in paths[:8]]
+
+
+def _export_onnx(weights, imgsz):
+    from ultralytics import YOLO
+
+    return YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True)
+
+
+@pytest.fixture(scope="module")
+def samples():
+    images = _sample_images()
+    if not images:
+        pytest.skip(f"No sample images in {SAMPLE_DIR}")
+    return images
+
+
+def test_keypoint_parity(samples):
+    if not os.path.exists(settings.pose_model_path):
+        pytest.skip("Pose weights not available")
+
+    onnx_path = _export_onnx(settings.pose_model_path, 640)
+    torch_det = ClockDetector(settings.pose_model_path, settings.pose_conf, backend="ultralytics")
+    onnx_det = ClockDetector(onnx_path, settings.pose_conf, backend="onnxruntime")
+
+    for torch_kpts, onnx_kpts in zip(torch_det.detect_batch(samples), onnx_det.detect_batch(samples)):
+        assert (torch_kpts is None) == (onnx_kpts is None)
+        if torch_kpts is not None:
+            assert np.abs(torch_kpts - onnx_kpts).max() < 3.0
+
+
+def test_digit_parity(samples):
+    if not os.path.exists(settings.digit_model_path) or not os.path.exists(settings.pose_model_path):
+        pytest.skip("Digit/pose weights not available")
+
+    pose_det = ClockDetector(settings.pose_model_path, settings.pose_conf, backend="ultralytics")
+    crops = [four_point_transform(image, kpts, settings.warp_size)
+             for image, kpts in zip(samples, pose_det.detect_batch(samples)) if kpts is not None]
+    if not crops:
+        pytest.skip("No clock found in the sample images")
+
+    onnx_path = _export_onnx(settings.digit_model_path, 320)
+    torch_det = DigitDetector(settings.digit_model_path, settings.digit_conf, backend="ultralytics")
+    onnx_det = DigitDetector(onnx_path, settings.digit_conf, backend="onnxruntime")
+
+    assert torch_det.detect_batch(crops) == onnx_det.detect_batch(crops)
@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+
+from src.utils.geometry import (CachedWarper, four_point_transform, four_point_transform_batch,
+                                perspective_matrices, valid_quads)
+
+QUAD = np.array([[100, 80], [420, 100], [400, 260], [110, 240]], dtype=np.float32)
+TARGET = (320, 128)
+
+
+def _image():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, size=(480, 640, 3), dtype=np.uint8)
+
+
+def test_perspective_matrices_match_opencv():
+    quads = np.stack([QUAD, QUAD + 7.5, QUAD[[0, 1, 2, 3]] * 0.9])
+    dst = np.float32([[0, 0], [TARGET[0] - 1, 0], [TARGET[0] - 1, TARGET[1] - 1], [0, TARGET[1] - 1]])
+    for M, quad in zip(perspective_matrices(quads, *TARGET), quads):
+        np.testing.assert_allclose(M, cv2.getPerspectiveTransform(quad, dst), rtol=1e-6, atol=1e-9)
+
+
+def test_batch_warp_matches_single():
+    image = _image()
+    crops = four_point_transform_batch(image, [QUAD, QUAD + 10], TARGET)
+    assert len(crops) == 2
+    for crop, quad in zip(crops, [QUAD, QUAD + 10]):
+        assert np.abs(crop.astype(int) - four_point_transform(image, quad, TARGET).astype(int)).max() <= 1
+
+
+def test_degenerate_quads_are_skipped_per_instance():
+    collinear = np.array([[0, 0], [100, 0], [200, 0], [50, 80]], dtype=np.float32)
+    coincident = np.array([[10, 10], [10, 10], [200, 90], [20, 90]], dtype=np.float32)
+    assert list(valid_quads([QUAD, collinear, coincident])) == [True, False, False]
+
+    matrices = perspective_matrices(np.stack([QUAD, collinear]), *TARGET)
+    assert np.isfinite(matrices[0]).all() and np.isnan(matrices[1]).all()
+
+    crops = four_point_transform_batch(_image(), [collinear, QUAD, coincident], TARGET)
+    assert crops[0] is None and crops[2] is None
+    assert crops[1].shape == (TARGET[1], TARGET[0], 3)
+
+
+def test_cached_warper_reuses_maps_for_a_stable_quad():
+    image = _image()
+    warper = CachedWarper(target_size=TARGET, quantum=1.0)
+
+    first = warper.warp(image, QUAD).copy()
+    second = warper.warp(image, QUAD + 0.2)
+    stats = warper.stats()
+
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    np.testing.assert_array_equal(first, second)
+    assert np.abs(first.astype(int) - four_point_transform(image, QUAD, TARGET, cv2.INTER_CUBIC).astype(int)).mean() < 2
+
+
+def test_cached_warper_recomputes_for_a_moved_quad():
+    warper = CachedWarper(target_size=TARGET, quantum=1.0)
+    warper.warp(_image(), QUAD)
+    warper.warp(_image(), QUAD + 5)
+    assert warper.stats()["misses"] == 2
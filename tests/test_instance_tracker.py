@@ -0,0 +1,56 @@
+import numpy as np
+
+from src.core.metrics import Metrics
+from src.services.instance_tracker import InstanceTracker
+from stubs import digit_prediction, make_reader, pose_prediction
+
+
+def _quad(x, y, w=100, h=40):
+    return np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h]], dtype=np.float32)
+
+
+def test_ids_follow_their_quads_across_frames():
+    tracker = InstanceTracker()
+    assert tracker.assign([_quad(0, 0), _quad(300, 0)]) == [0, 1]
+    # Listed in the other order and moved a little
+    assert tracker.assign([_quad(305, 3), _quad(4, 2)]) == [1, 0]
+    # A third display appears far from both
+    assert tracker.assign([_quad(8, 4), _quad(0, 300), _quad(310, 6)]) == [0, 2, 1]
+
+
+def test_closest_quad_wins_a_contested_track():
+    tracker = InstanceTracker(max_distance=0.5)
+    tracker.assign([_quad(0, 0)])
+    # Both are within max_distance of track 0; the nearer one keeps it
+    assert tracker.assign([_quad(30, 0), _quad(5, 0)]) == [1, 0]
+
+
+def test_id_survives_max_age_missed_frames():
+    tracker = InstanceTracker(max_age=2)
+    tracker.assign([_quad(0, 0)])
+    tracker.assign([])
+    tracker.assign([])
+    assert tracker.assign([_quad(2, 0)]) == [0]
+
+    for _ in range(3):
+        tracker.assign([])
+    assert tracker.active == 0
+    assert tracker.assign([_quad(2, 0)]) == [1]
+
+
+def test_read_all_skips_degenerate_quads_per_instance():
+    flat = np.array([[300, 100], [350, 100], [400, 100], [450, 100]], dtype=np.float32)
+    quads = [[_quad(20, 20), flat, _quad(20, 200)]]
+    metrics = Metrics()
+    reader = make_reader(lambda frame: pose_prediction(*quads[0]), digits=lambda crop: digit_prediction("0930"), metrics=metrics)
+    frame = np.zeros((480, 640, 3), np.uint8)
+
+    results = reader.read_all(frame, frame_id=0)
+    # The collinear quad is dropped; the others are read and keep their ids
+    assert [r.instance_id for r in results] == [0, 2]
+    assert [r.time_text for r in results] == ["0930", "0930"]
+    assert all(r.warped_img.shape == (128, 320, 3) for r in results)
+    assert metrics.counters["degenerate_quads"] == 1
+
+    quads[0] = [_quad(22, 200), _quad(21, 21)]
+    assert [r.instance_id for r in reader.read_all(frame, frame_id=1)] == [2, 0]
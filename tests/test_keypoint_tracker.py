@@ -0,0 +1,77 @@
+import numpy as np
+
+from src.detectors import clock_detector
+from src.detectors.backends import Prediction
+from src.detectors.keypoint_tracker import KeypointTracker
+from src.utils.synthetic import generate_clock_scene
+
+
+class _StubPoseBackend:
+    """Returns fixed keypoints as (1, 4, 3) rows, like the exported-graph backends."""
+    def __init__(self, keypoints):
+        self.keypoints = keypoints
+
+    def predict(self, images, conf, imgsz=None):
+        kpts = np.concatenate([self.keypoints, np.ones((4, 1), np.float32)], axis=1)[None]
+        boxes = np.array([[0, 0, 1, 1, 0.9, 0]], dtype=np.float32)
+        return [Prediction(boxes, kpts.astype(np.float32)) for _ in images]
+
+
+def _detector(monkeypatch, keypoints):
+    monkeypatch.setattr(clock_detector, "create_backend", lambda *a, **k: _StubPoseBackend(keypoints))
+    return clock_detector.ClockDetector("stub.onnx", 0.25)
+
+
+def _gray(frame):
+    return frame.mean(axis=2).astype(np.uint8)
+
+
+def test_detector_keypoints_are_contiguous(monkeypatch):
+    frame, quad = generate_clock_scene(rng=np.random.default_rng(0))
+    kpts = _detector(monkeypatch, quad).detect(frame)
+
+    assert kpts.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(kpts, quad)
+
+
+def test_init_then_track_follows_shift(monkeypatch):
+    frame, quad = generate_clock_scene(rng=np.random.default_rng(1))
+    kpts = _detector(monkeypatch, quad).detect(frame)
+
+    tracker = KeypointTracker()
+    tracker.init(_gray(frame), kpts)
+    assert tracker.active
+
+    shifted = np.roll(frame, (3, 5), axis=(0, 1))
+    tracked = tracker.track(_gray(shifted))
+
+    assert tracked is not None
+    np.testing.assert_allclose(tracked, quad + np.array([5, 3]), atol=1.5)
+    assert tracker.frames_since_detect == 1
+
+
+def test_track_without_init_fails():
+    tracker = KeypointTracker()
+    assert tracker.track(np.zeros((48, 64), np.uint8)) is None
+    assert tracker.needs_redetect()
+
+
+def test_redetect_after_interval():
+    frame, quad = generate_clock_scene(rng=np.random.default_rng(2))
+    gray = _gray(frame)
+
+    tracker = KeypointTracker(redetect_interval=3)
+    tracker.init(gray, quad)
+    for _ in range(3):
+        assert not tracker.needs_redetect()
+        assert tracker.track(gray) is not None
+    assert tracker.needs_redetect()
+
+
+def test_tracking_fails_when_the_display_disappears():
+    frame, quad = generate_clock_scene(rng=np.random.default_rng(3))
+    tracker = KeypointTracker()
+    tracker.init(_gray(frame), quad)
+
+    assert tracker.track(np.zeros_like(_gray(frame))) is None
+    assert not tracker.active
@@ -0,0 +1,85 @@
+import numpy as np
+
+from src.services.latency_controller import LatencyController
+from stubs import make_reader, pose_prediction
+
+
+def _run(controller, latency_ms, frames, **kwargs):
+    for _ in range(frames):
+        controller.update(latency_ms, **kwargs)
+
+
+def test_degrades_digits_then_pose_then_imgsz():
+    controller = LatencyController(50, max_pose_stride=2, imgsz_levels=[640, 320], max_digit_interval=2, cooldown=1)
+
+    assert (controller.digit_interval, controller.pose_stride, controller.imgsz) == (1, 1, 640)
+    _run(controller, 200, 1)
+    assert controller.digit_interval == 2
+    _run(controller, 200, 1)
+    assert controller.pose_stride == 2
+    _run(controller, 200, 1)
+    assert controller.imgsz == 320
+    assert not controller.update(200)
+
+
+def test_upgrades_in_reverse_order():
+    controller = LatencyController(50, max_pose_stride=2, imgsz_levels=[640, 320], max_digit_interval=2, cooldown=1, smoothing=1.0)
+    controller.digit_interval, controller.pose_stride, controller.imgsz_index = 2, 2, 1
+
+    controller.update(10)
+    assert controller.imgsz == 640 and controller.pose_stride == 2
+    controller.update(10)
+    assert controller.pose_stride == 1 and controller.digit_interval == 2
+    controller.update(10)
+    assert controller.digit_interval == 1
+
+
+def test_within_tolerance_nothing_changes():
+    controller = LatencyController(100, imgsz_levels=[640, 320], cooldown=1)
+    _run(controller, 110, 50)
+    assert controller.adjustments == 0
+
+
+def test_imgsz_only_leaves_strides_alone():
+    controller = LatencyController(50, imgsz_levels=[640, 480, 320], cooldown=1, smoothing=1.0)
+    _run(controller, 200, 5, imgsz_only=True)
+    assert controller.imgsz == 320
+    assert (controller.digit_interval, controller.pose_stride) == (1, 1)
+
+    controller.pose_stride = 3
+    _run(controller, 10, 5, imgsz_only=True)
+    assert controller.imgsz == 640 and controller.pose_stride == 3
+
+
+def test_due_counters_follow_strides():
+    controller = LatencyController(50)
+    controller.pose_stride, controller.digit_interval = 2, 3
+    assert [controller.pose_due() for _ in range(4)] == [True, False, True, False]
+    assert [controller.digits_due() for _ in range(4)] == [True, False, False, True]
+
+
+def test_configure_clamps_knobs():
+    controller = LatencyController(50, max_pose_stride=4, imgsz_levels=[640, 480, 320], max_digit_interval=8)
+    controller.pose_stride, controller.digit_interval, controller.imgsz_index = 4, 8, 2
+    controller.configure(max_pose_stride=2, max_digit_interval=4, imgsz_levels=[640])
+    assert (controller.pose_stride, controller.digit_interval, controller.imgsz) == (2, 4, 640)
+
+
+def test_reload_is_applied_between_frames():
+    quad = [[10, 10], [110, 10], [110, 50], [10, 50]]
+    controller = LatencyController(target_ms=100.0)
+
+    def pose(frame):
+        # The settings watcher disables the controller while this frame is running
+        reader.defer(lambda: setattr(reader, "latency_controller", None))
+        return pose_prediction(quad)
+
+    reader = make_reader(pose, latency_controller=controller)
+    frame = np.zeros((120, 160, 3), np.uint8)
+
+    reader.read(frame)
+    # Still the controller this frame started with
+    assert reader.latency_controller is controller and controller.latency_ms is not None
+
+    reader.read(frame)
+    assert reader.latency_controller is None
@@ -0,0 +1,42 @@
+import threading
+
+from src.core.metrics import Metrics
+
+
+def test_concurrent_counters_are_not_lost():
+    metrics = Metrics()
+
+    def work():
+        for _ in range(20000):
+            metrics.inc("frames")
+            metrics.observe("pose", 0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    # Readers run alongside the writers
+    for _ in range(50):
+        metrics.snapshot()
+        metrics.prometheus_text()
+    for t in threads:
+        t.join()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["frames"] == 80000
+    assert snapshot["stages"]["pose"]["count"] == 80000
+
+
+def test_timer_records_stage_and_exceptions():
+    metrics = Metrics()
+    with metrics.timer("warp"):
+        pass
+    try:
+        with metrics.timer("warp"):
+            raise ValueError
+    except ValueError:
+        pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["stages"]["warp"]["count"] == 2
+    assert snapshot["counters"]["warp_exceptions"] == 1
+    assert 'clock_reader_stage_seconds_count{stage="warp"} 2' in metrics.prometheus_text()
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import numpy as np
+
+from src.services.multi_stream import MultiStreamScheduler, StreamSource
+from src.services.sinks import ReadingResult
+
+
+class SyntheticSource(StreamSource):
+    """
+    Feeds `count` frames filled with their index. With wait_taken, each frame
+    is only captured after the previous one was scheduled.
+    """
+    def __init__(self, stream_id, count, max_fps=0.0, wait_taken=False):
+        super().__init__(stream_id, None, max_fps)
+        self.count = count
+        self.wait_taken = wait_taken
+
+    def open(self):
+        return True
+
+    def capture_loop(self, stop_event):
+        for i in range(self.count):
+            while self.wait_taken and len(self.queue) and not stop_event.is_set():
+                time.sleep(0.001)
+            self.captured += 1
+            self.queue.put((time.perf_counter(), np.full((4, 4, 3), i, np.uint8)))
+        self.finished = True
+        self.queue.close()
+
+
+class EchoService:
+    """read_batch stand-in: the frame's fill value is the reading."""
+    def __init__(self):
+        self.batches = []
+
+    def read_batch(self, frames, stream_ids=None):
+        self.batches.append(list(stream_ids))
+        return [ReadingResult(time.time(), stream_id=sid, time_text=str(int(f[0, 0, 0]))) for f, sid in zip(frames, stream_ids)]
+
+
+def _feed(*sources):
+    for source in sources:
+        source.queue.put((time.perf_counter(), np.zeros((4, 4, 3), np.uint8)))
+
+
+def test_round_robin_rotates_the_first_stream():
+    a, b = StreamSource("a", None), StreamSource("b", None)
+    scheduler = MultiStreamScheduler(EchoService(), [a, b], max_batch=1)
+
+    order = []
+    for _ in range(4):
+        # Both streams always have a frame waiting
+        _feed(a, b)
+        order += [source.stream_id for source, _, _ in scheduler.next_batch()]
+    assert order == ["a", "b", "a", "b"]
+
+
+def test_fps_cap_skips_a_stream_until_its_interval_passed():
+    capped, free = StreamSource("capped", None, max_fps=10), StreamSource("free", None)
+    scheduler = MultiStreamScheduler(EchoService(), [capped, free])
+
+    _feed(capped, free)
+    assert {s.stream_id for s, _, _ in scheduler.next_batch()} == {"capped", "free"}
+
+    _feed(capped, free)
+    assert [s.stream_id for s, _, _ in scheduler.next_batch()] == ["free"]
+
+    # 100 ms later the capped stream is due again, its newest frame still waiting
+    capped.last_scheduled -= 0.1
+    assert [s.stream_id for s, _, _ in scheduler.next_batch()] == ["capped"]
+
+
+def test_run_keeps_the_last_frame_of_a_capped_stream():
+    capped = SyntheticSource("capped", 2, max_fps=5, wait_taken=True)
+    free = SyntheticSource("free", 1)
+    service = EchoService()
+    results = []
+
+    thread = threading.Thread(target=MultiStreamScheduler(service, [capped, free], report_interval=60).run, args=(results.append,))
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+    # The capped stream's second frame arrives while it is not due; it is still read
+    assert sorted((r.stream_id, r.time_text) for r in results) == [("capped", "0"), ("capped", "1"), ("free", "0")]
+    assert capped.processed == 2
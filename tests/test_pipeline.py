@@ -0,0 +1,33 @@
+import threading
+import time
+
+from src.services.pipeline import LatestQueue
+
+
+def test_full_queue_drops_the_oldest():
+    queue = LatestQueue(maxsize=2)
+    for item in range(5):
+        queue.put(item)
+
+    assert queue.dropped == 3
+    assert queue.get(timeout=0) == 3
+    assert queue.get(timeout=0) == 4
+    assert queue.get(timeout=0) is None
+
+
+def test_get_wakes_up_on_put():
+    queue = LatestQueue()
+    threading.Timer(0.05, queue.put, args=("frame",)).start()
+    assert queue.get(timeout=2.0) == "frame"
+
+
+def test_close_releases_a_waiting_consumer_after_draining():
+    queue = LatestQueue()
+    queue.put("last")
+    queue.close()
+    assert queue.closed
+    assert queue.get() == "last"
+
+    start = time.perf_counter()
+    assert queue.get() is None
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,51 @@
+import cv2
+import numpy as np
+
+from src.detectors.segment_decoder import SevenSegmentDecoder
+from src.utils.synthetic import render_display
+
+TIMES = [f"{h:02d}:{m:02d}" for h in range(24) for m in range(0, 60, 7)]
+
+
+def test_decodes_every_digit_on_rendered_displays():
+    decoder = SevenSegmentDecoder()
+    for time_text in TIMES:
+        digits, confidence, confs = decoder.decode(render_display(time_text))
+        assert "".join(digits) == time_text.replace(":", ""), time_text
+        assert confidence >= decoder.min_confidence
+        assert len(confs) == 4
+
+
+def test_robust_to_noise_and_blur():
+    rng = np.random.default_rng(0)
+    decoder = SevenSegmentDecoder()
+    for time_text in TIMES[::5]:
+        display = cv2.GaussianBlur(render_display(time_text), (5, 5), 0).astype(np.float32)
+        noisy = np.clip(display * rng.uniform(0.6, 1.2) + rng.normal(0, 10, display.shape), 0, 255).astype(np.uint8)
+        digits, _, _ = decoder.decode(noisy)
+        assert "".join(digits) == time_text.replace(":", "")
+
+
+def test_batch_matches_single():
+    decoder = SevenSegmentDecoder()
+    images = [render_display(t) for t in TIMES[:6]]
+    assert decoder.decode_batch(images) == [decoder.decode(image) for image in images]
+    assert decoder.decode_batch([]) == []
+
+
+def test_not_a_display_has_low_confidence():
+    rng = np.random.default_rng(1)
+    decoder = SevenSegmentDecoder()
+    _, confidence, _ = decoder.decode(rng.integers(0, 255, size=(128, 320, 3), dtype=np.uint8))
+    assert confidence < decoder.min_confidence
+
+
+def test_digit_boxes_are_ordered_inside_the_crop():
+    boxes, confidence = SevenSegmentDecoder().digit_boxes(render_display("09:51"))
+    assert [digit for digit, _ in boxes] == ["0", "9", "5", "1"]
+    assert confidence > 0.5
+
+    lefts = [box[0] for _, box in boxes]
+    assert lefts == sorted(lefts)
+    for _, (x0, y0, x1, y1) in boxes:
+        assert 0 <= x0 < x1 <= 1 and 0 <= y0 < y1 <= 1
@@ -0,0 +1,93 @@
+import os
+import time
+import types
+
+import numpy as np
+import pytest
+
+from src.services.shm_workers import SharedMemoryWorkerPool, SharedRing
+from src.services.sinks import ReadingResult
+
+FRAME_SHAPE = (48, 64, 3)
+CROP_SHAPE = (8, 16, 3)
+# Frames with this value make the stub worker crash
+CRASH = 255
+
+
+class StubReader:
+    """Reads the frame's fill value as the time; no models."""
+    def __init__(self, draw=False, **kwargs):
+        self.pose_detector = types.SimpleNamespace(imgsz=None)
+
+    def read(self, frame, stream_id=None, frame_id=None):
+        value = int(frame[0, 0, 0])
+        if value == CRASH:
+            os._exit(1)
+        time.sleep(0.01)
+        crop = np.full(CROP_SHAPE, value, np.uint8)
+        return ReadingResult(time.time(), stream_id=stream_id, frame_id=frame_id, warped_img=crop,
+                             time_text=f"{value:04d}", keypoints=np.zeros((4, 2), np.float32))
+
+
+def _frame(value):
+    return np.full(FRAME_SHAPE, value, np.uint8)
+
+
+def _collect_all(pool, deadline=20.0):
+    results = []
+    end = time.monotonic() + deadline
+    while pool.in_flight and time.monotonic() < end:
+        results += pool.collect(timeout=0.2)
+    return results
+
+
+def test_ring_write_view_round_trip():
+    ring = SharedRing(2, FRAME_SHAPE)
+    try:
+        small = np.arange(20 * 30 * 3, dtype=np.uint8).reshape(20, 30, 3)
+        ring.write(1, small)
+
+        # Another process attaches by name and sees the same pixels
+        attached = SharedRing(2, FRAME_SHAPE, name=ring.name)
+        np.testing.assert_array_equal(attached.view(1, small.shape), small)
+        attached.close()
+
+        with pytest.raises(ValueError):
+            ring.write(0, np.zeros((49, 64, 3), np.uint8))
+    finally:
+        ring.close()
+
+
+def test_pool_returns_results_in_submission_order():
+    pool = SharedMemoryWorkerPool({}, FRAME_SHAPE, CROP_SHAPE, workers=1, slots=4, reader_factory=StubReader).start()
+    try:
+        ids = [pool.submit(_frame(v), stream_id="cam") for v in (1, 2, 3)]
+        assert ids == [0, 1, 2]
+        # Every slot busy: the frame is dropped, not queued
+        pool.submit(_frame(4))
+        assert pool.submit(_frame(5)) is None and pool.dropped == 1
+
+        results = _collect_all(pool)
+        assert [r.frame_id for r in results] == [0, 1, 2, 3]
+        assert [r.time_text for r in results] == ["0001", "0002", "0003", "0004"]
+        assert results[0].stream_id == "cam"
+        np.testing.assert_array_equal(results[2].warped_img, np.full(CROP_SHAPE, 3, np.uint8))
+    finally:
+        pool.stop()
+
+
+def test_frame_of_a_crashed_worker_is_skipped():
+    pool = SharedMemoryWorkerPool({}, FRAME_SHAPE, CROP_SHAPE, workers=2, slots=4, reader_factory=StubReader).start()
+    try:
+        for value in (1, CRASH, 3, 4):
+            pool.submit(_frame(value))
+
+        results = _collect_all(pool)
+        # The crashed frame is gone, the ones after it are not held back and every slot is free again
+        assert [r.frame_id for r in results] == [0, 2, 3]
+        assert pool.lost == 1 and pool.in_flight == 0
+
+        pool.submit(_frame(6))
+        assert [r.time_text for r in _collect_all(pool)] == ["0006"]
+    finally:
+        pool.stop()
@@ -0,0 +1,79 @@
+import json
+import os
+import time
+
+import pytest
+
+from src.services.sinks import BatchedSink, ReadingResult, RotatingFileSink, StdoutJsonlSink, create_sinks
+
+
+class ListSink(BatchedSink):
+    def __init__(self, **kwargs):
+        self.batches = []
+        super().__init__(**kwargs)
+
+    def _write_lines(self, lines):
+        self.batches.append(list(lines))
+
+
+def _result(i):
+    return ReadingResult(1000.0 + i, digits=list("1234"), digit_confs=[0.9] * 4, time_text="1234", frame_id=i)
+
+
+def test_flushes_once_batch_size_is_reached():
+    sink = ListSink(batch_size=3, flush_interval=60.0)
+    for i in range(5):
+        sink.emit(_result(i))
+
+    assert [len(batch) for batch in sink.batches] == [3]
+    assert [json.loads(line)["frame_id"] for line in sink.batches[0]] == [0, 1, 2]
+
+    sink.close()
+    assert [len(batch) for batch in sink.batches] == [3, 2]
+
+
+def test_flushes_on_time_without_further_emits():
+    sink = ListSink(batch_size=100, flush_interval=0.05)
+    try:
+        sink.emit(_result(0))
+        deadline = time.monotonic() + 2.0
+        while not sink.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(sink.batches) == 1
+    finally:
+        sink.close()
+
+
+def test_rotating_file_sink_rotates_and_keeps_backups(tmp_path):
+    path = tmp_path / "logs" / "readings.jsonl"
+    sink = RotatingFileSink(str(path), max_bytes=600, backup_count=2, batch_size=1)
+    for i in range(20):
+        sink.emit(_result(i))
+    sink.close()
+
+    files = sorted(os.listdir(path.parent))
+    assert files == ["readings.jsonl", "readings.jsonl.1", "readings.jsonl.2"]
+    for name in files:
+        text = (path.parent / name).read_text()
+        assert len(text) <= 600
+        for line in text.splitlines():
+            json.loads(line)
+    # The newest records are in the live file
+    assert json.loads(path.read_text().splitlines()[-1])["frame_id"] == 19
+
+
+def test_create_sinks_from_settings(tmp_path):
+    configs = [{"type": "stdout", "batch_size": 1}, {"type": "file", "path": str(tmp_path / "r.jsonl"), "max_bytes": 1024}]
+    sinks = create_sinks(configs)
+    try:
+        assert [type(s) for s in sinks] == [StdoutJsonlSink, RotatingFileSink]
+        assert sinks[0].batch_size == 1
+        assert sinks[1]._handler.maxBytes == 1024
+        # The settings themselves are left as they were
+        assert configs[0]["type"] == "stdout"
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    with pytest.raises(ValueError):
+        create_sinks([{"type": "kafka"}])
@@ -0,0 +1,95 @@
+import socket
+import threading
+import time
+
+from src.services.stream_server import ResultStreamServer
+
+
+def _subscribe(port):
+    sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+    sock.sendall(b"GET /readings HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    return sock
+
+
+def _read_until(sock, marker):
+    data = b""
+    while marker not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def test_subscriber_receives_events():
+    server = ResultStreamServer(port=0).start()
+    try:
+        sock = _subscribe(server.port)
+        _read_until(sock, b"\r\n\r\n")
+        while not server.clients:
+            time.sleep(0.01)
+
+        server.publish({"time": "12:34"})
+        assert b'data: {"time":"12:34"}' in _read_until(sock, b"\n\n")
+        sock.close()
+    finally:
+        server.stop()
+
+
+def test_stop_with_connected_subscribers_is_prompt():
+    server = ResultStreamServer(port=0).start()
+    sockets = [_subscribe(server.port) for _ in range(3)]
+    while len(server.clients) < 3:
+        time.sleep(0.01)
+
+    start = time.perf_counter()
+    server.stop()
+    assert time.perf_counter() - start < 2.0
+    assert not server.clients
+
+    for sock in sockets:
+        # The stream is ended by the server
+        _read_until(sock, b"\x00")
+        sock.close()
+
+
+def test_slow_subscriber_is_dropped_while_fast_one_keeps_up():
+    server = ResultStreamServer(port=0, client_buffer=4, max_lag=20).start()
+    try:
+        # Never reads, with a small receive buffer so the server-side queue fills quickly
+        slow = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        slow.connect(("127.0.0.1", server.port))
+        slow.sendall(b"GET /readings HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        while not server.clients:
+            time.sleep(0.01)
+        slow_client = next(iter(server.clients))
+
+        fast = _subscribe(server.port)
+        _read_until(fast, b"\r\n\r\n")
+        while len(server.clients) < 2:
+            time.sleep(0.01)
+        fast_client = next(c for c in server.clients if c is not slow_client)
+
+        received = []
+        reader = threading.Thread(target=lambda: received.append(_read_until(fast, b'"n":199,')), daemon=True)
+        reader.start()
+
+        lag_seen = 0
+        for n in range(200):
+            server.publish({"n": n, "pad": "x" * 2000})
+            time.sleep(0.005)
+            lag_seen = max(lag_seen, slow_client.lagging)
+        reader.join(timeout=10)
+
+        assert slow_client.dropped >= 20 and lag_seen >= 15
+        assert server.disconnected == 1
+        assert server.clients == {fast_client}
+        # Every event reached the fast subscriber
+        assert fast_client.dropped == 0
+        assert received and received[0].count(b"data: ") == 200
+
+        slow.close()
+        fast.close()
+    finally:
+        server.stop()
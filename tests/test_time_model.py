@@ -0,0 +1,72 @@
+from src.services.time_model import TimeModel
+
+
+def _feed(model, digits, times):
+    for now in times:
+        model.update(digits, now=now)
+
+
+def test_locks_after_enough_votes():
+    model = TimeModel(min_votes=3)
+    _feed(model, ["1", "2", ":", "3", "4"], [0.0, 0.1])
+    assert not model.locked
+
+    model.update(["1", "2", ":", "3", "4"], now=0.2)
+    assert model.locked
+    assert model.text(now=0.2) == "12:34"
+
+
+def test_misreads_do_not_win_the_vote():
+    model = TimeModel(min_votes=3)
+    for now, digits in enumerate(["1234", "1284", "1234", "1234"]):
+        model.update(list(digits), now=float(now))
+    assert model.text(now=3.0) == "1234"
+
+
+def test_predicts_after_a_seen_transition():
+    model = TimeModel(min_votes=1)
+    model.update(list("0959"), now=0.0)
+    model.update(list("1000"), now=10.0)
+
+    assert model.transition_time == 10.0
+    assert model.text(now=69.0) == "1000"
+    assert model.text(now=71.0) == "1001"
+    assert model.next_transition(now=71.0) == 130.0
+
+
+def test_wraps_around_midnight():
+    model = TimeModel(min_votes=1)
+    model.update(list("2358"), now=0.0)
+    model.update(list("2359"), now=5.0)
+    assert model.text(now=65.0) == "0000"
+
+
+def test_dense_near_transition_sparse_otherwise():
+    model = TimeModel(min_votes=1, dense_window=2.0, sparse_interval=10.0)
+    model.update(list("0800"), now=0.0)
+    assert model.should_recognize(now=1.0)
+
+    model.update(list("0801"), now=60.0)
+    assert model.should_recognize(now=61.0)
+    # Mid-minute: only every sparse_interval seconds after the last check
+    assert not model.should_recognize(now=65.0)
+    assert model.should_recognize(now=71.0)
+    assert model.should_recognize(now=119.0)
+
+
+def test_resyncs_after_repeated_contradictions():
+    model = TimeModel(min_votes=1, resync_after=3)
+    model.update(list("0700"), now=0.0)
+    _feed(model, list("1530"), [1.0, 2.0])
+    assert model.text(now=2.0) == "0700"
+
+    model.update(list("1530"), now=3.0)
+    assert model.text(now=3.0) == "1530"
+
+
+def test_invalid_readings_are_ignored():
+    model = TimeModel(min_votes=1)
+    for digits in (["9", "9", "9", "9"], ["1", "2"], []):
+        model.update(digits, now=0.0)
+    assert not model.locked
+    assert model.parse(list("123456")) == (12 * 3600 + 34 * 60 + 56, 1)